@@ -0,0 +1,601 @@
+"""
+Alert rules evaluated incrementally on every Sample
+
+Rules file, one rule per line (# starts a comment):
+
+    cpu.total > 90 for 30s
+    cpu * > 95 for 10s                      every core
+    load.1min > 8
+    memory pct > 90 for 1m
+    swap pct > 50
+    disk * util_pct > 80 for 15s
+    partition / pct > 95                    by mount point or device
+    partition * pct > 90
+    net eth0 receive_errors rate > 0        per-second rate of a counter
+    net * download_speed > 100000000
+
+    SELECTOR [FIELD] [rate] OP THRESHOLD [for DURATION]
+
+A `*` makes a template, expanded to one instance per core, disk,
+partition or interface, and re-expanded only when that set changes.
+Every instance is a small state machine (ok → pending → firing), so a
+duration needs no history. A rule is only evaluated when the scheduler
+task that feeds it ran in that tick. The cost per tick is therefore
+O(instances of refreshed tasks).
+"""
+
+import json
+import operator
+import os
+import subprocess
+import threading
+from typing import Callable, Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+from shm.collector import Sample
+
+OPS: Dict[str, Callable[[float, float], bool]] = {
+    ">": operator.gt,
+    ">=": operator.ge,
+    "<": operator.lt,
+    "<=": operator.le,
+    "==": operator.eq,
+    "!=": operator.ne,
+}
+
+DURATION_UNITS = {"ms": 0.001, "s": 1.0, "m": 60.0, "h": 3600.0}
+
+STATE_OK = "ok"
+STATE_PENDING = "pending"
+STATE_FIRING = "firing"
+STATE_RESOLVED = "resolved"
+
+
+class RuleError(ValueError):
+    """
+    A rule line that cannot be parsed.
+    """
+
+
+def parse_duration(text: str) -> float:
+    for unit in ("ms", "s", "m", "h"):
+        if text.endswith(unit) and text[:-len(unit)].replace(".", "", 1).isdigit():
+            return float(text[:-len(unit)]) * DURATION_UNITS[unit]
+    try:
+        return float(text)
+    except ValueError:
+        raise RuleError(f"bad duration {text!r}") from None
+
+
+# ================= SECTIONS =================
+def _memory_field(sample: Sample, field: str) -> float:
+    memory = sample.memory
+    if field == "pct":
+        total = memory.get("total", 0)
+        return memory["used"] / total * 100 if total else 0.0
+    return memory[field]
+
+
+class Section(NamedTuple):
+    """
+    Where a selector reads from.
+
+    keys(sample) -> {key: label} for sections with one entry per core /
+    disk / partition / interface. A rule may name either; alerts are
+    shown with the label (partitions: device → mount point).
+    """
+
+    task: str
+    keys: Optional[Callable[[Sample], Dict[str, str]]]
+    get: Callable[..., float]
+
+
+SECTIONS: Dict[str, Section] = {
+    "cpu": Section(
+        "cpu",
+        lambda s: {core: core for core in s.cpu.get("cores", {})},
+        lambda s, core, field: s.cpu["cores"][core],
+    ),
+    "load": Section("uptime", None, lambda s, field: s.load[field]),
+    "memory": Section("memory", None, _memory_field),
+    "swap": Section("disk", None, lambda s, field: s.disk["swap"][field]),
+    "disk": Section(
+        "disk",
+        lambda s: {dev: dev for dev in s.disk.get("disks", {})},
+        lambda s, dev, field: s.disk["disks"][dev][field],
+    ),
+    "partition": Section(
+        "partitions",
+        lambda s: {
+            dev: p.get("mount", dev)
+            for dev, p in s.disk.get("partitions", {}).items()
+        },
+        lambda s, dev, field: s.disk["partitions"][dev][field],
+    ),
+    "net": Section(
+        "network",
+        lambda s: {iface: iface for iface in s.network},
+        lambda s, iface, field: s.network[iface][field],
+    ),
+}
+
+
+# `cpu total` / `cpu.total` is the one unkeyed cpu selector
+CPU_TOTAL = Section("cpu", None, lambda s, field: s.cpu[field])
+
+
+# ================= RULES =================
+class Rule:
+    """
+    One parsed line of the rules file.
+    """
+
+    def __init__(
+        self,
+        text: str,
+        section: str,
+        key: Optional[str],
+        field: str,
+        op: str,
+        threshold: float,
+        duration: float = 0.0,
+        rate: bool = False,
+    ) -> None:
+        self.text = text
+        self.section = SECTIONS[section]
+        self.section_name = section
+        self.key = key
+        self.field = field
+        self.op = OPS[op]
+        self.op_text = op
+        self.threshold = threshold
+        self.duration = duration
+        self.rate = rate
+
+    @property
+    def keyed(self) -> bool:
+        return self.section.keys is not None
+
+    def name(self, label: Optional[str] = None) -> str:
+        if label is None or self.key != "*":
+            return self.text
+        return self.text.replace("*", label, 1)
+
+    def select(
+        self,
+        keys: Dict[str, str],
+        lookup: Dict[str, str],
+    ) -> List[Tuple[str, str]]:
+        """
+        [(key, label), ...] this rule applies to, given a section's keys
+        and its key-or-label → key index.
+        """
+        if self.key == "*":
+            return sorted(keys.items())
+        key = lookup.get(self.key)
+        return [] if key is None else [(key, keys[key])]
+
+    @classmethod
+    def parse(cls, line: str) -> "Rule":
+        text = " ".join(line.split())
+        tokens = text.split()
+
+        duration = 0.0
+        if len(tokens) >= 2 and tokens[-2] == "for":
+            duration = parse_duration(tokens[-1])
+            tokens = tokens[:-2]
+
+        if len(tokens) < 3 or tokens[-2] not in OPS:
+            raise RuleError(f"expected `SELECTOR OP THRESHOLD`: {line!r}")
+        try:
+            threshold = float(tokens[-1])
+        except ValueError:
+            raise RuleError(f"bad threshold {tokens[-1]!r}") from None
+        op = tokens[-2]
+        head = tokens[:-2]
+
+        rate = head[-1] == "rate"
+        if rate:
+            head = head[:-1]
+        if not head:
+            raise RuleError(f"missing selector: {line!r}")
+
+        # cpu.total / load.1min → cpu total / load 1min
+        if len(head) == 1 and "." in head[0]:
+            head = head[0].split(".")
+
+        section, args = head[0], head[1:]
+        if section not in SECTIONS:
+            raise RuleError(
+                f"unknown section {section!r} (expected one of {', '.join(SECTIONS)})"
+            )
+
+        if section == "cpu":
+            # cpu total | cpu <core> | cpu *
+            if len(args) != 1:
+                raise RuleError(f"expected `cpu total` or `cpu <core|*>`: {line!r}")
+            if args[0] == "total":
+                rule = cls(text, section, None, "total", op, threshold, duration, rate)
+                rule.section = CPU_TOTAL
+                return rule
+            return cls(text, section, args[0], "", op, threshold, duration, rate)
+
+        if SECTIONS[section].keys is None:
+            if len(args) != 1:
+                raise RuleError(f"expected `{section} <field>`: {line!r}")
+            return cls(text, section, None, args[0], op, threshold, duration, rate)
+
+        if len(args) != 2:
+            raise RuleError(f"expected `{section} <name|*> <field>`: {line!r}")
+        return cls(text, section, args[0], args[1], op, threshold, duration, rate)
+
+
+def load_rules(path: str) -> List[Rule]:
+    rules: List[Rule] = []
+    with open(path, encoding="utf-8") as file:
+        for number, line in enumerate(file, 1):
+            line = line.split("#", 1)[0].strip()
+            if not line:
+                continue
+            try:
+                rules.append(Rule.parse(line))
+            except RuleError as exc:
+                raise RuleError(f"{path}:{number}: {exc}") from None
+    return rules
+
+
+class AlertEvent(NamedTuple):
+    name: str
+    state: str          # firing | resolved
+    value: Optional[float]
+    timestamp: float
+    since: float        # when the condition first held
+    rule: str = ""      # rule line the instance belongs to
+
+    @property
+    def key(self) -> Tuple[str, str]:
+        # Two rules can expand to the same name (`partition / pct > 90`
+        # and `partition * pct > 90` on "/"), so names alone collide
+        return self.rule, self.name
+
+
+class RuleInstance:
+    """
+    State machine for one rule on one core / disk / interface.
+    """
+
+    __slots__ = ("rule", "name", "getter", "state", "since", "value", "_prev")
+
+    def __init__(
+        self,
+        rule: Rule,
+        key: Optional[str] = None,
+        label: Optional[str] = None,
+    ) -> None:
+        self.rule = rule
+        self.name = rule.name(label)
+
+        get, field = rule.section.get, rule.field
+        if key is None:
+            self.getter = lambda s: get(s, field)
+        else:
+            self.getter = lambda s: get(s, key, field)
+
+        self.state = STATE_OK
+        self.since = 0.0
+        self.value: Optional[float] = None
+        self._prev: Optional[Tuple[float, float]] = None
+
+    def step(self, ts: float, sample: Sample) -> Optional[AlertEvent]:
+        rule = self.rule
+        try:
+            value: Optional[float] = float(self.getter(sample))
+        except (KeyError, TypeError, ValueError):
+            value = None
+
+        if rule.rate and value is not None:
+            prev, self._prev = self._prev, (ts, value)
+            if prev is None or ts <= prev[0] or value < prev[1]:
+                # First reading, or the counter was reset
+                value = None
+            else:
+                value = (value - prev[1]) / (ts - prev[0])
+
+        self.value = value
+        holds = value is not None and rule.op(value, rule.threshold)
+
+        if holds:
+            if self.state == STATE_OK:
+                self.state = STATE_PENDING
+                self.since = ts
+            if self.state == STATE_PENDING and ts - self.since >= rule.duration:
+                self.state = STATE_FIRING
+                return AlertEvent(
+                    self.name, STATE_FIRING, value, ts, self.since, rule.text
+                )
+            return None
+
+        if self.state == STATE_FIRING:
+            self.state = STATE_OK
+            return AlertEvent(
+                self.name, STATE_RESOLVED, value, ts, self.since, rule.text
+            )
+        self.state = STATE_OK
+        return None
+
+    def resolve(self, ts: float) -> Optional[AlertEvent]:
+        firing = self.state == STATE_FIRING
+        self.state = STATE_OK
+        if firing:
+            return AlertEvent(
+                self.name, STATE_RESOLVED, None, ts, self.since, self.rule.text
+            )
+        return None
+
+
+# ================= ENGINE =================
+class AlertEngine:
+    """
+    Evaluates rules against each Sample and hands events to sinks.
+
+    Meant to be a CollectorThread listener (evaluation never runs on the
+    UI thread). `firing` is replaced, never mutated, so other threads
+    can read it without locking. A sink that raises is counted in
+    `sink_errors` and never stops evaluation or the other sinks.
+    """
+
+    def __init__(self, rules: Sequence[Rule], sinks: Sequence[Callable] = ()) -> None:
+        # The same line twice would be one alert counted twice
+        unique: Dict[str, Rule] = {}
+        for rule in rules:
+            unique.setdefault(rule.text, rule)
+        self.rules = list(unique.values())
+        self.sinks = list(sinks)
+
+        self._by_task: Dict[str, List[Rule]] = {}
+        self._instances: Dict[Rule, List[RuleInstance]] = {}
+        self._expanded: Dict[Rule, Tuple[Tuple[str, str], ...]] = {}
+
+        # section -> (version, keys, key-or-label → key); the version moves
+        # only when the section's keys change, and a rule is re-expanded
+        # only when it has not seen the current version
+        self._keys: Dict[str, Tuple[int, Dict[str, str], Dict[str, str]]] = {}
+        self._versions: Dict[Rule, int] = {}
+
+        for rule in self.rules:
+            self._by_task.setdefault(rule.section.task, []).append(rule)
+            # Keyed rules get their instances once the keys are known
+            self._instances[rule] = [] if rule.keyed else [RuleInstance(rule)]
+
+        # (rule, name) -> (since, value) of alerts currently firing
+        self.firing: Dict[Tuple[str, str], Tuple[float, Optional[float]]] = {}
+        self.evaluations = 0
+
+        # sink -> exceptions it raised
+        self.sink_errors: Dict[Callable, int] = {}
+
+    def _section_keys(
+        self,
+        name: str,
+        section: Section,
+        sample: Sample,
+    ) -> Tuple[int, Dict[str, str], Dict[str, str]]:
+        """
+        Current (version, keys, index) of a keyed section. The index is
+        rebuilt only when the keys changed.
+        """
+        keys = section.keys(sample)
+        cached = self._keys.get(name)
+        if cached is not None and cached[1] == keys:
+            return cached
+
+        # Rules may name a key or its label; a key wins over a label
+        lookup: Dict[str, str] = {}
+        for key, label in keys.items():
+            lookup.setdefault(label, key)
+        lookup.update((key, key) for key in keys)
+
+        cached = self._keys[name] = (
+            cached[0] + 1 if cached is not None else 1,
+            keys,
+            lookup,
+        )
+        return cached
+
+    def _expand(
+        self,
+        rule: Rule,
+        keys: Dict[str, str],
+        lookup: Dict[str, str],
+        ts: float,
+        events: List[AlertEvent],
+    ) -> None:
+        """
+        (Re)creates a keyed rule's instances when the set of cores /
+        disks / partitions / interfaces changed. Instances that still
+        apply keep their state; vanished ones resolve.
+        """
+        selected = tuple(rule.select(keys, lookup))
+        if self._expanded.get(rule) == selected:
+            return
+        self._expanded[rule] = selected
+
+        current = {instance.name: instance for instance in self._instances[rule]}
+        instances: List[RuleInstance] = []
+        for key, label in selected:
+            instance = current.pop(rule.name(label), None)
+            if instance is None:
+                instance = RuleInstance(rule, key, label)
+            instances.append(instance)
+
+        for gone in current.values():
+            event = gone.resolve(ts)
+            if event is not None:
+                events.append(event)
+
+        self._instances[rule] = instances
+
+    def evaluate(self, sample: Sample) -> List[AlertEvent]:
+        ts = sample.timestamp
+        events: List[AlertEvent] = []
+        # Each keyed section is listed once per tick, not once per rule
+        sections: Dict[str, Tuple[int, Dict[str, str], Dict[str, str]]] = {}
+
+        for task in sample.updated:
+            for rule in self._by_task.get(task, ()):
+                if rule.keyed:
+                    name = rule.section_name
+                    current = sections.get(name)
+                    if current is None:
+                        current = sections[name] = self._section_keys(
+                            name, rule.section, sample
+                        )
+                    version, keys, lookup = current
+                    if self._versions.get(rule) != version:
+                        self._versions[rule] = version
+                        self._expand(rule, keys, lookup, ts, events)
+
+                for instance in self._instances[rule]:
+                    self.evaluations += 1
+                    event = instance.step(ts, sample)
+                    if event is not None:
+                        events.append(event)
+
+        if events:
+            firing = dict(self.firing)
+            for event in events:
+                if event.state == STATE_FIRING:
+                    firing[event.key] = (event.since, event.value)
+                else:
+                    firing.pop(event.key, None)
+            self.firing = firing
+
+            for sink in self.sinks:
+                for event in events:
+                    try:
+                        sink(event)
+                    except Exception:
+                        self.sink_errors[sink] = self.sink_errors.get(sink, 0) + 1
+
+        return events
+
+    def update(self, sample: Sample) -> None:
+        """
+        CollectorThread listener.
+        """
+        self.evaluate(sample)
+
+    def summary(self, limit: int = 2) -> str:
+        """
+        Short text for the header bar, "" when nothing fires.
+        """
+        firing = self.firing
+        if not firing:
+            return ""
+        keys = sorted(firing, key=lambda key: firing[key][0])
+        names = [name for _, name in keys]
+        shown = ", ".join(names[:limit])
+        more = f" +{len(names) - limit}" if len(names) > limit else ""
+        return f"⚠ {len(names)} alert{'s' if len(names) != 1 else ''}: {shown}{more}"
+
+
+# ================= SINKS =================
+def _event_dict(event: AlertEvent) -> Dict[str, object]:
+    return {
+        "name": event.name,
+        "state": event.state,
+        "value": event.value,
+        "timestamp": event.timestamp,
+        "since": event.since,
+        "rule": event.rule,
+    }
+
+
+class FileSink:
+    """
+    Appends one JSON line per event (file opened once, line buffered).
+
+    Events that cannot be written (disk full, ...) are counted in
+    `dropped`.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.dropped = 0
+        self._file = open(path, "a", encoding="utf-8", buffering=1)
+        self._lock = threading.Lock()
+
+    def __call__(self, event: AlertEvent) -> None:
+        line = json.dumps(_event_dict(event), separators=(",", ":"))
+        with self._lock:
+            try:
+                self._file.write(line + "\n")
+            except OSError:
+                self.dropped += 1
+
+    def close(self) -> None:
+        self._file.close()
+
+
+class CommandSink:
+    """
+    Runs a shell command per event without waiting for it.
+
+    The event is passed as MTOP_ALERT_NAME / _STATE / _VALUE / _SINCE /
+    _RULE environment variables and as JSON on stdin. At most MAX_RUNNING
+    commands run at once; further events are counted in `dropped`.
+    """
+
+    MAX_RUNNING = 8
+
+    def __init__(self, command: str) -> None:
+        self.command = command
+        self.dropped = 0
+        self._running: List[subprocess.Popen] = []
+
+    def __call__(self, event: AlertEvent) -> None:
+        self._running = [proc for proc in self._running if proc.poll() is None]
+        if len(self._running) >= self.MAX_RUNNING:
+            self.dropped += 1
+            return
+
+        env = dict(os.environ)
+        env.update({
+            "MTOP_ALERT_NAME": event.name,
+            "MTOP_ALERT_STATE": event.state,
+            "MTOP_ALERT_VALUE": "" if event.value is None else repr(event.value),
+            "MTOP_ALERT_SINCE": repr(event.since),
+            "MTOP_ALERT_RULE": event.rule,
+        })
+
+        try:
+            proc = subprocess.Popen(
+                self.command,
+                shell=True,
+                env=env,
+                stdin=subprocess.PIPE,
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL,
+                start_new_session=True,
+            )
+        except OSError:
+            self.dropped += 1
+            return
+
+        try:
+            proc.stdin.write(json.dumps(_event_dict(event)).encode("utf-8"))
+            proc.stdin.close()
+        except OSError:
+            pass
+        self._running.append(proc)
+
+
+def build_engine(
+    rules_path: str,
+    command: Optional[str] = None,
+    log_path: Optional[str] = None,
+) -> AlertEngine:
+    sinks: List[Callable] = []
+    if command:
+        sinks.append(CommandSink(command))
+    if log_path:
+        sinks.append(FileSink(log_path))
+    return AlertEngine(load_rules(rules_path), sinks)
@@ -0,0 +1,149 @@
+"""
+Startup benchmark for mtop
+
+    python -m shm.bench                       → min / median of every step
+    python -m shm.bench --save base.json      → also keep the minimums
+    python -m shm.bench --compare base.json   → exit 1 on a regression
+
+Every run of every step happens in a fresh interpreter, so module
+caches never hide an import that got slower. Times are taken inside
+the child around the step alone (interpreter start-up is left out).
+Baselines hold the fastest run: on a busy machine the minimum moves far
+less than the median, so a regression stands out from the noise.
+Steps whose imports are missing (e.g. Textual on a headless box) are
+reported as skipped.
+"""
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+from typing import Dict, List, Optional, Tuple
+
+# (name, setup, timed statement)
+STEPS: Tuple[Tuple[str, str, str], ...] = (
+    ("import shm.cli", "", "import shm.cli"),
+    ("import shm.collector", "", "import shm.collector"),
+    ("import shm.ui.layout", "", "import shm.ui.layout"),
+    (
+        "SystemMonitor()",
+        "from shm.ui.layout import SystemMonitor",
+        "SystemMonitor(persist_history=False)",
+    ),
+    (
+        "first sample (UI)",
+        "from shm.collector import Collector\n"
+        "collector = Collector(defer_expensive=True)",
+        "collector.collect()",
+    ),
+    (
+        "first full tick",
+        "from shm.collector import Collector\n"
+        "collector = Collector()",
+        "collector.collect()",
+    ),
+)
+
+_CHILD = """\
+import time
+{setup}
+started = time.perf_counter()
+{stmt}
+print(time.perf_counter() - started)
+"""
+
+
+def run_step(setup: str, stmt: str) -> Optional[float]:
+    """
+    Seconds `stmt` took in a fresh interpreter (None if it cannot run).
+    """
+    result = subprocess.run(
+        [sys.executable, "-c", _CHILD.format(setup=setup, stmt=stmt)],
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode != 0:
+        if "ModuleNotFoundError" in result.stderr:
+            return None
+        raise RuntimeError(result.stderr.strip().splitlines()[-1])
+    return float(result.stdout.split()[-1])
+
+
+def measure(runs: int) -> Dict[str, Optional[List[float]]]:
+    """
+    {step: [milliseconds per run]} (None = skipped).
+    """
+    results: Dict[str, Optional[List[float]]] = {}
+    for name, setup, stmt in STEPS:
+        times: List[float] = []
+        for _ in range(runs):
+            seconds = run_step(setup, stmt)
+            if seconds is None:
+                break
+            times.append(seconds * 1000)
+        results[name] = times or None
+    return results
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(
+        prog="python -m shm.bench",
+        description="Import and startup times of mtop",
+    )
+    parser.add_argument("--runs", type=int, default=7, help="runs per step (default: 7)")
+    parser.add_argument("--save", metavar="PATH", help="write the minimums as JSON")
+    parser.add_argument(
+        "--compare",
+        metavar="PATH",
+        help="minimums saved earlier; exit 1 if a step got slower",
+    )
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=1.5,
+        help="allowed slowdown factor against --compare (default: 1.5)",
+    )
+    parser.add_argument(
+        "--slack-ms",
+        type=float,
+        default=2.0,
+        help="slowdowns smaller than this are noise (default: 2 ms)",
+    )
+    args = parser.parse_args(argv)
+
+    baseline: Dict[str, float] = {}
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as file:
+            baseline = json.load(file)
+
+    best: Dict[str, float] = {}
+    regressions: List[str] = []
+
+    print(f"{'STEP':<24}{'min ms':>9}{'median ms':>11}{'baseline':>10}")
+    for name, times in measure(args.runs).items():
+        if times is None:
+            print(f"{name:<24}{'skipped (missing module)':>30}")
+            continue
+
+        fastest = best[name] = min(times)
+        line = f"{name:<24}{fastest:>9.1f}{statistics.median(times):>11.1f}"
+
+        base = baseline.get(name)
+        if base is not None:
+            line += f"{base:>10.1f}"
+            if fastest > base * args.tolerance and fastest - base > args.slack_ms:
+                line += "  REGRESSION"
+                regressions.append(name)
+        print(line)
+
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as file:
+            json.dump(best, file, indent=2)
+
+    if regressions:
+        sys.exit(f"slower than {args.compare}: {', '.join(regressions)}")
+
+
+if __name__ == "__main__":
+    main()
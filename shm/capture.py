@@ -0,0 +1,323 @@
+"""
+Record and replay raw /proc snapshots
+
+    mtop record -o incident.mtr.gz     capture every /proc file the
+                                       providers read, once per tick
+    mtop replay incident.mtr.gz        feed it back through the same
+                                       providers (TUI or --headless)
+
+A capture is gzip-compressed JSON lines: one header line, then one frame
+per tick holding the raw text of each file, when it was read, the /proc
+directory listing and (when refreshed) partition capacity, which comes
+from statvfs() rather than /proc and cannot be re-derived later.
+"""
+
+import gzip
+import json
+import socket
+import sys
+import time
+from typing import Dict, Iterator, List, Optional, TextIO, Tuple
+
+from shm.collector import Collector, Sample
+from shm.core.snapshot import LiveSource, TickSnapshot
+from shm.scheduler import COST_CHEAP
+
+FORMAT = "mtop-capture"
+VERSION = 1
+
+# Replay runs every task on every frame; the frame decides what exists
+REPLAY_INTERVAL = 1e-9
+
+
+# ================= SOURCES =================
+class RecordingSource(LiveSource):
+    """
+    Live source that keeps a copy of everything read during one tick.
+    """
+
+    def __init__(self) -> None:
+        self.files: Dict[str, str] = {}
+        self.transient: Dict[str, str] = {}
+        self.dirs: Dict[str, List[str]] = {}
+
+    def read(self, path: str) -> str:
+        text = super().read(path)
+        self.files[path] = text
+        return text
+
+    def read_transient(self, path: str, max_size: Optional[int] = None) -> bytes:
+        data = super().read_transient(path, max_size)
+        # latin-1 maps bytes 1:1 onto code points → lossless through JSON
+        self.transient[path] = data.decode("latin-1")
+        return data
+
+    def listdir(self, path: str) -> List[str]:
+        entries = super().listdir(path)
+        self.dirs[path] = entries
+        return entries
+
+
+class ReplaySource(LiveSource):
+    """
+    Serves one recorded frame; anything not recorded does not exist.
+
+    now() returns the recorded read time of the file read last, so rates
+    are computed exactly as they were on the original host.
+    """
+
+    def __init__(self, frame: Dict[str, object]) -> None:
+        self.frame = frame
+        self._now: float = frame["t"]
+
+    def now(self) -> float:
+        return self._now
+
+    def clock(self) -> float:
+        # Replayed tasks are scheduled on recorded time
+        return self.frame["t"]
+
+    def read(self, path: str) -> str:
+        try:
+            read_at, text = self.frame["files"][path]
+        except KeyError:
+            raise FileNotFoundError(path) from None
+        self._now = read_at
+        return text
+
+    def read_transient(self, path: str, max_size: Optional[int] = None) -> bytes:
+        try:
+            data = self.frame["transient"][path].encode("latin-1")
+        except KeyError:
+            raise FileNotFoundError(path) from None
+        return data if max_size is None else data[:max_size]
+
+    def listdir(self, path: str) -> List[str]:
+        try:
+            return list(self.frame["dirs"][path])
+        except KeyError:
+            raise FileNotFoundError(path) from None
+
+
+def build_frame(
+    tick: TickSnapshot,
+    source: RecordingSource,
+    partitions: Optional[Dict[str, Dict[str, object]]] = None,
+) -> Dict[str, object]:
+    """
+    Turns what `source` recorded during `tick` into one frame.
+    """
+    frame: Dict[str, object] = {
+        "t": tick.timestamp,
+        "files": {
+            path: [tick.read_time(path), text]
+            for path, text in source.files.items()
+        },
+        "transient": source.transient,
+        "dirs": source.dirs,
+    }
+    if partitions is not None:
+        frame["partitions"] = partitions
+    return frame
+
+
+def collect_recorded(
+    collector: Collector,
+) -> Tuple[Sample, Dict[str, object]]:
+    """
+    Runs one live tick while recording it → (sample, frame).
+    """
+    source = RecordingSource()
+    tick = TickSnapshot(source)
+    sample = collector.collect(tick)
+
+    partitions = (
+        sample.disk.get("partitions")
+        if "partitions" in sample.updated
+        else None
+    )
+    return sample, build_frame(tick, source, partitions)
+
+
+# ================= FILE FORMAT =================
+class CaptureWriter:
+    """
+    Appends frames to a gzip-compressed JSON-lines capture.
+    """
+
+    def __init__(self, path: str, interval: float, processes: bool = True) -> None:
+        self._file = gzip.open(path, "wt", encoding="utf-8", compresslevel=6)
+        self._encode = json.JSONEncoder(separators=(",", ":")).encode
+
+        self._write({
+            "format": FORMAT,
+            "version": VERSION,
+            "host": socket.gethostname(),
+            "interval": interval,
+            "processes": processes,
+        })
+
+    def _write(self, record: Dict[str, object]) -> None:
+        self._file.write(self._encode(record))
+        self._file.write("\n")
+
+    def write_frame(self, frame: Dict[str, object]) -> None:
+        self._write(frame)
+
+    def close(self) -> None:
+        self._file.close()
+
+
+def read_capture(path: str) -> Iterator[Dict[str, object]]:
+    """
+    Yields the header, then every frame of a capture.
+    """
+    with gzip.open(path, "rt", encoding="utf-8") as file:
+        header = json.loads(file.readline() or "{}")
+        if header.get("format") != FORMAT:
+            raise ValueError(f"{path}: not an mtop capture")
+        if header.get("version") != VERSION:
+            raise ValueError(
+                f"{path}: unsupported capture version {header.get('version')}"
+            )
+        yield header
+
+        for line in file:
+            if line.strip():
+                yield json.loads(line)
+
+
+# ================= RECORD =================
+def record(
+    path: str,
+    interval: float = 1.0,
+    count: Optional[int] = None,
+    processes: bool = True,
+) -> int:
+    """
+    Records `count` ticks (or until interrupted). Returns frames written.
+    """
+    intervals = {name: interval for name in Collector.DEFAULT_SCHEDULE}
+    intervals["partitions"] = max(
+        interval, Collector.DEFAULT_SCHEDULE["partitions"][0]
+    )
+    if not processes:
+        intervals["processes"] = 0
+
+    collector = Collector(intervals=intervals)
+    writer = CaptureWriter(path, interval, processes)
+
+    frames = 0
+    try:
+        while count is None or frames < count:
+            _, frame = collect_recorded(collector)
+            writer.write_frame(frame)
+            frames += 1
+
+            if count is not None and frames >= count:
+                break
+
+            time.sleep(max(collector.next_deadline() - time.monotonic(), 0.0))
+    finally:
+        writer.close()
+
+    return frames
+
+
+# ================= REPLAY =================
+class FrameCollector:
+    """
+    Runs the providers on recorded frames instead of on /proc.
+    """
+
+    def __init__(self, processes: bool = True) -> None:
+        intervals = {name: REPLAY_INTERVAL for name in Collector.DEFAULT_SCHEDULE}
+        if not processes:
+            intervals["processes"] = 0
+
+        self.collector = Collector(intervals=intervals)
+        self.overhead = self.collector.overhead
+
+        # Partition capacity comes from the frames, not from statvfs here
+        self._partitions: Dict[str, Dict[str, object]] = {}
+        self.collector.scheduler.add(
+            "partitions",
+            lambda tick: self._partitions,
+            REPLAY_INTERVAL,
+            COST_CHEAP,
+        )
+
+    def collect_frame(self, frame: Dict[str, object]) -> Sample:
+        if "partitions" in frame:
+            self._partitions = frame["partitions"]
+        return self.collector.collect(TickSnapshot(ReplaySource(frame)))
+
+
+class ReplayCollector(FrameCollector):
+    """
+    Collector look-alike that plays a capture instead of reading /proc.
+
+    Works anywhere a Collector does (CollectorThread, headless output).
+    `speed` scales recorded time: 1 = real time, 10 = ten times faster,
+    0 = as fast as possible. collect() raises EOFError at the end.
+    """
+
+    def __init__(self, path: str, speed: float = 1.0) -> None:
+        self.path = path
+        self.speed = speed
+
+        self._frames = read_capture(path)
+        self.header = next(self._frames)
+
+        super().__init__(processes=self.header.get("processes", True))
+
+        self._next: Optional[Dict[str, object]] = next(self._frames, None)
+        self._first_t: Optional[float] = None
+        self._started: float = 0.0
+
+        self.frames = 0
+
+    def next_deadline(self) -> float:
+        """
+        time.monotonic() at which the next frame is due.
+        """
+        if self._next is None or self._first_t is None or self.speed <= 0:
+            return 0.0
+        return self._started + (self._next["t"] - self._first_t) / self.speed
+
+    def collect(self) -> Sample:
+        frame = self._next
+        if frame is None:
+            raise EOFError(f"{self.path}: end of capture")
+
+        if self._first_t is None:
+            self._first_t = frame["t"]
+            self._started = time.monotonic()
+
+        sample = self.collect_frame(frame)
+
+        self.frames += 1
+        self._next = next(self._frames, None)
+        return sample
+
+
+def replay_headless(
+    path: str,
+    speed: float = 1.0,
+    out: TextIO = sys.stdout,
+) -> None:
+    """
+    Replays to JSON lines on `out`; throughput summary on stderr.
+    """
+    from shm.headless import stream
+
+    replay = ReplayCollector(path, speed)
+
+    started = time.perf_counter()
+    stream(replay, out=out)
+    elapsed = time.perf_counter() - started
+
+    rate = replay.frames / elapsed if elapsed > 0 else 0.0
+    sys.stderr.write(
+        f"replayed {replay.frames} frames in {elapsed:.3f}s ({rate:.1f} frames/s)\n"
+    )
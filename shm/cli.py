@@ -0,0 +1,603 @@
+"""
+Command line entry point for mtop
+
+    mtop                 → Textual UI
+    mtop collect         → headless collector (JSON lines on stdout)
+    mtop --headless      → same as `mtop collect`
+    mtop record          → capture raw /proc snapshots to a file
+    mtop replay FILE     → play a capture back (TUI or --headless)
+    mtop export          → stream samples to a file as JSON lines / CSV
+    mtop serve           → headless Prometheus exporter
+    mtop agent           → stream this host to remote viewers
+    mtop connect HOST    → watch a remote agent (TUI or --headless)
+    mtop fleet HOST...   → summary view of many agents
+    mtop --prometheus ADDR  → TUI plus the exporter on ADDR
+
+The TUI is imported only when it is actually started, so headless
+commands never load Textual.
+"""
+
+import argparse
+import sys
+from typing import List, Optional, Tuple
+
+
+def _positive_float(value: str) -> float:
+    number = float(value)
+    if number <= 0:
+        raise argparse.ArgumentTypeError("must be greater than 0")
+    return number
+
+
+def _speed(value: str) -> float:
+    if value == "max":
+        return 0.0
+    number = float(value.rstrip("x"))
+    if number <= 0:
+        raise argparse.ArgumentTypeError("must be greater than 0 or 'max'")
+    return number
+
+
+def _size(value: str) -> int:
+    units = {"k": 1024, "m": 1024 ** 2, "g": 1024 ** 3}
+    factor = units.get(value[-1:].lower(), 1)
+    number = value[:-1] if factor > 1 else value
+    try:
+        size = int(float(number) * factor)
+    except ValueError:
+        raise argparse.ArgumentTypeError("expected a size like 500K, 10M or 1G") from None
+    if size <= 0:
+        raise argparse.ArgumentTypeError("must be greater than 0")
+    return size
+
+
+def _address(value: str) -> Tuple[str, int]:
+    from shm.remote.protocol import split_address
+
+    if value.isdigit():
+        host, port = "", value
+    else:
+        try:
+            host, port = split_address(value)
+        except ValueError as exc:
+            raise argparse.ArgumentTypeError(str(exc)) from None
+    if port is None or not port.isdigit() or not 0 < int(port) < 65536:
+        raise argparse.ArgumentTypeError("expected HOST:PORT, [IPV6]:PORT or PORT")
+    return host or "127.0.0.1", int(port)
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="mtop",
+        description="Modern Linux system monitor",
+        epilog="--headless without a command runs `collect`; -i, -n and "
+               "--no-processes before it are collect's options.",
+    )
+    parser.add_argument(
+        "--history-file",
+        metavar="PATH",
+        default=None,
+        help="persistent graph history (default: ~/.local/state/mtop/history.bin)",
+    )
+    parser.add_argument(
+        "--no-history",
+        action="store_true",
+        help="keep graph history in memory only",
+    )
+    parser.add_argument(
+        "--prometheus",
+        metavar="HOST:PORT",
+        type=_address,
+        default=None,
+        help="also serve Prometheus metrics at http://HOST:PORT/metrics",
+    )
+    parser.add_argument(
+        "--alerts",
+        metavar="RULES",
+        default=None,
+        help="alert rules file; firing alerts show in the header",
+    )
+    parser.add_argument(
+        "--alert-command",
+        metavar="CMD",
+        default=None,
+        help="shell command run per alert event (details in MTOP_ALERT_* env vars)",
+    )
+    parser.add_argument(
+        "--alert-log",
+        metavar="PATH",
+        default=None,
+        help="append alert events to this file as JSON lines",
+    )
+    parser.add_argument(
+        "--min-interval",
+        metavar="SECONDS",
+        type=_positive_float,
+        default=0.2,
+        help="fastest refresh, e.g. with a fullscreen panel open (default: 0.2)",
+    )
+    parser.add_argument(
+        "--max-interval",
+        metavar="SECONDS",
+        type=_positive_float,
+        default=10.0,
+        help="slowest refresh when unfocused or idle (default: 10)",
+    )
+
+    # ---------------- --headless ----------------
+    # Own dests: subcommands set interval / count / headless themselves
+    alias = parser.add_argument_group("without a command")
+    alias.add_argument(
+        "--headless",
+        dest="alias_headless",
+        action="store_true",
+        help="print JSON lines instead of starting the UI (same as `collect`); "
+             "also accepted before `replay` and `connect`",
+    )
+    alias.add_argument(
+        "-i", "--interval",
+        dest="alias_interval",
+        metavar="SECONDS",
+        type=_positive_float,
+        default=None,
+        help="with --headless: seconds between samples (default: 1)",
+    )
+    alias.add_argument(
+        "-n", "--count",
+        dest="alias_count",
+        metavar="N",
+        type=int,
+        default=None,
+        help="with --headless: stop after this many samples",
+    )
+    alias.add_argument(
+        "--no-processes",
+        dest="alias_no_processes",
+        action="store_true",
+        help="with --headless: skip the per-process scan",
+    )
+
+    commands = parser.add_subparsers(dest="command")
+
+    # ---------------- COLLECT ----------------
+    collect = commands.add_parser(
+        "collect",
+        help="run the collector without the UI and print JSON lines",
+    )
+    collect.add_argument(
+        "-i", "--interval",
+        type=_positive_float,
+        default=1.0,
+        help="seconds between samples (default: 1)",
+    )
+    collect.add_argument(
+        "-n", "--count",
+        type=int,
+        default=None,
+        help="stop after this many samples (default: run forever)",
+    )
+    collect.add_argument(
+        "--no-processes",
+        action="store_true",
+        help="skip the per-process scan (cheapest mode)",
+    )
+
+    # ---------------- RECORD ----------------
+    rec = commands.add_parser(
+        "record",
+        help="capture raw /proc snapshots to a compressed file",
+    )
+    rec.add_argument(
+        "-o", "--output",
+        required=True,
+        help="capture file to write (gzip JSON lines)",
+    )
+    rec.add_argument(
+        "-i", "--interval",
+        type=_positive_float,
+        default=1.0,
+        help="seconds between snapshots (default: 1)",
+    )
+    rec.add_argument(
+        "-n", "--count",
+        type=int,
+        default=None,
+        help="stop after this many snapshots (default: until Ctrl+C)",
+    )
+    rec.add_argument(
+        "--no-processes",
+        action="store_true",
+        help="do not capture per-process files (much smaller captures)",
+    )
+
+    # ---------------- REPLAY ----------------
+    rep = commands.add_parser(
+        "replay",
+        help="play a capture back through the providers",
+    )
+    rep.add_argument("capture", help="file written by `mtop record`")
+    rep.add_argument(
+        "-s", "--speed",
+        type=_speed,
+        default=1.0,
+        help="playback speed: 1 (real time), N / Nx (N times faster) or max",
+    )
+    rep.add_argument(
+        "--headless",
+        action="store_true",
+        help="print JSON lines instead of starting the UI",
+    )
+
+    # ---------------- EXPORT ----------------
+    export = commands.add_parser(
+        "export",
+        help="append samples to a file as JSON lines or CSV",
+    )
+    export.add_argument(
+        "-o", "--output",
+        default="-",
+        help="file to append to, - for stdout (default: -)",
+    )
+    export.add_argument(
+        "-f", "--format",
+        choices=("jsonl", "csv"),
+        default="jsonl",
+        help="output format (default: jsonl)",
+    )
+    export.add_argument(
+        "-i", "--interval",
+        type=_positive_float,
+        default=1.0,
+        help="seconds between samples (default: 1)",
+    )
+    export.add_argument(
+        "-n", "--count",
+        type=int,
+        default=None,
+        help="stop after this many samples (default: run forever)",
+    )
+    export.add_argument(
+        "--no-processes",
+        action="store_true",
+        help="skip the per-process scan",
+    )
+    export.add_argument(
+        "--batch",
+        type=int,
+        default=10,
+        help="samples queued before a write (default: 10)",
+    )
+    export.add_argument(
+        "--flush-interval",
+        type=float,
+        default=1.0,
+        help="max seconds a sample waits before it is written (default: 1)",
+    )
+    export.add_argument(
+        "--fsync",
+        choices=("never", "batch", "rotate"),
+        default="never",
+        help="when to fsync the file (default: never)",
+    )
+    export.add_argument(
+        "--max-bytes",
+        type=_size,
+        default=None,
+        help="rotate the file at this size, e.g. 50M (default: never)",
+    )
+    export.add_argument(
+        "--backups",
+        type=int,
+        default=5,
+        help="rotated files kept (default: 5)",
+    )
+
+    # ---------------- SERVE ----------------
+    serve = commands.add_parser(
+        "serve",
+        help="headless Prometheus exporter",
+    )
+    serve.add_argument(
+        "-l", "--listen",
+        metavar="HOST:PORT",
+        type=_address,
+        default=("127.0.0.1", 9105),
+        help="address to listen on (default: 127.0.0.1:9105)",
+    )
+
+    # ---------------- AGENT ----------------
+    agent = commands.add_parser(
+        "agent",
+        help="stream this host's samples to remote viewers",
+    )
+    agent.add_argument(
+        "-l", "--listen",
+        metavar="HOST:PORT",
+        type=_address,
+        default=("127.0.0.1", 9106),
+        help="address to listen on, e.g. 0.0.0.0:9106 (default: 127.0.0.1:9106)",
+    )
+    agent.add_argument(
+        "--fake",
+        metavar="N",
+        type=int,
+        default=0,
+        help="serve N fake agents on consecutive ports from one collector "
+             "(load testing `mtop fleet`)",
+    )
+    agent.add_argument(
+        "-i", "--interval",
+        type=_positive_float,
+        default=1.0,
+        help="sample interval of the fake agents (default: 1)",
+    )
+
+    # ---------------- CONNECT ----------------
+    connect = commands.add_parser(
+        "connect",
+        help="watch a host running `mtop agent`",
+    )
+    connect.add_argument(
+        "address",
+        metavar="HOST[:PORT]",
+        type=_remote,
+        help="agent address, IPv6 in brackets (default port: 9106)",
+    )
+    connect.add_argument(
+        "-i", "--interval",
+        type=_positive_float,
+        default=1.0,
+        help="seconds between samples (default: 1)",
+    )
+    connect.add_argument(
+        "--no-processes",
+        action="store_true",
+        help="do not ask the agent for per-process data",
+    )
+    connect.add_argument(
+        "--headless",
+        action="store_true",
+        help="print JSON lines instead of starting the UI",
+    )
+
+    # ---------------- FLEET ----------------
+    fleet = commands.add_parser(
+        "fleet",
+        help="watch many agents in one summary view",
+    )
+    fleet.add_argument(
+        "addresses",
+        metavar="HOST[:PORT[-PORT]]",
+        nargs="*",
+        help="agent addresses; a port range adds one host per port "
+             "(IPv6 in brackets: [::1]:9106)",
+    )
+    fleet.add_argument(
+        "-f", "--hosts-file",
+        default=None,
+        help="file with one address per line (# comments allowed)",
+    )
+    fleet.add_argument(
+        "-i", "--interval",
+        type=_positive_float,
+        default=1.0,
+        help="seconds between samples on every agent (default: 1)",
+    )
+
+    return parser
+
+
+def _remote(value: str) -> Tuple[str, int]:
+    from shm.remote.protocol import split_address
+
+    try:
+        host, port = split_address(value, "agent address")
+    except ValueError as exc:
+        raise argparse.ArgumentTypeError(str(exc)) from None
+    if not host:
+        raise argparse.ArgumentTypeError(f"bad agent address {value!r}: missing host")
+    if port is None:
+        return host, 9106
+    if not port.isdigit() or not 0 < int(port) < 65536:
+        raise argparse.ArgumentTypeError(
+            f"bad port {port!r} in agent address {value!r}"
+        )
+    return host, int(port)
+
+
+def _resolve_headless(
+    parser: argparse.ArgumentParser,
+    args: argparse.Namespace,
+) -> None:
+    """
+    Applies the top-level --headless options: `collect` without a
+    command, the command's own --headless with `replay` / `connect`.
+    """
+    collect_options = (
+        args.alias_interval is not None
+        or args.alias_count is not None
+        or args.alias_no_processes
+    )
+
+    if args.command is None:
+        if args.alias_headless:
+            args.command = "collect"
+            args.interval = args.alias_interval or 1.0
+            args.count = args.alias_count
+            args.no_processes = args.alias_no_processes
+        elif collect_options:
+            parser.error("-i, -n and --no-processes need --headless or a command")
+        return
+
+    if collect_options:
+        parser.error(f"put -i, -n and --no-processes after `{args.command}`")
+    if args.alias_headless:
+        if not hasattr(args, "headless"):
+            parser.error(f"--headless does not apply to `{args.command}`")
+        args.headless = True
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    _resolve_headless(parser, args)
+
+    try:
+        if args.command == "collect":
+            from shm.headless import run
+
+            run(
+                interval=args.interval,
+                count=args.count,
+                processes=not args.no_processes,
+            )
+        elif args.command == "export":
+            from shm.collector import Collector
+            from shm.export.stream import StreamExporter
+            from shm.headless import drive, uniform_intervals
+
+            exporter = StreamExporter(
+                args.output,
+                fmt=args.format,
+                batch=args.batch,
+                flush_interval=args.flush_interval,
+                fsync=args.fsync,
+                max_bytes=args.max_bytes,
+                backups=args.backups,
+            )
+            collector = Collector(
+                intervals=uniform_intervals(args.interval, not args.no_processes)
+            )
+            try:
+                drive(collector, exporter.update, args.count)
+            finally:
+                exporter.close()
+        elif args.command == "serve":
+            import asyncio
+
+            from shm.collector import Collector, CollectorThread
+            from shm.export.prometheus import PrometheusExporter
+
+            exporter = PrometheusExporter(*args.listen)
+            CollectorThread(Collector(), on_sample=exporter.update).start()
+            asyncio.run(exporter.serve_forever())
+        elif args.command == "agent":
+            import asyncio
+
+            from shm.remote.agent import Agent, FakeAgents
+
+            if args.fake > 0:
+                server = FakeAgents(
+                    *args.listen, count=args.fake, interval=args.interval
+                )
+            else:
+                server = Agent(*args.listen)
+            asyncio.run(server.serve_forever())
+        elif args.command == "connect":
+            from shm.remote.client import RemoteCollector
+
+            remote = RemoteCollector(
+                *args.address,
+                interval=args.interval,
+                processes=not args.no_processes,
+            )
+            try:
+                # Fail fast on a wrong address; later drops reconnect
+                remote.connect()
+            except OSError as exc:
+                sys.exit(f"mtop: cannot connect to {remote.host}:{remote.port}: {exc}")
+
+            if args.headless:
+                from shm.headless import stream
+
+                stream(remote)
+            else:
+                from shm.ui.app import main as run_tui
+
+                # Remote samples must not end up in this host's history
+                run_tui(persist_history=False, collector=remote)
+        elif args.command == "fleet":
+            from shm.remote.fleet import Fleet, parse_addresses
+
+            specs = list(args.addresses)
+            if args.hosts_file:
+                with open(args.hosts_file, encoding="utf-8") as file:
+                    for line in file:
+                        line = line.split("#", 1)[0].strip()
+                        if line:
+                            specs.append(line)
+            if not specs:
+                sys.exit("mtop fleet: no agent addresses given")
+
+            try:
+                addresses = parse_addresses(specs)
+            except ValueError as exc:
+                parser.error(f"fleet: {exc}")
+
+            from shm.ui.fleet import main as run_fleet
+
+            run_fleet(Fleet(addresses, interval=args.interval))
+        elif args.command == "record":
+            from shm.capture import record
+
+            record(
+                args.output,
+                interval=args.interval,
+                count=args.count,
+                processes=not args.no_processes,
+            )
+        elif args.command == "replay":
+            from shm.capture import ReplayCollector, replay_headless
+
+            if args.headless:
+                replay_headless(args.capture, speed=args.speed)
+            else:
+                from shm.ui.app import main as run_tui
+
+                # Replayed samples must not end up in persistent history
+                run_tui(
+                    persist_history=False,
+                    collector=ReplayCollector(args.capture, speed=args.speed),
+                )
+        else:
+            from shm.ui.app import main as run_tui
+
+            listeners = []
+            if args.prometheus is not None:
+                from shm.export.prometheus import PrometheusExporter
+
+                exporter = PrometheusExporter(*args.prometheus)
+                exporter.start_in_thread()
+                listeners.append(exporter.update)
+
+            if args.min_interval > args.max_interval:
+                sys.exit("mtop: --min-interval is larger than --max-interval")
+
+            alerts = None
+            if args.alerts:
+                from shm.alerts import RuleError, build_engine
+
+                try:
+                    alerts = build_engine(
+                        args.alerts, args.alert_command, args.alert_log
+                    )
+                except (OSError, RuleError) as exc:
+                    sys.exit(f"mtop: {exc}")
+
+            run_tui(
+                history_path=args.history_file,
+                persist_history=not args.no_history,
+                listeners=listeners,
+                alerts=alerts,
+                min_interval=args.min_interval,
+                max_interval=args.max_interval,
+            )
+    except KeyboardInterrupt:
+        pass
+    except BrokenPipeError:
+        # e.g. `mtop collect | head`
+        sys.stderr.close()
+
+
+if __name__ == "__main__":
+    main()
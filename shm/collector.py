@@ -0,0 +1,318 @@
+import threading
+import time
+from typing import Callable, Dict, FrozenSet, List, NamedTuple, Optional, Set
+
+from shm.core.cpu import CPUProvider
+from shm.core.disk import DiskProvider
+from shm.core.memory import MemoryProvider
+from shm.core.snapshot import TickSnapshot
+from shm.core.uptime import UptimeProvider
+from shm.metrics.cpu_calc import ProcessProvider
+from shm.metrics.mem_calc import MemoryCalcProvider
+from shm.metrics.net_calc import NetworkCalcProvider
+from shm.metrics.overhead import Overhead
+from shm.metrics.proc_scan import ProcessScanner, ProcessSnapshot
+from shm.scheduler import COST_CHEAP, COST_EXPENSIVE, Scheduler
+
+
+class Sample(NamedTuple):
+    """
+    Everything collected in one tick.
+
+    Built fresh every tick and never mutated once published, so it can
+    be handed across threads without copying.
+    """
+
+    seq: int
+    timestamp: float
+    duration: float           # seconds spent collecting
+    updated: FrozenSet[str]   # scheduler tasks refreshed in this tick
+    uptime: str
+    load: Dict[str, float]
+    cpu: Dict[str, object]
+    top_cpu: List[Dict[str, object]]
+    memory: Dict[str, int]
+    top_memory: List[Dict[str, object]]
+    disk: Dict[str, object]
+    network: Dict[str, Dict[str, float]]
+    processes: Optional[ProcessSnapshot]
+
+    def to_dict(self) -> Dict[str, object]:
+        """
+        JSON-friendly view of the sample (the full process table is left out).
+        """
+        return {
+            "seq": self.seq,
+            "timestamp": self.timestamp,
+            "duration": self.duration,
+            "uptime": self.uptime,
+            "load": self.load,
+            "cpu": self.cpu,
+            "top_cpu": self.top_cpu,
+            "memory": self.memory,
+            "top_memory": self.top_memory,
+            "disk": self.disk,
+            "network": self.network,
+        }
+
+
+class Collector:
+    """
+    Owns the providers and turns one TickSnapshot into one Sample.
+
+    Each provider runs on its own interval through a Scheduler; a Sample
+    combines the latest value of every task, and `Sample.updated` says
+    which of them were actually refreshed this tick. An interval of 0
+    disables a task (its fields stay empty).
+
+    With `defer_expensive` the first tick runs only the cheap tasks, so
+    a UI gets its first frame before the first process scan and statvfs
+    round; the expensive tasks are then due on the very next tick.
+    """
+
+    # name -> (interval seconds, cost class)
+    DEFAULT_SCHEDULE = {
+        "cpu": (0.25, COST_CHEAP),
+        "uptime": (1.0, COST_CHEAP),
+        "memory": (1.0, COST_CHEAP),
+        "disk": (1.0, COST_CHEAP),
+        "network": (1.0, COST_CHEAP),
+        "processes": (2.0, COST_EXPENSIVE),
+        "partitions": (30.0, COST_EXPENSIVE),
+    }
+
+    def __init__(
+        self,
+        top_limit: int = 5,
+        intervals: Optional[Dict[str, float]] = None,
+        defer_expensive: bool = False,
+    ) -> None:
+        self.top_limit = top_limit
+        self.seq = 0
+        self.defer_expensive = defer_expensive
+
+        # mtop's own cost per provider call (diagnostics panel)
+        self.overhead = Overhead()
+
+        # -------- Providers --------
+        self.cpu_p = CPUProvider()
+        self.proc_scan = ProcessScanner()
+        self.proc_p = ProcessProvider(self.proc_scan)
+        self.mem_p = MemoryProvider()
+        self.proc_mem_p = MemoryCalcProvider(self.proc_scan)
+        self.disk_p = DiskProvider()
+        self.net_p = NetworkCalcProvider()
+        self.up_p = UptimeProvider()
+
+        # -------- Schedule --------
+        timed = self.overhead.timed
+        funcs = {
+            "cpu": timed("CPUProvider.get_metrics", self.cpu_p.get_metrics),
+            "uptime": timed("UptimeProvider", self._uptime),
+            "memory": timed(
+                "MemoryProvider.get_system_memory", self.mem_p.get_system_memory
+            ),
+            "disk": timed("DiskProvider.get_io_metrics", self.disk_p.get_io_metrics),
+            "network": timed("NetworkCalcProvider.get_metrics", self.net_p.get_metrics),
+            "processes": self._processes,
+            "partitions": timed(
+                "DiskProvider.get_partitions",
+                lambda tick: self.disk_p.get_partitions(),
+            ),
+        }
+
+        intervals = intervals or {}
+        self.scheduler = Scheduler()
+        for name, (interval, cost) in self.DEFAULT_SCHEDULE.items():
+            interval = intervals.get(name, interval)
+            if interval > 0:
+                self.scheduler.add(name, funcs[name], interval, cost)
+
+    # ---------------- TASKS ----------------
+    def _uptime(self, tick: TickSnapshot) -> tuple:
+        return self.up_p.format_uptime(tick), self.up_p.get_load_average(tick)
+
+    def _processes(self, tick: TickSnapshot) -> tuple:
+        measure = self.overhead.measure
+
+        # One /proc walk per scan, shared by every process ranking
+        with measure("ProcessScanner.scan"):
+            procs = self.proc_scan.scan(tick)
+        with measure("ProcessProvider.get_top"):
+            top_cpu = self.proc_p.get_top(self.top_limit, procs)
+        with measure("MemoryCalcProvider.get_top_memory_processes"):
+            top_memory = self.proc_mem_p.get_top_memory_processes(self.top_limit, procs)
+        return procs, top_cpu, top_memory
+
+    # ---------------- PUBLIC API ----------------
+    def next_deadline(self) -> float:
+        """
+        Returns the time.monotonic() time the next task is due.
+        """
+        return self.scheduler.next_deadline()
+
+    def collect(self, tick: Optional[TickSnapshot] = None) -> Sample:
+        """
+        Runs the due providers against one tick and returns the result.
+        """
+        started = time.perf_counter()
+        cpu_started = time.thread_time()
+
+        # Every /proc source is read and parsed once for this tick
+        tick = tick or TickSnapshot()
+        first = self.seq == 0 and self.defer_expensive
+        updated = self.scheduler.run_due(
+            tick.clock, tick, cost=COST_CHEAP if first else None
+        )
+
+        value = self.scheduler.value
+        uptime, load = value("uptime") or ("", {})
+        procs, top_cpu, top_memory = value("processes") or (None, [], [])
+
+        disk = dict(value("disk") or {})
+        disk["partitions"] = value("partitions") or {}
+
+        overhead = self.overhead
+        overhead.count("files read", tick.reads)
+        overhead.count("files opened", tick.opens)
+        overhead.count("dirs listed", tick.listdirs)
+
+        self.seq += 1
+        sample = Sample(
+            seq=self.seq,
+            timestamp=tick.timestamp,
+            updated=frozenset(updated),
+            uptime=uptime,
+            load=load,
+            cpu=value("cpu") or {},
+            top_cpu=top_cpu,
+            memory=value("memory") or {},
+            top_memory=top_memory,
+            disk=disk,
+            network=value("network") or {},
+            processes=procs,
+            duration=time.perf_counter() - started,
+        )
+        stage = overhead.measure("Collector.collect")
+        stage.wall.add(sample.duration)
+        stage.cpu.add(time.thread_time() - cpu_started)
+        return sample
+
+
+class CollectorThread(threading.Thread):
+    """
+    Runs a Collector off the UI thread, waking when its next task is due.
+
+    Only the latest Sample is kept. If a tick overruns the next deadline
+    the next one starts right away instead of queueing up, so consumers
+    always see the freshest data and never wait on a scan. A consumer
+    that skips samples uses take_latest(), which also reports every task
+    refreshed since its previous call.
+    """
+
+    # Wait after a failed tick so a broken provider can't spin the thread
+    ERROR_BACKOFF = 1.0
+
+    def __init__(
+        self,
+        collector: Collector,
+        on_sample: Optional[Callable[[Sample], None]] = None,
+    ) -> None:
+        super().__init__(name="mtop-collector", daemon=True)
+
+        self.collector = collector
+
+        # Called on the collector thread with every published Sample
+        self.listeners: List[Callable[[Sample], None]] = []
+        if on_sample is not None:
+            self.listeners.append(on_sample)
+
+        self.error: Optional[BaseException] = None
+
+        # listener -> exceptions it raised, and the latest one
+        self.listener_errors: Dict[Callable[[Sample], None], int] = {}
+        self.listener_error: Optional[BaseException] = None
+
+        # Optional RefreshPacer, applied between ticks on this thread
+        self.pacer = None
+
+        self._latest: Optional[Sample] = None
+        # Tasks refreshed since the last take_latest()
+        self._unseen: Set[str] = set()
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._wake_event = threading.Event()
+
+    def add_listener(self, listener: Callable[[Sample], None]) -> None:
+        self.listeners.append(listener)
+
+    @property
+    def latest(self) -> Optional[Sample]:
+        with self._lock:
+            return self._latest
+
+    def take_latest(self) -> Optional[Sample]:
+        """
+        Latest Sample, with `updated` widened to every task refreshed
+        since the previous call (None if nothing new).
+
+        A Sample carries every task's latest value, so an update that
+        only a skipped sample made is still drawn from this one.
+        """
+        with self._lock:
+            sample = self._latest
+            if sample is None or not self._unseen:
+                return None
+            updated, self._unseen = frozenset(self._unseen), set()
+        return sample._replace(updated=updated)
+
+    def run(self) -> None:
+        collect = True
+        while not self._stop_event.is_set():
+            if collect:
+                try:
+                    sample = self.collector.collect()
+                except EOFError:
+                    # Replayed capture finished → keep the last sample on screen
+                    break
+                except Exception as exc:
+                    # Keep the last good sample on screen and try again
+                    self.error = exc
+                else:
+                    self.error = None
+                    with self._lock:
+                        self._latest = sample
+                        self._unseen.update(sample.updated)
+
+                    for listener in self.listeners:
+                        # A failing exporter or sink must not stop collection
+                        try:
+                            listener(sample)
+                        except Exception as exc:
+                            self.listener_errors[listener] = (
+                                self.listener_errors.get(listener, 0) + 1
+                            )
+                            self.listener_error = exc
+
+            if self.pacer is not None:
+                self.pacer.apply()
+
+            if self.error is not None:
+                delay = self.ERROR_BACKOFF
+            else:
+                delay = self.collector.next_deadline() - time.monotonic()
+            woken = self._wake_event.wait(max(delay, 0.0))
+            self._wake_event.clear()
+
+            # Woken early → re-pace, but only collect once something is due
+            collect = not woken or self.collector.next_deadline() <= time.monotonic()
+
+    def wake(self) -> None:
+        """
+        Re-reads the pacing right away instead of at the next deadline.
+        """
+        self._wake_event.set()
+
+    def stop(self) -> None:
+        self._stop_event.set()
+        self._wake_event.set()
@@ -0,0 +1,189 @@
+import os
+import queue
+import threading
+import time
+from typing import Dict, Iterable, List, Optional
+
+
+class MountProbe:
+    """
+    Probe state for one mount point.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+
+        self.stat: Optional[os.statvfs_result] = None   # last good result
+        self.error: bool = False                         # last probe failed
+        self.latency: float = 0.0                        # seconds, last completed probe
+
+        # Set while a statvfs call is queued or running
+        self.done: Optional[threading.Event] = None
+        self.submitted: float = 0.0
+
+
+class CapacityProber:
+    """
+    Runs statvfs() for many mounts concurrently with a timeout.
+
+    A hung NFS/CIFS/FUSE mount blocks statvfs() indefinitely. Probes run
+    on a small pool of daemon threads; anything not finished within
+    `timeout` is reported as stale with its last good value instead of
+    stalling the refresh. A mount whose probe is still stuck is never
+    resubmitted, so a hung mount ties up at most one worker (a dead
+    server exporting several mounts: one per mount). Each worker stuck
+    for longer than `timeout` gets a replacement, up to `max_workers`
+    threads in all, so hung mounts cannot starve the healthy ones; the
+    extra threads exit once the stuck calls return.
+
+    Daemon threads (not concurrent.futures) so a worker stuck in the
+    kernel cannot block interpreter exit.
+    """
+
+    def __init__(
+        self,
+        workers: int = 4,
+        timeout: float = 0.5,
+        max_workers: int = 16,
+    ) -> None:
+        self.workers = workers
+        self.timeout = timeout
+        self.max_workers = max(max_workers, workers)
+
+        self.probes: Dict[str, MountProbe] = {}
+
+        self._jobs: "queue.Queue[MountProbe]" = queue.Queue()
+        self._threads: List[threading.Thread] = []
+        self._lock = threading.Lock()
+
+        # Worker → when its current statvfs call started
+        self._running: Dict[threading.Thread, float] = {}
+        self._spawned = 0
+
+    # ---------------- WORKERS ----------------
+    def _stuck(self, now: float) -> int:
+        """
+        Workers inside a statvfs call for longer than `timeout` (lock held).
+        """
+        return sum(
+            1 for started in self._running.values() if now - started > self.timeout
+        )
+
+    def _start_workers(self) -> None:
+        with self._lock:
+            wanted = min(
+                self.workers + self._stuck(time.perf_counter()),
+                self.max_workers,
+            )
+            while len(self._threads) < wanted:
+                thread = threading.Thread(
+                    target=self._worker,
+                    name=f"mtop-statvfs-{self._spawned}",
+                    daemon=True,
+                )
+                self._spawned += 1
+                self._threads.append(thread)
+                thread.start()
+
+    def _worker(self) -> None:
+        me = threading.current_thread()
+        while True:
+            probe = self._jobs.get()
+            started = time.perf_counter()
+            with self._lock:
+                self._running[me] = started
+
+            try:
+                stat: Optional[os.statvfs_result] = os.statvfs(probe.path)
+            except (OSError, IOError):
+                stat = None
+
+            with self._lock:
+                finished = time.perf_counter()
+                del self._running[me]
+
+                probe.latency = finished - started
+                probe.error = stat is None
+                if stat is not None:
+                    probe.stat = stat
+
+                done, probe.done = probe.done, None
+
+                # Back from a stuck call after a replacement was started
+                retire = len(self._threads) > self.workers + self._stuck(finished)
+                if retire:
+                    self._threads.remove(me)
+
+            if done is not None:
+                done.set()
+            if retire:
+                return
+
+    # ---------------- PUBLIC API ----------------
+    def probe(self, paths: Iterable[str]) -> Dict[str, Dict[str, object]]:
+        """
+        Probes every path and waits at most `timeout` seconds overall.
+
+        Returns:
+            {
+                path: {
+                    "stat": os.statvfs_result | None,  # last good value
+                    "stale": bool,        # probe did not finish in time
+                    "latency_ms": float,  # last completed probe, or time
+                                          # spent waiting so far if stale
+                }
+            }
+        """
+        self._start_workers()
+
+        now = time.perf_counter()
+        waiting: List[MountProbe] = []
+        current: Dict[str, MountProbe] = {}
+
+        with self._lock:
+            for path in paths:
+                probe = self.probes.get(path) or MountProbe(path)
+                current[path] = probe
+
+                if probe.done is None:
+                    probe.done = threading.Event()
+                    probe.submitted = now
+                    self._jobs.put(probe)
+
+                waiting.append(probe)
+
+            # Unmounted paths drop out (a stuck worker keeps its own ref)
+            self.probes = current
+
+        deadline = now + self.timeout
+        for probe in waiting:
+            done = probe.done
+            if done is not None:
+                done.wait(max(deadline - time.perf_counter(), 0.0))
+
+        result: Dict[str, Dict[str, object]] = {}
+        finished = time.perf_counter()
+
+        with self._lock:
+            for path, probe in current.items():
+                stale = probe.done is not None
+
+                if probe.stat is None and (stale or probe.error):
+                    # Never answered, or plainly not stat-able
+                    if stale:
+                        result[path] = {
+                            "stat": None,
+                            "stale": True,
+                            "latency_ms": (finished - probe.submitted) * 1000,
+                        }
+                    continue
+
+                result[path] = {
+                    "stat": probe.stat,
+                    "stale": stale,
+                    "latency_ms": (
+                        (finished - probe.submitted) if stale else probe.latency
+                    ) * 1000,
+                }
+
+        return result
@@ -1,5 +1,7 @@
 import os
-from typing import Dict, Tuple
+from typing import Dict, Optional, Tuple
+
+from shm.core.snapshot import TickSnapshot
 
 
 class CPUProvider:
@@ -16,23 +18,44 @@ class CPUProvider:
     def __init__(self) -> None:
         self.history: Dict[str, Tuple[int, int]] = {}
         self.cpu_count: int = os.cpu_count() or 1
-        self.cpu_model: str = self._get_cpu_model()
 
-    def _get_cpu_model(self) -> str:
+        # Read on the first get_metrics() call, through its tick
+        self.cpu_model: Optional[str] = None
+        self.cpu_sockets: Dict[str, int] = {}
+
+    def _read_cpuinfo(self, tick: Optional[TickSnapshot] = None) -> Tuple[str, Dict[str, int]]:
         """
-        Reads CPU model name from /proc/cpuinfo.
+        Reads the CPU model name and each core's socket ("physical id")
+        from /proc/cpuinfo.
         """
+        tick = tick or TickSnapshot()
+        model = None
+        sockets: Dict[str, int] = {}
+
         try:
-            with open(self.CPUINFO_PATH, "r", encoding="utf-8") as file:
-                for line in file:
-                    if line.lower().startswith("model name"):
-                        return line.split(":", 1)[1].strip()
+            # Read once per run → don't keep the fd (or a 1 MiB buffer
+            # on large machines) around
+            processor = None
+            for line in tick.read(self.CPUINFO_PATH, keep_open=False).splitlines():
+                key, _, value = line.partition(":")
+                key = key.strip().lower()
+
+                if key == "processor":
+                    processor = f"cpu{value.strip()}"
+                elif key == "model name" and model is None:
+                    model = value.strip()
+                elif key == "physical id" and processor is not None:
+                    # One odd value only costs that core its socket
+                    try:
+                        sockets[processor] = int(value)
+                    except ValueError:
+                        pass
         except (OSError, IOError):
             pass
 
-        return "Unknown CPU"
+        return model or "Unknown CPU", sockets
 
-    def _read_stats(self) -> Dict[str, Tuple[int, int]]:
+    def _read_stats(self, tick: TickSnapshot) -> Dict[str, Tuple[int, int]]:
         """
         Reads total and idle CPU ticks from /proc/stat.
 
@@ -42,42 +65,50 @@ class CPUProvider:
         stats: Dict[str, Tuple[int, int]] = {}
 
         try:
-            with open(self.STAT_PATH, "r", encoding="utf-8") as file:
-                for line in file:
-                    if not line.startswith("cpu"):
-                        continue
+            for line in tick.read(self.STAT_PATH).splitlines():
+                if not line.startswith("cpu"):
+                    # cpu lines come first → nothing left to parse
+                    break
 
-                    parts = line.split()
-                    if len(parts) < 8:
-                        continue
+                parts = line.split()
+                if len(parts) < 8:
+                    continue
 
-                    ticks = list(map(int, parts[1:8]))
-                    idle = ticks[3] + ticks[4]
-                    total = sum(ticks)
+                ticks = list(map(int, parts[1:8]))
+                idle = ticks[3] + ticks[4]
+                total = sum(ticks)
 
-                    stats[parts[0]] = (total, idle)
+                stats[parts[0]] = (total, idle)
         except (OSError, IOError):
             pass
 
         return stats
 
-    def get_metrics(self) -> Dict[str, object]:
+    def get_metrics(self, tick: Optional[TickSnapshot] = None) -> Dict[str, object]:
         """
         Computes CPU utilization percentages.
 
+        `tick` shares /proc reads with the other providers this refresh.
+
         Returns:
             {
                 "model": str,
                 "total": float,
-                "cores": { "cpu0": float, "cpu1": float, ... }
+                "cores": { "cpu0": float, "cpu1": float, ... },
+                "sockets": { "cpu0": int, ... }   (empty if unknown)
             }
         """
-        current = self._read_stats()
+        tick = tick or TickSnapshot()
+        current = self._read_stats(tick)
+
+        if self.cpu_model is None:
+            self.cpu_model, self.cpu_sockets = self._read_cpuinfo(tick)
 
         result = {
             "model": self.cpu_model,
             "total": 0.0,
             "cores": {},
+            "sockets": self.cpu_sockets,
         }
 
         for cpu, (total, idle) in current.items():
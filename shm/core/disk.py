@@ -1,6 +1,8 @@
-import os
-import time
-from typing import Dict, Tuple, Optional
+from typing import Dict, List, Tuple, Optional
+
+from shm.core.capacity import CapacityProber
+from shm.core.mounts import MountTable
+from shm.core.snapshot import TickSnapshot, parse_meminfo
 
 
 BYTES_IN_GIB = 1024 ** 3
@@ -12,7 +14,7 @@ class DiskProvider:
     Linux-specific implementation.
     """
 
-    MOUNTS_PATH = "/proc/mounts"
+    MOUNTS_PATH = "/proc/self/mounts"
     DISKSTATS_PATH = "/proc/diskstats"
     MEMINFO_PATH = "/proc/meminfo"
 
@@ -31,82 +33,130 @@ class DiskProvider:
         # { disk: (r_bytes, w_bytes, io_ticks, r_ops, w_ops, timestamp) }
         self.last_stats: Dict[str, Tuple[int, int, int, int, int, float]] = {}
 
+        # statvfs with per-mount timeouts (hung network mounts)
+        self.prober = CapacityProber()
+
+        # Mount list reparsed only when the kernel signals a change
+        self.mount_table = MountTable(self.MOUNTS_PATH)
+        self._mounts: Dict[str, str] = {}
+        self._mounts_generation = -1
+        self._ignored: Dict[str, bool] = {}
+
+    # ---------------- MOUNTS ----------------
+    def _is_ignored(self, mount: str) -> bool:
+        ignored = self._ignored.get(mount)
+        if ignored is None:
+            ignored = self._ignored[mount] = mount.startswith(
+                self.IGNORED_MOUNT_PREFIXES
+            )
+        return ignored
+
+    def _get_mounts(self) -> Dict[str, str]:
+        """
+        Returns { partition: mount_point } for real block devices.
+
+        Filtered once per mount table generation, not every tick.
+        """
+        try:
+            entries: List[Tuple[str, str]] = self.mount_table.entries()
+        except (OSError, IOError):
+            return {}
+
+        if self.mount_table.generation != self._mounts_generation:
+            mounts: Dict[str, str] = {}
+
+            for dev, mount in entries:
+                if not dev.startswith("/dev/"):
+                    continue
+
+                if self._is_ignored(mount):
+                    continue
+
+                mounts[dev.split("/")[-1]] = mount
+
+            self._mounts = mounts
+            self._mounts_generation = self.mount_table.generation
+
+            # Keep the prefix memo bounded to what is currently mounted
+            if len(self._ignored) > 4 * len(entries) + 64:
+                self._ignored = {}
+
+        return self._mounts
+
     # ---------------- PARTITION CAPACITY ----------------
     def _get_partition_capacity(self) -> Dict[str, Dict[str, object]]:
         capacity: Dict[str, Dict[str, object]] = {}
+        mounts = self._get_mounts()
 
-        try:
-            with open(self.MOUNTS_PATH, "r", encoding="utf-8") as file:
-                for line in file:
-                    if not line.startswith("/dev/"):
-                        continue
-
-                    dev, mount = line.split()[:2]
-                    part = dev.split("/")[-1]
-
-                    if mount.startswith(self.IGNORED_MOUNT_PREFIXES):
-                        continue
-
-                    try:
-                        st = os.statvfs(mount)
-
-                        total = (st.f_blocks * st.f_frsize) / BYTES_IN_GIB
-                        free = (st.f_bavail * st.f_frsize) / BYTES_IN_GIB
-                        used = total - free
-                        pct = (used / total * 100) if total else 0
-
-                        capacity[part] = {
-                            "total": round(total, 2),
-                            "used": round(used, 2),
-                            "free": round(free, 2),
-                            "pct": round(pct, 1),
-                            "mount": mount,
-                        }
-                    except (OSError, IOError):
-                        continue
-        except (OSError, IOError):
-            pass
+        probes = self.prober.probe(mounts.values())
+
+        for part, mount in mounts.items():
+            probe = probes.get(mount)
+            if probe is None:
+                continue
+
+            st = probe["stat"]
+            if st is not None:
+                total_bytes = st.f_blocks * st.f_frsize
+                free_bytes = st.f_bavail * st.f_frsize
+            else:
+                # Unresponsive since startup → no value to fall back on
+                total_bytes = free_bytes = 0
+
+            used_bytes = total_bytes - free_bytes
+            pct = (used_bytes / total_bytes * 100) if total_bytes else 0
+
+            capacity[part] = {
+                # GiB, rounded for display
+                "total": round(total_bytes / BYTES_IN_GIB, 2),
+                "used": round(used_bytes / BYTES_IN_GIB, 2),
+                "free": round(free_bytes / BYTES_IN_GIB, 2),
+                "pct": round(pct, 1),
+                # Exact, for exporters
+                "total_bytes": total_bytes,
+                "used_bytes": used_bytes,
+                "free_bytes": free_bytes,
+                "mount": mount,
+                # Last good value shown while statvfs is hanging
+                "stale": probe["stale"],
+                "latency_ms": round(probe["latency_ms"], 2),
+            }
 
         return capacity
 
     # ---------------- RAW DISK IO ----------------
-    def _read_diskstats(self) -> Dict[str, Dict[str, int]]:
+    def _read_diskstats(self, tick: TickSnapshot) -> Dict[str, Dict[str, int]]:
         disks: Dict[str, Dict[str, int]] = {}
 
         try:
-            with open(self.DISKSTATS_PATH, "r", encoding="utf-8") as file:
-                for line in file:
-                    parts = line.split()
-                    if len(parts) < 14:
-                        continue
-
-                    dev = parts[2]
-
-                    if dev.startswith(self.IGNORED_DISK_PREFIXES):
-                        continue
-
-                    disks[dev] = {
-                        "r_ops": int(parts[3]),
-                        "r_bytes": int(parts[5]) * 512,
-                        "w_ops": int(parts[7]),
-                        "w_bytes": int(parts[9]) * 512,
-                        "io_ticks": int(parts[12]),
-                    }
+            for line in tick.read(self.DISKSTATS_PATH).splitlines():
+                parts = line.split()
+                if len(parts) < 14:
+                    continue
+
+                dev = parts[2]
+
+                if dev.startswith(self.IGNORED_DISK_PREFIXES):
+                    continue
+
+                disks[dev] = {
+                    "r_ops": int(parts[3]),
+                    "r_bytes": int(parts[5]) * 512,
+                    "w_ops": int(parts[7]),
+                    "w_bytes": int(parts[9]) * 512,
+                    "io_ticks": int(parts[12]),
+                }
         except (OSError, IOError):
             pass
 
         return disks
 
     # ---------------- SWAP ----------------
-    def _get_swap(self) -> Optional[Dict[str, float]]:
-        mem: Dict[str, int] = {}
-
+    def _get_swap(self, tick: TickSnapshot) -> Optional[Dict[str, float]]:
         try:
-            with open(self.MEMINFO_PATH, "r", encoding="utf-8") as file:
-                for line in file:
-                    key, value = line.split(":", 1)
-                    mem[key.strip()] = int(value.split()[0]) * 1024
-        except (OSError, IOError):
+            # Parsed once per tick, shared with MemoryProvider
+            mem: Dict[str, int] = tick.parse(self.MEMINFO_PATH, parse_meminfo)
+        except (OSError, IOError, ValueError, IndexError):
             return None
 
         total = mem.get("SwapTotal", 0) / BYTES_IN_GIB
@@ -122,16 +172,37 @@ class DiskProvider:
         }
 
     # ---------------- PUBLIC API ----------------
-    def get_metrics(self) -> Dict[str, object]:
-        now = time.time()
+    def get_metrics(self, tick: Optional[TickSnapshot] = None) -> Dict[str, object]:
+        """
+        Returns disk IO, partition capacity and swap in one dict.
+        """
+        result = self.get_io_metrics(tick)
+        result["partitions"] = self.get_partitions()
+        return result
+
+    def get_partitions(self) -> Dict[str, Dict[str, object]]:
+        """
+        Returns partition capacity (statvfs per mount).
+
+        Much more expensive than the IO counters, so schedulers can
+        poll it on a slower interval than get_io_metrics().
+        """
+        return self._get_partition_capacity()
 
-        disks = self._read_diskstats()
-        partitions = self._get_partition_capacity()
-        swap = self._get_swap()
+    def get_io_metrics(self, tick: Optional[TickSnapshot] = None) -> Dict[str, object]:
+        """
+        Returns per-disk IO rates and swap (no partition capacity).
+        """
+        tick = tick or TickSnapshot()
+
+        disks = self._read_diskstats(tick)
+        swap = self._get_swap(tick)
+
+        # Rates use the moment diskstats was actually read
+        now = tick.read_time(self.DISKSTATS_PATH)
 
         result = {
             "disks": {},
-            "partitions": partitions,
             "swap": swap,
         }
 
@@ -143,23 +214,32 @@ class DiskProvider:
                 dt = now - pt
 
                 if dt > 0:
-                    read_speed = ((data["r_bytes"] - prb) / BYTES_IN_GIB) / dt
-                    write_speed = ((data["w_bytes"] - pwb) / BYTES_IN_GIB) / dt
+                    read_bps = (data["r_bytes"] - prb) / dt
+                    write_bps = (data["w_bytes"] - pwb) / dt
                     iops = (
                         (data["r_ops"] - props)
                         + (data["w_ops"] - pwops)
                     ) / dt
                     util_pct = (data["io_ticks"] - pticks) / (dt * 10)
                 else:
-                    read_speed = write_speed = iops = util_pct = 0.0
+                    read_bps = write_bps = iops = util_pct = 0.0
             else:
-                read_speed = write_speed = iops = util_pct = 0.0
+                read_bps = write_bps = iops = util_pct = 0.0
+
+            read_bps = max(read_bps, 0.0)
+            write_bps = max(write_bps, 0.0)
 
             result["disks"][dev] = {
-                "read_speed": round(max(read_speed, 0.0), 4),
-                "write_speed": round(max(write_speed, 0.0), 4),
+                # GiB/s, rounded for display
+                "read_speed": round(read_bps / BYTES_IN_GIB, 4),
+                "write_speed": round(write_bps / BYTES_IN_GIB, 4),
                 "iops": round(max(iops, 0.0), 1),
                 "util_pct": round(min(max(util_pct, 0.0), 100.0), 1),
+                # Exact, for exporters
+                "read_bytes_per_sec": round(read_bps, 1),
+                "write_bytes_per_sec": round(write_bps, 1),
+                "read_bytes": data["r_bytes"],
+                "write_bytes": data["w_bytes"],
             }
 
             self.last_stats[dev] = (
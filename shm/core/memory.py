@@ -1,5 +1,6 @@
-import os
-from typing import Dict
+from typing import Dict, Optional
+
+from shm.core.snapshot import TickSnapshot, parse_meminfo
 
 
 class MemoryProvider:
@@ -14,20 +15,17 @@ class MemoryProvider:
         pass
 
     # ---------------- SYSTEM MEMORY ----------------
-    def get_system_memory(self) -> Dict[str, int]:
+    def get_system_memory(self, tick: Optional[TickSnapshot] = None) -> Dict[str, int]:
         """
         Returns system-wide memory stats based on /proc/meminfo.
 
         All values are in bytes.
         """
-        mem: Dict[str, int] = {}
+        tick = tick or TickSnapshot()
 
         try:
-            with open(self.MEMINFO_PATH, "r", encoding="utf-8") as file:
-                for line in file:
-                    key, value = line.split(":", 1)
-                    mem[key.strip()] = int(value.strip().split()[0]) * 1024
-        except (OSError, IOError):
+            mem: Dict[str, int] = tick.parse(self.MEMINFO_PATH, parse_meminfo)
+        except (OSError, IOError, ValueError, IndexError):
             return {}
 
         total = mem.get("MemTotal", 0)
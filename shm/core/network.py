@@ -1,6 +1,8 @@
-from typing import Dict, List
+from typing import Dict, List, Optional
 import threading
 
+from shm.core.snapshot import TickSnapshot
+
 
 class NetworkProvider:
     NETDEV_PATH = "/proc/net/dev"
@@ -9,15 +11,16 @@ class NetworkProvider:
         self._rx_fields: List[str] = []
         self._tx_fields: List[str] = []
         self._lock = threading.Lock()
-        self._parse_headers()
+
+        # Headers are parsed from the first read (same tick, no extra IO)
 
     # --------------------------------------------------
     # HEADER PARSING (FUTURE-PROOF)
     # --------------------------------------------------
-    def _parse_headers(self) -> None:
+    def _parse_headers(self, tick: Optional[TickSnapshot] = None) -> None:
         try:
-            with open(self.NETDEV_PATH, "r", encoding="utf-8") as f:
-                lines = f.readlines()
+            tick = tick or TickSnapshot()
+            lines = tick.read(self.NETDEV_PATH).splitlines()
 
             if len(lines) < 2 or "|" not in lines[1]:
                 raise ValueError("Invalid /proc/net/dev header format")
@@ -32,13 +35,20 @@ class NetworkProvider:
             self._rx_fields = ["rx_bytes"]
             self._tx_fields = ["tx_bytes"]
 
-    def _read_network_file(self) -> Dict[str, Dict[str, int]]:
+    def _read_network_file(
+        self,
+        tick: Optional[TickSnapshot] = None,
+    ) -> Dict[str, Dict[str, int]]:
+        tick = tick or TickSnapshot()
+
         with self._lock:
             data: Dict[str, Dict[str, int]] = {}
 
             try:
-                with open(self.NETDEV_PATH, "r", encoding="utf-8") as f:
-                    lines = f.readlines()[2:]
+                if not self._rx_fields:
+                    self._parse_headers(tick)
+
+                lines = tick.read(self.NETDEV_PATH).splitlines()[2:]
 
                 fields = self._rx_fields + self._tx_fields
 
@@ -52,7 +62,7 @@ class NetworkProvider:
                     nums = values.split()
                     if len(nums) < len(fields):
                         # Kernel mismatch → re-parse headers once
-                        self._parse_headers()
+                        self._parse_headers(tick)
                         fields = self._rx_fields + self._tx_fields
 
                     parsed = {
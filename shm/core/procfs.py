@@ -0,0 +1,119 @@
+import os
+import threading
+from typing import Dict
+
+
+class ProcFile:
+    """
+    Keeps a fixed /proc file open and rereads it from offset 0.
+
+    /proc files regenerate their content on every read from the start,
+    so the fd can be reused across ticks with pread() into a buffer that
+    is allocated once. This skips open()/close() and the text-mode
+    wrapper on every refresh.
+    """
+
+    INITIAL_BUFFER = 4096
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._fd = -1
+        self._buf = bytearray(self.INITIAL_BUFFER)
+        self._lock = threading.Lock()
+
+    def fileno(self) -> int:
+        """
+        Returns the underlying fd, opening it if needed (e.g. for poll()).
+        """
+        with self._lock:
+            if self._fd < 0:
+                self._fd = os.open(self.path, os.O_RDONLY | os.O_CLOEXEC)
+            return self._fd
+
+    def _fill(self) -> int:
+        """
+        Reads the whole file into the buffer, growing it if needed.
+
+        Returns:
+            Number of valid bytes in the buffer
+        """
+        if self._fd < 0:
+            self._fd = os.open(self.path, os.O_RDONLY | os.O_CLOEXEC)
+
+        size = 0
+        while True:
+            if size == len(self._buf):
+                # Buffer full → double it and keep reading
+                self._buf.extend(bytes(len(self._buf)))
+
+            with memoryview(self._buf) as view:
+                n = os.preadv(self._fd, [view[size:]], size)
+
+            if n == 0:
+                return size
+            size += n
+
+    def read_bytes(self) -> bytes:
+        """
+        Returns the current file content as bytes.
+        """
+        with self._lock:
+            try:
+                size = self._fill()
+            except OSError:
+                # Drop the fd so the next call reopens from scratch
+                self._close()
+                raise
+            return bytes(self._buf[:size])
+
+    def read_text(self) -> str:
+        """
+        Returns the current file content decoded as UTF-8.
+        """
+        with self._lock:
+            try:
+                size = self._fill()
+            except OSError:
+                self._close()
+                raise
+            with memoryview(self._buf) as view:
+                return str(view[:size], "utf-8", "replace")
+
+    def _close(self) -> None:
+        if self._fd >= 0:
+            try:
+                os.close(self._fd)
+            except OSError:
+                pass
+            self._fd = -1
+
+    def close(self) -> None:
+        with self._lock:
+            self._close()
+
+
+# ---------------- SHARED REGISTRY ----------------
+_files: Dict[str, ProcFile] = {}
+_files_lock = threading.Lock()
+
+
+def get_proc_file(path: str) -> ProcFile:
+    """
+    Returns the shared ProcFile for `path`.
+
+    Providers reading the same file (e.g. /proc/meminfo) share one fd.
+    """
+    with _files_lock:
+        proc_file = _files.get(path)
+        if proc_file is None:
+            proc_file = _files[path] = ProcFile(path)
+        return proc_file
+
+
+def close_all() -> None:
+    """
+    Closes every shared fd (they reopen lazily on next read).
+    """
+    with _files_lock:
+        for proc_file in _files.values():
+            proc_file.close()
@@ -0,0 +1,150 @@
+import os
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+from shm.core.procfs import get_proc_file
+
+
+class LiveSource:
+    """
+    Reads the running system.
+
+    Sources decouple providers from where /proc data comes from, so the
+    same provider code runs live, while recording, and on replayed
+    captures (see shm.capture).
+    """
+
+    def now(self) -> float:
+        return time.time()
+
+    def clock(self) -> float:
+        """
+        Scheduling time: monotonic, so a stepped wall clock cannot stall
+        or burst the task schedule.
+        """
+        return time.monotonic()
+
+    def read(self, path: str) -> str:
+        """
+        Hot, fixed file (/proc/stat, /proc/meminfo, ...) via its shared fd.
+        """
+        return get_proc_file(path).read_text()
+
+    def read_transient(self, path: str, max_size: Optional[int] = None) -> bytes:
+        """
+        One-off read (per-PID files, /proc/cpuinfo): open, read, close.
+
+        With `max_size` a single read() is issued, which is enough for
+        single-record files such as /proc/[pid]/stat.
+        """
+        fd = os.open(path, os.O_RDONLY | os.O_CLOEXEC)
+        try:
+            if max_size is not None:
+                return os.read(fd, max_size)
+
+            chunks = []
+            while True:
+                chunk = os.read(fd, 65536)
+                if not chunk:
+                    return b"".join(chunks)
+                chunks.append(chunk)
+        finally:
+            os.close(fd)
+
+    def listdir(self, path: str) -> List[str]:
+        return os.listdir(path)
+
+
+LIVE_SOURCE = LiveSource()
+
+
+def parse_meminfo(text: str) -> Dict[str, int]:
+    """
+    Parses /proc/meminfo into { key: bytes }.
+    """
+    mem: Dict[str, int] = {}
+
+    for line in text.splitlines():
+        key, value = line.split(":", 1)
+        mem[key.strip()] = int(value.split()[0]) * 1024
+
+    return mem
+
+
+class TickSnapshot:
+    """
+    Tick-scoped view of /proc shared by every provider in one refresh.
+
+    Each source is read at most once per tick and each (source, parser)
+    pair is parsed at most once, so e.g. /proc/meminfo is parsed once
+    for both MemoryProvider and DiskProvider swap. The time every source
+    was read is kept so rates are computed against the actual sample
+    time rather than whenever the provider happened to run.
+    """
+
+    def __init__(self, source: Optional[LiveSource] = None) -> None:
+        self.source = source or LIVE_SOURCE
+
+        self.timestamp: float = self.source.now()
+        # Task deadlines run on this clock, never on the wall clock above
+        self.clock: float = self.source.clock()
+
+        self._text: Dict[str, str] = {}
+        self._read_at: Dict[str, float] = {}
+        self._parsed: Dict[Tuple[str, Callable], object] = {}
+        self._dirs: Dict[str, List[str]] = {}
+
+        # Source calls made this tick (mtop's own I/O, see Overhead)
+        self.reads = 0          # hot files through their shared fd
+        self.opens = 0          # open / read / close
+        self.listdirs = 0
+
+    def read(self, path: str, keep_open: bool = True) -> str:
+        """
+        Returns the raw text of `path`, reading it on first use.
+
+        keep_open=False is for files read rarely (e.g. /proc/cpuinfo) that
+        should not hold an fd and buffer for the rest of the run.
+
+        Raises OSError if the source cannot be read.
+        """
+        text = self._text.get(path)
+        if text is None:
+            if keep_open:
+                text = self.source.read(path)
+                self.reads += 1
+            else:
+                text = self.source.read_transient(path).decode("utf-8", "replace")
+                self.opens += 1
+            self._read_at[path] = self.source.now()
+            self._text[path] = text
+        return text
+
+    def read_transient(self, path: str, max_size: Optional[int] = None) -> bytes:
+        """
+        Uncached one-off read, for per-PID files (see LiveSource).
+        """
+        self.opens += 1
+        return self.source.read_transient(path, max_size)
+
+    def listdir(self, path: str) -> List[str]:
+        entries = self._dirs.get(path)
+        if entries is None:
+            entries = self._dirs[path] = self.source.listdir(path)
+            self.listdirs += 1
+        return entries
+
+    def read_time(self, path: str) -> float:
+        """
+        Returns when `path` was read this tick (tick start if never read).
+        """
+        return self._read_at.get(path, self.timestamp)
+
+    def parse(self, path: str, parser: Callable[[str], object]) -> object:
+        """
+        Returns parser(read(path)), computed once per tick.
+        """
+        key = (path, parser)
+        if key not in self._parsed:
+            self._parsed[key] = parser(self.read(path))
+        return self._parsed[key]
@@ -1,6 +1,7 @@
 import time
-from datetime import datetime
-from typing import Dict
+from typing import Dict, Optional
+
+from shm.core.snapshot import TickSnapshot
 
 
 class UptimeProvider:
@@ -15,47 +16,46 @@ class UptimeProvider:
     def __init__(self) -> None:
         pass
 
-    def get_uptime_seconds(self) -> float:
+    def get_uptime_seconds(self, tick: Optional[TickSnapshot] = None) -> float:
         """
         Reads total system uptime in seconds from /proc/uptime.
         """
         try:
-            with open(self.UPTIME_PATH, "r", encoding="utf-8") as file:
-                return float(file.readline().split()[0])
-        except (OSError, IOError, ValueError):
+            tick = tick or TickSnapshot()
+            return float(tick.read(self.UPTIME_PATH).split()[0])
+        except (OSError, IOError, ValueError, IndexError):
             return 0.0
 
-    def get_boot_time(self) -> str:
+    def get_boot_time(self, tick: Optional[TickSnapshot] = None) -> str:
         """
         Calculates the system boot timestamp as a formatted string.
         """
-        uptime_sec = self.get_uptime_seconds()
-        boot_timestamp = time.time() - uptime_sec
+        tick = tick or TickSnapshot()
+        uptime_sec = self.get_uptime_seconds(tick)
+        boot_timestamp = tick.read_time(self.UPTIME_PATH) - uptime_sec
 
-        return datetime.fromtimestamp(
-            boot_timestamp
-        ).strftime("%Y-%m-%d %H:%M:%S")
+        return time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(boot_timestamp))
 
-    def get_load_average(self) -> Dict[str, float]:
+    def get_load_average(self, tick: Optional[TickSnapshot] = None) -> Dict[str, float]:
         """
         Reads the 1, 5, and 15 minute load averages from /proc/loadavg.
         """
         try:
-            with open(self.LOADAVG_PATH, "r", encoding="utf-8") as file:
-                parts = file.readline().split()
-                return {
-                    "1min": float(parts[0]),
-                    "5min": float(parts[1]),
-                    "15min": float(parts[2]),
-                }
+            tick = tick or TickSnapshot()
+            parts = tick.read(self.LOADAVG_PATH).split()
+            return {
+                "1min": float(parts[0]),
+                "5min": float(parts[1]),
+                "15min": float(parts[2]),
+            }
         except (OSError, IOError, ValueError, IndexError):
             return {"1min": 0.0, "5min": 0.0, "15min": 0.0}
 
-    def format_uptime(self) -> str:
+    def format_uptime(self, tick: Optional[TickSnapshot] = None) -> str:
         """
         Converts uptime seconds into a human-readable format.
         """
-        seconds = int(self.get_uptime_seconds())
+        seconds = int(self.get_uptime_seconds(tick))
 
         days, remainder = divmod(seconds, 86400)
         hours, remainder = divmod(remainder, 3600)
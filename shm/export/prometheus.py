@@ -0,0 +1,276 @@
+"""
+Prometheus / OpenMetrics text exporter
+
+The payload is rendered once per collected Sample (on the collector
+thread) and every scrape is served from that cached bytes object, so any
+number of concurrent scrapers never cause an extra /proc read. The HTTP
+side is a minimal asyncio server with no external dependencies.
+"""
+
+import asyncio
+import threading
+from typing import Dict, List, Optional, Tuple
+
+from shm.collector import Sample
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _escape(value: object) -> str:
+    return (
+        str(value)
+        .replace("\\", "\\\\")
+        .replace("\n", "\\n")
+        .replace('"', '\\"')
+    )
+
+
+class _MetricWriter:
+    """
+    Groups samples by metric name so HELP/TYPE are written once each.
+    """
+
+    def __init__(self) -> None:
+        self._order: List[str] = []
+        self._meta: Dict[str, Tuple[str, str]] = {}
+        self._lines: Dict[str, List[str]] = {}
+
+    def add(
+        self,
+        name: str,
+        kind: str,
+        help_text: str,
+        value: object,
+        labels: Optional[Dict[str, object]] = None,
+    ) -> None:
+        if value is None:
+            return
+
+        if name not in self._meta:
+            self._order.append(name)
+            self._meta[name] = (kind, help_text)
+            self._lines[name] = []
+
+        if labels:
+            label_text = ",".join(
+                f'{key}="{_escape(val)}"' for key, val in labels.items()
+            )
+            self._lines[name].append(f"{name}{{{label_text}}} {value}")
+        else:
+            self._lines[name].append(f"{name} {value}")
+
+    def render(self) -> bytes:
+        out: List[str] = []
+        for name in self._order:
+            kind, help_text = self._meta[name]
+            out.append(f"# HELP {name} {help_text}")
+            out.append(f"# TYPE {name} {kind}")
+            out.extend(self._lines[name])
+        out.append("")
+        return "\n".join(out).encode("utf-8")
+
+
+def render_prometheus(sample: Sample) -> bytes:
+    """
+    Renders everything in a Sample as Prometheus text format.
+    """
+    m = _MetricWriter()
+
+    # ---------------- COLLECTOR ----------------
+    m.add("mtop_sample_timestamp_seconds", "gauge",
+          "Unix time the sample was collected.", sample.timestamp)
+    m.add("mtop_collection_duration_seconds", "gauge",
+          "Time spent collecting the sample.", round(sample.duration, 6))
+
+    # ---------------- LOAD ----------------
+    for period, value in sample.load.items():
+        m.add("mtop_load_average", "gauge", "System load average.",
+              value, {"period": period})
+
+    # ---------------- CPU ----------------
+    cpu = sample.cpu
+    if cpu:
+        m.add("mtop_cpu_usage_percent", "gauge", "CPU utilization.",
+              cpu.get("total", 0.0), {"cpu": "total"})
+        for core, usage in cpu.get("cores", {}).items():
+            m.add("mtop_cpu_usage_percent", "gauge", "CPU utilization.",
+                  usage, {"cpu": core})
+
+    # ---------------- MEMORY ----------------
+    for key, value in sample.memory.items():
+        if key.startswith("swap_"):
+            m.add("mtop_swap_bytes", "gauge", "Swap usage.",
+                  value, {"type": key[5:]})
+        else:
+            m.add("mtop_memory_bytes", "gauge", "System memory usage.",
+                  value, {"type": key})
+
+    # ---------------- DISK IO ----------------
+    for dev, s in sample.disk.get("disks", {}).items():
+        labels = {"device": dev}
+        m.add("mtop_disk_read_bytes_per_second", "gauge", "Disk read throughput.",
+              s["read_bytes_per_sec"], labels)
+        m.add("mtop_disk_write_bytes_per_second", "gauge", "Disk write throughput.",
+              s["write_bytes_per_sec"], labels)
+        m.add("mtop_disk_read_bytes_total", "counter", "Bytes read from the disk.",
+              s["read_bytes"], labels)
+        m.add("mtop_disk_written_bytes_total", "counter", "Bytes written to the disk.",
+              s["write_bytes"], labels)
+        m.add("mtop_disk_iops", "gauge", "Disk read + write operations per second.",
+              s["iops"], labels)
+        m.add("mtop_disk_utilization_percent", "gauge", "Time the disk was busy.",
+              s["util_pct"], labels)
+
+    # ---------------- PARTITIONS ----------------
+    for part, p in (sample.disk.get("partitions") or {}).items():
+        labels = {"device": part, "mountpoint": p.get("mount", "")}
+        m.add("mtop_partition_size_bytes", "gauge", "Partition size.",
+              p["total_bytes"], labels)
+        m.add("mtop_partition_used_bytes", "gauge", "Partition space used.",
+              p["used_bytes"], labels)
+        m.add("mtop_partition_free_bytes", "gauge", "Partition space available.",
+              p["free_bytes"], labels)
+        m.add("mtop_partition_used_percent", "gauge", "Partition space used.",
+              p["pct"], labels)
+        m.add("mtop_partition_stale", "gauge",
+              "1 if statvfs timed out and the last good value is shown.",
+              int(bool(p.get("stale"))), labels)
+
+    # ---------------- NETWORK ----------------
+    for iface, s in sample.network.items():
+        labels = {"interface": iface}
+        m.add("mtop_network_receive_bytes_per_second", "gauge",
+              "Receive throughput.", round(s["download_speed"], 1), labels)
+        m.add("mtop_network_transmit_bytes_per_second", "gauge",
+              "Transmit throughput.", round(s["upload_speed"], 1), labels)
+        m.add("mtop_network_receive_bytes_total", "counter",
+              "Bytes received.", s["total_receive_bytes"], labels)
+        m.add("mtop_network_transmit_bytes_total", "counter",
+              "Bytes transmitted.", s["total_transmit_bytes"], labels)
+        m.add("mtop_network_receive_packets_total", "counter",
+              "Packets received.", s["receive_packets"], labels)
+        m.add("mtop_network_transmit_packets_total", "counter",
+              "Packets transmitted.", s["transmit_packets"], labels)
+        m.add("mtop_network_receive_errors_total", "counter",
+              "Receive errors.", s["receive_errors"], labels)
+        m.add("mtop_network_transmit_errors_total", "counter",
+              "Transmit errors.", s["transmit_errors"], labels)
+        m.add("mtop_network_dropped_packets_total", "counter",
+              "Packets dropped (receive + transmit).",
+              s["total_dropped_packets"], labels)
+
+    # ---------------- TOP PROCESSES ----------------
+    for p in sample.top_cpu:
+        m.add("mtop_top_process_cpu_percent", "gauge",
+              "CPU usage of the top processes by CPU.",
+              p["cpu"], {"pid": p["pid"], "name": p["name"]})
+    for p in sample.top_memory:
+        m.add("mtop_top_process_resident_bytes", "gauge",
+              "Resident memory of the top processes by RSS.",
+              p["mem"], {"pid": p["pid"], "name": p["name"]})
+
+    return m.render()
+
+
+class PrometheusExporter:
+    """
+    Serves the latest rendered payload at GET /metrics.
+
+    update() is meant to be a CollectorThread listener: it renders on the
+    collector thread and swaps in the new bytes object (an atomic
+    reference assignment), so scrape handlers never lock or render.
+    """
+
+    REQUEST_TIMEOUT = 5.0
+    MAX_REQUEST = 8192
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 9105) -> None:
+        self.host = host
+        self.port = port
+
+        self.payload: bytes = b""
+        self.scrapes = 0
+
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    # ---------------- CACHE ----------------
+    def update(self, sample: Sample) -> None:
+        self.payload = render_prometheus(sample)
+
+    # ---------------- HTTP ----------------
+    @staticmethod
+    def _response(status: str, body: bytes, content_type: str, head: bool) -> bytes:
+        header = (
+            f"HTTP/1.1 {status}\r\n"
+            f"Content-Type: {content_type}\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            "Connection: close\r\n"
+            "\r\n"
+        ).encode("ascii")
+        return header if head else header + body
+
+    async def _handle(
+        self,
+        reader: asyncio.StreamReader,
+        writer: asyncio.StreamWriter,
+    ) -> None:
+        try:
+            request = await asyncio.wait_for(
+                reader.readuntil(b"\r\n\r\n"),
+                self.REQUEST_TIMEOUT,
+            )
+            method, path = request.split(b" ", 2)[:2]
+            head = method == b"HEAD"
+
+            if method not in (b"GET", b"HEAD"):
+                response = self._response(
+                    "405 Method Not Allowed", b"", "text/plain", head
+                )
+            elif path.split(b"?", 1)[0] != b"/metrics":
+                response = self._response(
+                    "404 Not Found", b"see /metrics\n", "text/plain", head
+                )
+            elif not self.payload:
+                response = self._response(
+                    "503 Service Unavailable", b"no sample yet\n", "text/plain", head
+                )
+            else:
+                self.scrapes += 1
+                response = self._response("200 OK", self.payload, CONTENT_TYPE, head)
+
+            writer.write(response)
+            await writer.drain()
+        except (asyncio.TimeoutError, asyncio.IncompleteReadError,
+                asyncio.LimitOverrunError, ValueError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    async def serve_forever(self) -> None:
+        self._loop = asyncio.get_running_loop()
+        self._server = await asyncio.start_server(
+            self._handle,
+            self.host,
+            self.port,
+            limit=self.MAX_REQUEST,
+        )
+        async with self._server:
+            await self._server.serve_forever()
+
+    def start_in_thread(self) -> threading.Thread:
+        """
+        Runs the server on its own event loop in a daemon thread
+        (used alongside the Textual UI, which owns the main loop).
+        """
+        thread = threading.Thread(
+            target=lambda: asyncio.run(self.serve_forever()),
+            name="mtop-prometheus",
+            daemon=True,
+        )
+        thread.start()
+        return thread
+
+    def stop(self) -> None:
+        if self._server is not None and self._loop is not None:
+            self._loop.call_soon_threadsafe(self._server.close)
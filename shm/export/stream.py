@@ -0,0 +1,348 @@
+"""
+Streaming sample exporter (JSON lines or CSV)
+
+    mtop export -o samples.jsonl            every sample, appended
+    mtop export -f csv -o - | my-analysis   wide CSV on stdout
+
+Meant to keep a flat per-sample cost at high sample rates with hundreds
+of interfaces and partitions:
+
+  * the output is opened once (and again only on rotation), records are
+    queued in memory and written with one write() per batch
+  * static fields (CPU model and sockets, memory / swap size) are
+    written only when they change and at the top of every rotated
+    file, never per sample
+  * JSON records only carry the sections whose scheduler task actually
+    ran this tick; readers carry the previous value forward (the first
+    record of every file is complete, so each file stands on its own)
+"""
+
+import csv
+import json
+import os
+import sys
+import time
+from typing import BinaryIO, Dict, List, Optional, Tuple
+
+from shm.collector import Sample
+
+FORMATS = ("jsonl", "csv")
+
+# When to fsync(): never, after every batch, or when a file is closed
+FSYNC_POLICIES = ("never", "batch", "rotate")
+
+# (section, key) pairs that are written only when they change
+STATIC_FIELDS: Tuple[Tuple[str, str], ...] = (
+    ("cpu", "model"),
+    ("cpu", "sockets"),
+    ("memory", "total"),
+    ("memory", "swap_total"),
+)
+
+
+def _static(sample: Sample) -> Dict[str, object]:
+    return {
+        f"{section}.{key}": getattr(sample, section).get(key)
+        for section, key in STATIC_FIELDS
+    }
+
+
+def _without(values: Dict[str, object], keys: Tuple[str, ...]) -> Dict[str, object]:
+    return {key: value for key, value in values.items() if key not in keys}
+
+
+# ================= FORMATS =================
+class JsonLinesFormat:
+    """
+    One object per line:
+
+        {"static": {"cpu.model": ..., "memory.total": ...}}
+        {"seq": 1, "timestamp": ..., "cpu": {...}, "network": {...}, ...}
+
+    A sample record holds seq, timestamp, duration and one key per
+    refreshed section: uptime + load (uptime task), cpu, memory, disk,
+    partitions, network, top_cpu + top_memory (processes task). With
+    `full` every section is written, refreshed or not.
+    """
+
+    STATIC_KEYS = {
+        "cpu": tuple(key for section, key in STATIC_FIELDS if section == "cpu"),
+        "memory": tuple(key for section, key in STATIC_FIELDS if section == "memory"),
+    }
+
+    def __init__(self) -> None:
+        self._encode = json.JSONEncoder(separators=(",", ":")).encode
+
+    def header(self) -> str:
+        return ""
+
+    def static(self, values: Dict[str, object]) -> str:
+        return self._encode({"static": values}) + "\n"
+
+    def record(self, sample: Sample, full: bool = False) -> str:
+        updated = sample.updated
+        if full:
+            updated = frozenset(
+                ("uptime", "cpu", "memory", "disk", "partitions", "network", "processes")
+            )
+        record: Dict[str, object] = {
+            "seq": sample.seq,
+            "timestamp": sample.timestamp,
+            "duration": sample.duration,
+        }
+
+        if "uptime" in updated:
+            record["uptime"] = sample.uptime
+            record["load"] = sample.load
+        if "cpu" in updated:
+            record["cpu"] = _without(sample.cpu, self.STATIC_KEYS["cpu"])
+        if "memory" in updated:
+            record["memory"] = _without(sample.memory, self.STATIC_KEYS["memory"])
+        if "disk" in updated:
+            record["disk"] = _without(sample.disk, ("partitions",))
+        if "partitions" in updated:
+            record["partitions"] = sample.disk.get("partitions", {})
+        if "network" in updated:
+            record["network"] = sample.network
+        if "processes" in updated:
+            record["top_cpu"] = sample.top_cpu
+            record["top_memory"] = sample.top_memory
+
+        return self._encode(record) + "\n"
+
+
+class _LineBuffer:
+    """
+    File-like target for csv.writer that just collects the rows.
+    """
+
+    def __init__(self) -> None:
+        self.rows: List[str] = []
+
+    def write(self, row: str) -> None:
+        self.rows.append(row)
+
+    def take(self) -> str:
+        text = "".join(self.rows)
+        self.rows.clear()
+        return text
+
+
+class CsvFormat:
+    """
+    Wide CSV, one row per sample with dotted column names
+    (cpu.total, network.eth0.download_speed, partitions.sda1.pct, ...).
+
+    Every row is complete: values of tasks that did not run this tick
+    are repeated. Static fields are written as `# key=value` comment
+    lines. When the set of columns changes (an interface or mount comes
+    or goes) a new header row is written before the next row. Top
+    process lists are not included, their columns would change every
+    tick.
+    """
+
+    def __init__(self) -> None:
+        self._buffer = _LineBuffer()
+        self._writer = csv.writer(self._buffer, lineterminator="\n")
+        self._columns: Tuple[str, ...] = ()
+
+    @staticmethod
+    def _flatten(
+        prefix: str,
+        values: Dict[str, object],
+        out: Dict[str, object],
+    ) -> None:
+        for key, value in values.items():
+            name = f"{prefix}.{key}"
+            if isinstance(value, dict):
+                CsvFormat._flatten(name, value, out)
+            else:
+                out[name] = value
+
+    def header(self) -> str:
+        # Force a header row before the first row of a (new) file. Only
+        # called with nothing queued, so no row of the old file can end
+        # up without its header.
+        self._columns = ()
+        return ""
+
+    def static(self, values: Dict[str, object]) -> str:
+        return "".join(f"# {key}={value}\n" for key, value in values.items())
+
+    def record(self, sample: Sample, full: bool = False) -> str:
+        row: Dict[str, object] = {
+            "seq": sample.seq,
+            "timestamp": sample.timestamp,
+            "duration": round(sample.duration, 6),
+            "uptime": sample.uptime,
+        }
+        self._flatten("load", sample.load, row)
+        row["cpu.total"] = sample.cpu.get("total")
+        self._flatten("cpu.cores", sample.cpu.get("cores", {}), row)
+        self._flatten(
+            "memory",
+            _without(sample.memory, JsonLinesFormat.STATIC_KEYS["memory"]),
+            row,
+        )
+        self._flatten("disk", _without(sample.disk, ("partitions",)), row)
+        self._flatten("partitions", sample.disk.get("partitions", {}), row)
+        self._flatten("network", sample.network, row)
+
+        columns = tuple(row)
+        if columns != self._columns:
+            self._columns = columns
+            self._writer.writerow(columns)
+        self._writer.writerow(row.values())
+
+        return self._buffer.take()
+
+
+# ================= EXPORTER =================
+class StreamExporter:
+    """
+    Appends samples to a file (or stdout with path "-").
+
+    Records are queued and written once `batch` are pending or
+    `flush_interval` seconds have passed since the last write. With
+    `max_bytes` the file is rotated like logrotate: path → path.1 →
+    ... → path.<backups>. Rotation happens before the next record is
+    formatted, and every file starts with its header and statics, so
+    each one can be read on its own. Meant to be a CollectorThread
+    listener, or driven by shm.headless.drive().
+    """
+
+    def __init__(
+        self,
+        path: str = "-",
+        fmt: str = "jsonl",
+        batch: int = 10,
+        flush_interval: float = 1.0,
+        fsync: str = "never",
+        max_bytes: Optional[int] = None,
+        backups: int = 5,
+    ) -> None:
+        if fmt not in FORMATS:
+            raise ValueError(f"unknown format {fmt!r} (expected one of {FORMATS})")
+        if fsync not in FSYNC_POLICIES:
+            raise ValueError(
+                f"unknown fsync policy {fsync!r} (expected one of {FSYNC_POLICIES})"
+            )
+
+        self.path = path
+        self.format = JsonLinesFormat() if fmt == "jsonl" else CsvFormat()
+        self.batch = max(batch, 1)
+        self.flush_interval = flush_interval
+        self.fsync = fsync
+        self.max_bytes = max_bytes if path != "-" else None
+        self.backups = backups
+
+        self.samples = 0
+        self.bytes_written = 0
+
+        self._pending: List[str] = []
+        self._pending_size = 0      # characters queued (≈ bytes)
+        self._pending_records = 0   # samples queued (headers, statics excluded)
+        self._last_write = time.monotonic()
+        self._static: Optional[Dict[str, object]] = None
+
+        self._file: Optional[BinaryIO] = None
+        self._size = 0
+        self._new_file = True
+        self._open()
+
+    # ---------------- FILE ----------------
+    def _open(self) -> None:
+        if self.path == "-":
+            self._file = sys.stdout.buffer
+            self._size = 0
+        else:
+            # Buffered: write() then takes every byte or raises, where
+            # a raw file may accept only part of it (full disk)
+            self._file = open(self.path, "ab")
+            self._size = os.fstat(self._file.fileno()).st_size
+
+        # Header and statics go in front of the next record
+        self._new_file = True
+
+    def _close_file(self) -> None:
+        if self._file is None or self.path == "-":
+            return
+        self._file.flush()
+        if self.fsync != "never":
+            os.fsync(self._file.fileno())
+        self._file.close()
+        self._file = None
+
+    def _rotate(self) -> None:
+        self._close_file()
+
+        if self.backups > 0:
+            for i in range(self.backups - 1, 0, -1):
+                src = f"{self.path}.{i}"
+                if os.path.exists(src):
+                    os.replace(src, f"{self.path}.{i + 1}")
+            os.replace(self.path, f"{self.path}.1")
+        else:
+            os.unlink(self.path)
+
+        self._open()
+
+    # ---------------- WRITE ----------------
+    def _queue(self, text: str) -> None:
+        self._pending.append(text)
+        self._pending_size += len(text)
+
+    def update(self, sample: Sample) -> None:
+        # Rotate lazily (closing never leaves an empty file behind) and
+        # before formatting, so the record lands in the new file
+        if (
+            self.max_bytes is not None
+            and self._size + self._pending_size >= self.max_bytes
+        ):
+            self.flush()
+            self._rotate()
+
+        static = _static(sample)
+        new_file, self._new_file = self._new_file, False
+        if new_file:
+            # A new file must be readable on its own
+            self._queue(self.format.header())
+        if new_file or static != self._static:
+            self._static = static
+            self._queue(self.format.static(static))
+
+        self._queue(self.format.record(sample, full=new_file))
+        self._pending_records += 1
+        self.samples += 1
+
+        if (
+            self._pending_records >= self.batch
+            or time.monotonic() - self._last_write >= self.flush_interval
+        ):
+            self.flush()
+
+    def flush(self) -> None:
+        """
+        Writes everything pending in a single write() and flushes it
+        through to the file.
+        """
+        self._last_write = time.monotonic()
+        if not self._pending or self._file is None:
+            return
+
+        data = "".join(self._pending).encode("utf-8")
+        self._pending.clear()
+        self._pending_size = 0
+        self._pending_records = 0
+
+        self._file.write(data)
+        self._file.flush()
+        if self.fsync == "batch" and self.path != "-":
+            os.fsync(self._file.fileno())
+
+        self._size += len(data)
+        self.bytes_written += len(data)
+
+    def close(self) -> None:
+        self.flush()
+        self._close_file()
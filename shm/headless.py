@@ -0,0 +1,93 @@
+"""
+Headless collector (no Textual)
+
+Runs the providers at a fixed interval and writes one JSON object per
+sample to stdout. Meant as a lightweight sampler on many servers, so it
+only imports shm.core / shm.metrics and keeps no history.
+"""
+
+import json
+import sys
+import time
+from typing import Callable, Dict, Optional, TextIO
+
+from shm.collector import Collector, Sample
+
+
+def uniform_intervals(interval: float, processes: bool = True) -> Dict[str, float]:
+    """
+    Schedule with every task on the same interval → complete samples.
+
+    Partition capacity (statvfs per mount) keeps its slower default.
+    """
+    intervals = {
+        name: interval
+        for name in Collector.DEFAULT_SCHEDULE
+        if name != "partitions"
+    }
+    intervals["partitions"] = max(
+        interval, Collector.DEFAULT_SCHEDULE["partitions"][0]
+    )
+    if not processes:
+        intervals["processes"] = 0
+    return intervals
+
+
+def run(
+    interval: float = 1.0,
+    count: Optional[int] = None,
+    processes: bool = True,
+    out: TextIO = sys.stdout,
+) -> None:
+    """
+    Emits a sample every `interval` seconds (`count` samples, or forever).
+    """
+    collector = Collector(intervals=uniform_intervals(interval, processes))
+    stream(collector, count=count, out=out)
+
+
+def drive(
+    collector: Collector,
+    emit: Callable[[Sample], None],
+    count: Optional[int] = None,
+) -> int:
+    """
+    Calls emit() with every sample, pacing by next_deadline().
+
+    Stops after `count` samples or when the collector raises EOFError
+    (end of a replayed capture). Returns the number of samples emitted.
+    """
+    emitted = 0
+    while count is None or emitted < count:
+        try:
+            sample = collector.collect()
+        except EOFError:
+            break
+
+        emit(sample)
+        emitted += 1
+
+        if count is not None and emitted >= count:
+            break
+
+        time.sleep(max(collector.next_deadline() - time.monotonic(), 0.0))
+
+    return emitted
+
+
+def stream(
+    collector: Collector,
+    count: Optional[int] = None,
+    out: TextIO = sys.stdout,
+) -> None:
+    """
+    Writes collector samples as JSON lines, one flush per sample.
+    """
+    encode = json.JSONEncoder(separators=(",", ":")).encode
+
+    def emit(sample: Sample) -> None:
+        out.write(encode(sample.to_dict()))
+        out.write("\n")
+        out.flush()
+
+    drive(collector, emit, count)
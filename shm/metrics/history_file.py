@@ -0,0 +1,190 @@
+import mmap
+import os
+import struct
+from typing import Dict, Optional, Sequence, Tuple
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - non-POSIX
+    fcntl = None
+
+from shm.metrics.timeseries import DEFAULT_TIERS, Series, TimeSeriesStore
+
+
+def default_history_path() -> str:
+    """
+    $XDG_STATE_HOME/mtop/history.bin (default ~/.local/state/mtop/history.bin)
+    """
+    state_home = os.environ.get("XDG_STATE_HOME") or os.path.join(
+        os.path.expanduser("~"), ".local", "state"
+    )
+    return os.path.join(state_home, "mtop", "history.bin")
+
+
+class MappedTimeSeriesStore(TimeSeriesStore):
+    """
+    TimeSeriesStore whose series live in a fixed-size memory-mapped file.
+
+    Every Tier keeps all of its state (ring head, count, in-progress
+    bucket) inside its buffer, so mapping those buffers onto a file makes
+    history survive restarts at no extra cost: a sample is still a few
+    in-place stores, never a file rewrite. The kernel writes dirty pages
+    back on its own.
+
+    On-disk layout, version 1 (native byte order):
+        header     256 bytes  magic, version, byte-order mark, slot count,
+                              name size, tier count, (step f64, capacity u32,
+                              pad u32) per tier
+        directory  slots x 64 bytes, NUL-padded UTF-8 series names
+        data       page aligned, slots x Series.nbytes(tiers)
+
+    A file with a different version, byte order or tier layout is
+    reinitialised. Series beyond `slots` fall back to plain memory.
+    """
+
+    MAGIC = b"MTOPHIST"
+    VERSION = 1
+    BYTE_ORDER_MARK = 0x01020304
+
+    HEADER_SIZE = 256
+    NAME_SIZE = 64
+    MAX_TIERS = 8
+
+    _HEADER = struct.Struct("=8sIIIII")
+    _TIER = struct.Struct("=dII")
+
+    def __init__(
+        self,
+        path: str,
+        slots: int = 32,
+        tiers: Sequence[Tuple[float, int]] = DEFAULT_TIERS,
+    ) -> None:
+        super().__init__(tiers)
+
+        if len(self.tiers) > self.MAX_TIERS:
+            raise ValueError(f"at most {self.MAX_TIERS} tiers can be persisted")
+
+        self.path = path
+        self.slots = slots
+        self.slot_size = Series.nbytes(self.tiers)
+
+        directory_end = self.HEADER_SIZE + slots * self.NAME_SIZE
+        self.data_offset = -(-directory_end // mmap.PAGESIZE) * mmap.PAGESIZE
+        self.size = self.data_offset + slots * self.slot_size
+
+        # name -> slot index for series stored in the file
+        self._slot_of: Dict[str, int] = {}
+
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._fd = os.open(path, os.O_RDWR | os.O_CREAT | os.O_CLOEXEC, 0o600)
+
+        try:
+            if fcntl is not None:
+                # One writer per file; a second mtop gets an OSError here
+                fcntl.flock(self._fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+
+            if os.fstat(self._fd).st_size != self.size:
+                os.ftruncate(self._fd, self.size)
+
+            self._mmap = mmap.mmap(self._fd, self.size)
+        except OSError:
+            os.close(self._fd)
+            raise
+
+        self._view = memoryview(self._mmap)
+
+        if not self._header_matches():
+            self._initialise()
+        self._load_directory()
+
+    # ---------------- LAYOUT ----------------
+    def _header_bytes(self) -> bytes:
+        header = self._HEADER.pack(
+            self.MAGIC,
+            self.VERSION,
+            self.BYTE_ORDER_MARK,
+            self.slots,
+            self.NAME_SIZE,
+            len(self.tiers),
+        )
+        for step, capacity in self.tiers:
+            header += self._TIER.pack(step, capacity, 0)
+        return header.ljust(self.HEADER_SIZE, b"\0")
+
+    def _header_matches(self) -> bool:
+        return self._mmap[:self.HEADER_SIZE] == self._header_bytes()
+
+    def _initialise(self) -> None:
+        # Zero everything (directory + data) then stamp the header last
+        self._mmap[:self.size] = bytes(self.size)
+        self._mmap[:self.HEADER_SIZE] = self._header_bytes()
+
+    def _name_offset(self, slot: int) -> int:
+        return self.HEADER_SIZE + slot * self.NAME_SIZE
+
+    def _slot_buffer(self, slot: int) -> memoryview:
+        start = self.data_offset + slot * self.slot_size
+        return self._view[start:start + self.slot_size]
+
+    def _load_directory(self) -> None:
+        for slot in range(self.slots):
+            offset = self._name_offset(slot)
+            raw = bytes(self._mmap[offset:offset + self.NAME_SIZE]).rstrip(b"\0")
+            if not raw:
+                continue
+
+            name = raw.decode("utf-8", "replace")
+            self._slot_of[name] = slot
+            self.series[name] = Series(self.tiers, buf=self._slot_buffer(slot))
+
+    # ---------------- STORE ----------------
+    def _create(self, name: str) -> Series:
+        encoded = name.encode("utf-8")
+        used = set(self._slot_of.values())
+        free = next((s for s in range(self.slots) if s not in used), None)
+
+        if free is None or len(encoded) >= self.NAME_SIZE:
+            # File is full → keep this series in memory only
+            return super()._create(name)
+
+        buf = self._slot_buffer(free)
+        buf[:] = bytes(self.slot_size)
+
+        offset = self._name_offset(free)
+        self._mmap[offset:offset + self.NAME_SIZE] = encoded.ljust(self.NAME_SIZE, b"\0")
+        self._slot_of[name] = free
+
+        return Series(self.tiers, buf=buf)
+
+    def flush(self) -> None:
+        self._mmap.flush()
+
+    def close(self) -> None:
+        """
+        Flushes and unmaps the file (series must not be used afterwards).
+        """
+        self.flush()
+        self.series.clear()
+        self._slot_of.clear()
+
+        try:
+            self._view.release()
+            self._mmap.close()
+        except BufferError:
+            # A caller still holds a view; the mapping goes with the process
+            pass
+
+        os.close(self._fd)
+
+
+def open_history(path: Optional[str] = None) -> TimeSeriesStore:
+    """
+    Opens persistent history at `path` (default location if None).
+
+    Falls back to an in-memory store if the file cannot be used, e.g. a
+    read-only home or another mtop already holding the lock.
+    """
+    try:
+        return MappedTimeSeriesStore(path or default_history_path())
+    except (OSError, ValueError):
+        return TimeSeriesStore()
@@ -1,8 +1,12 @@
-import os
+from typing import Dict, List, Optional
+
+from shm.metrics.proc_scan import ProcessScanner, ProcessSnapshot
+
 
 class MemoryCalcProvider:
-    def __init__(self):
-        pass
+    def __init__(self, scanner: Optional[ProcessScanner] = None):
+        # Shared with ProcessProvider so PIDs are walked once per tick
+        self.scanner = scanner or ProcessScanner()
 
     # ---------------- PROCESS MEMORY ----------------
     def get_process_memory(self, pid):
@@ -19,30 +23,22 @@ class MemoryCalcProvider:
             pass
         return 0
 
-    def get_top_memory_processes(self, limit=10):
+    def get_top_memory_processes(
+        self,
+        limit: int = 10,
+        snapshot: Optional[ProcessSnapshot] = None,
+    ) -> List[Dict[str, object]]:
         """
         Returns a sorted list of top memory-consuming processes
-        """
-        processes = []
 
-        # Filter for numeric PID directories in /proc
-        for pid in filter(str.isdigit, os.listdir("/proc")):
-            mem = self.get_process_memory(pid)
-            if mem <= 0:
-                continue
-
-            try:
-                with open(f"/proc/{pid}/comm", "r") as f:
-                    name = f.read().strip()
-            except Exception:
-                name = "unknown"
-
-            processes.append({
-                "pid": pid,
-                "name": name,
-                "mem": mem
-            })
+        Pass an existing `snapshot` to rank without rescanning /proc.
+        """
+        if snapshot is None:
+            snapshot = self.scanner.scan()
 
-        # Sort by memory usage descending
-        processes.sort(key=lambda x: x["mem"], reverse=True)
-        return processes[:limit]
+        # Sort by memory usage descending (kernel threads have no RSS)
+        return [
+            {"pid": p["pid"], "name": p["name"], "mem": p["rss"]}
+            for p in snapshot.top("rss", limit)
+            if p["rss"] > 0
+        ]
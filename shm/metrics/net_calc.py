@@ -1,7 +1,8 @@
 import time
-from typing import Dict, Tuple
+from typing import Dict, Optional, Tuple
 
 from shm.core.network import NetworkProvider
+from shm.core.snapshot import TickSnapshot
 
 
 class NetworkCalcProvider:
@@ -18,11 +19,17 @@ class NetworkCalcProvider:
     # --------------------------------------------------
     # PUBLIC API
     # --------------------------------------------------
-    def get_metrics(self) -> Dict[str, Dict[str, float]]:
-        now = time.time()
-        delta_time = max(now - self._last_ts, self._TIME_EPSILON)
+    def get_metrics(
+        self,
+        tick: Optional[TickSnapshot] = None,
+    ) -> Dict[str, Dict[str, float]]:
+        tick = tick or TickSnapshot()
 
-        raw = self._provider._read_network_file()
+        raw = self._provider._read_network_file(tick)
+
+        # Rates use the moment /proc/net/dev was actually read
+        now = tick.read_time(NetworkProvider.NETDEV_PATH)
+        delta_time = max(now - self._last_ts, self._TIME_EPSILON)
         metrics: Dict[str, Dict[str, float]] = {}
 
         for iface, data in raw.items():
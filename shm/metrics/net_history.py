@@ -0,0 +1,80 @@
+from typing import Dict, List, Mapping, Sequence, Tuple
+
+from shm.metrics.timeseries import Series
+
+
+# 10 minutes at 1 s, then a day at 1 min (~40 KiB per series, in memory)
+INTERFACE_TIERS: Tuple[Tuple[float, int], ...] = (
+    (1.0, 600),
+    (60.0, 1440),
+)
+
+
+class InterfaceHistory:
+    """
+    RX / TX rate history per network interface, plus the totals.
+
+    Hosts with containers have hundreds of veth/tap interfaces, most of
+    them idle, so an interface only gets its two series once it carries
+    traffic, and loses them when it disappears. A sample costs one
+    Series.add per tracked interface and direction; reads happen only
+    for the interfaces a graph actually shows.
+    """
+
+    def __init__(self, tiers: Sequence[Tuple[float, int]] = INTERFACE_TIERS) -> None:
+        self.tiers = tuple(tiers)
+
+        # iface -> (rx, tx)
+        self.series: Dict[str, Tuple[Series, Series]] = {}
+
+    def add(self, ts: float, net: Mapping[str, Mapping[str, float]]) -> Tuple[float, float]:
+        """
+        Records every interface of one NetworkCalcProvider sample.
+
+        Returns (rx total, tx total) in bytes/s over all interfaces.
+        """
+        rx_total = tx_total = 0.0
+        series = self.series
+
+        for iface, stats in net.items():
+            down = stats.get("download_speed", 0.0)
+            up = stats.get("upload_speed", 0.0)
+            rx_total += down
+            tx_total += up
+
+            pair = series.get(iface)
+            if pair is None:
+                if not (down or up):
+                    continue
+                pair = series[iface] = (Series(self.tiers), Series(self.tiers))
+
+            pair[0].add(ts, down)
+            pair[1].add(ts, up)
+
+        # Interface gone (container stopped) → free its history
+        for iface in [i for i in series if i not in net]:
+            del series[iface]
+
+        return rx_total, tx_total
+
+    # ---------------- READ ----------------
+    def window(
+        self,
+        iface: str,
+        span: float,
+        points: int = 60,
+    ) -> Tuple[List[float], List[float]]:
+        """
+        (rx, tx) of `iface` over the last `span` seconds.
+        """
+        pair = self.series.get(iface)
+        if pair is None:
+            return [], []
+        return pair[0].window(span, points), pair[1].window(span, points)
+
+    def combined(self, iface: str, span: float, points: int = 60) -> List[float]:
+        """
+        RX + TX of `iface` over the last `span` seconds.
+        """
+        rx, tx = self.window(iface, span, points)
+        return [a + b for a, b in zip(rx, tx)]
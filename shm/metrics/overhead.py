@@ -0,0 +1,155 @@
+import os
+import time
+from collections import deque
+from typing import Callable, Deque, Dict, List, Tuple
+
+
+# Runs (or ticks) the rolling averages and maxima cover
+OVERHEAD_WINDOW = 60
+
+STATM_PATH = "/proc/self/statm"
+PAGE_SIZE = os.sysconf("SC_PAGE_SIZE")
+
+
+class Rolling:
+    """
+    Last `window` values of one measurement; average and max on demand.
+
+    Recording is a deque append, so it can stay on for every call.
+    """
+
+    __slots__ = ("values", "total")
+
+    def __init__(self, window: int = OVERHEAD_WINDOW) -> None:
+        self.values: Deque[float] = deque(maxlen=window)
+        self.total = 0          # values ever recorded
+
+    def add(self, value: float) -> None:
+        self.values.append(value)
+        self.total += 1
+
+    @property
+    def last(self) -> float:
+        return self.values[-1] if self.values else 0.0
+
+    @property
+    def average(self) -> float:
+        values = self.values
+        return sum(values) / len(values) if values else 0.0
+
+    @property
+    def maximum(self) -> float:
+        return max(self.values, default=0.0)
+
+
+class Stage:
+    """
+    Wall and CPU time of one named stage (a provider call, a render).
+
+    CPU time is the calling thread's (time.thread_time), so collector
+    and UI stages are not charged for each other's work.
+    """
+
+    __slots__ = ("name", "wall", "cpu", "_started")
+
+    def __init__(self, name: str, window: int = OVERHEAD_WINDOW) -> None:
+        self.name = name
+        self.wall = Rolling(window)
+        self.cpu = Rolling(window)
+        self._started: Tuple[float, float] = (0.0, 0.0)
+
+    def __enter__(self) -> "Stage":
+        self._started = (time.perf_counter(), time.thread_time())
+        return self
+
+    def __exit__(self, *exc) -> None:
+        wall, cpu = self._started
+        self.wall.add(time.perf_counter() - wall)
+        self.cpu.add(time.thread_time() - cpu)
+
+
+def _process_times() -> Tuple[float, float]:
+    times = os.times()
+    return times.user + times.system, time.monotonic()
+
+
+class Overhead:
+    """
+    Always-on timing of mtop's own work, per stage.
+
+    Stages are named after what they time ("CPUProvider.get_metrics",
+    "CPUWidget.update", ...) and created on first use. Each one is timed
+    from a single thread; readers (the diagnostics panel) only see
+    rolling windows, so nothing needs a lock. Counters hold per-tick
+    numbers such as files read.
+    """
+
+    CPU_PERIOD = 1.0
+
+    def __init__(self, window: int = OVERHEAD_WINDOW) -> None:
+        self.window = window
+        self.stages: Dict[str, Stage] = {}
+        self.counters: Dict[str, Rolling] = {}
+
+        # Whole-process CPU, as a share of one core over at least
+        # CPU_PERIOD (os.times() only moves in clock ticks)
+        self._times = _process_times()
+        self._cpu_percent = 0.0
+
+    # ---------------- RECORD ----------------
+    def measure(self, name: str) -> Stage:
+        """
+        `with overhead.measure("X.y"): ...` times the block as stage X.y.
+
+        Stages are reused, so a stage must not be entered twice at once.
+        """
+        stage = self.stages.get(name)
+        if stage is None:
+            stage = self.stages[name] = Stage(name, self.window)
+        return stage
+
+    def timed(self, name: str, func: Callable[..., object]) -> Callable[..., object]:
+        """
+        Returns `func` wrapped in measure(name).
+        """
+        stage = self.measure(name)
+
+        def run(*args):
+            with stage:
+                return func(*args)
+
+        return run
+
+    def count(self, name: str, value: float) -> None:
+        counter = self.counters.get(name)
+        if counter is None:
+            counter = self.counters[name] = Rolling(self.window)
+        counter.add(value)
+
+    # ---------------- READ ----------------
+    def rows(self) -> List[Stage]:
+        # Copy first: the other thread may add a stage meanwhile
+        return list(self.stages.values())
+
+    @staticmethod
+    def rss() -> int:
+        """
+        Resident memory of this process in bytes (0 if unknown).
+        """
+        try:
+            with open(STATM_PATH, "rb") as file:
+                return int(file.read().split()[1]) * PAGE_SIZE
+        except (OSError, IndexError, ValueError):
+            return 0
+
+    def cpu_percent(self) -> float:
+        """
+        CPU used by the whole process, % of one core, over the last
+        CPU_PERIOD or more.
+        """
+        cpu, now = _process_times()
+        elapsed = now - self._times[1]
+        if elapsed >= self.CPU_PERIOD:
+            self._cpu_percent = 100.0 * (cpu - self._times[0]) / elapsed
+            self._times = (cpu, now)
+        return self._cpu_percent
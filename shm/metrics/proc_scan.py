@@ -0,0 +1,196 @@
+import heapq
+import os
+from typing import Dict, List, Optional, Tuple
+
+from shm.core.snapshot import TickSnapshot
+
+
+class ProcessSnapshot:
+    """
+    One pass over the process table.
+
+    Every ranking (top CPU, top RSS, ...) is served from the same
+    snapshot so /proc/[pid] is only read once per refresh.
+    """
+
+    def __init__(
+        self,
+        processes: Dict[str, Dict[str, object]],
+        timestamp: float,
+        users: Optional[Dict[int, str]] = None,
+    ) -> None:
+        # { pid: { pid, name, state, ppid, threads, ticks, start, rss, cpu, uid } }
+        self.processes = processes
+        self.timestamp = timestamp
+
+        # uid -> user name (from the scanned host's /etc/passwd)
+        self.users = users or {}
+
+    def user(self, uid: int) -> str:
+        return self.users.get(uid) or str(uid)
+
+    def __len__(self) -> int:
+        return len(self.processes)
+
+    def top(self, key: str, limit: int = 10) -> List[Dict[str, object]]:
+        """
+        Returns the `limit` processes with the highest value for `key`.
+        """
+        return heapq.nlargest(
+            limit,
+            self.processes.values(),
+            key=lambda item: item[key],
+        )
+
+
+class ProcessScanner:
+    """
+    Single-pass process table scanner using /proc/[pid]/stat.
+    Linux-specific implementation.
+
+    /proc/[pid]/stat already carries the command name, state, thread
+    count, CPU ticks and RSS, so one small read per PID is enough to
+    serve both the CPU and the memory rankings.
+    """
+
+    PROC_PATH = "/proc"
+    PASSWD_PATH = "/etc/passwd"
+
+    def __init__(self) -> None:
+        # Processes are keyed by (pid, start time): a PID reused by a new
+        # process must not inherit the old one's ticks or user
+
+        # { (pid, start): (ticks, timestamp) }
+        self.last: Dict[Tuple[str, int], Tuple[int, float]] = {}
+
+        # { (pid, start): uid } → /proc/[pid]/status is read once per process
+        self.uids: Dict[Tuple[str, int], int] = {}
+        self.users: Optional[Dict[int, str]] = None
+
+        # System clock ticks per second (typically 100)
+        self.clk: int = os.sysconf(os.sysconf_names["SC_CLK_TCK"])
+        self.page_size: int = os.sysconf("SC_PAGE_SIZE")
+
+        self.snapshot: Optional[ProcessSnapshot] = None
+
+    def _read_stat(self, pid: str, tick: TickSnapshot) -> Optional[Dict[str, object]]:
+        """
+        Parses /proc/[pid]/stat into a process record (without CPU %).
+        """
+        try:
+            # Single record → one read() is enough
+            data = tick.read_transient(f"{self.PROC_PATH}/{pid}/stat", 4096)
+        except OSError:
+            return None
+
+        # comm may contain spaces and parentheses → split on the LAST ')'
+        lpar = data.find(b"(")
+        rpar = data.rfind(b")")
+        if lpar < 0 or rpar < 0:
+            return None
+
+        fields = data[rpar + 2:].split()
+
+        try:
+            # fields[0] is field 3 (state) in proc(5) numbering
+            return {
+                "pid": pid,
+                "name": data[lpar + 1:rpar].decode("utf-8", "replace"),
+                "state": fields[0].decode("ascii", "replace"),
+                "ppid": int(fields[1]),
+                # utime (14) + stime (15)
+                "ticks": int(fields[11]) + int(fields[12]),
+                "threads": int(fields[17]),
+                # starttime (22), clock ticks after boot
+                "start": int(fields[19]),
+                # rss (24) is in pages
+                "rss": int(fields[21]) * self.page_size,
+            }
+        except (IndexError, ValueError):
+            return None
+
+    def _read_uid(self, pid: str, tick: TickSnapshot) -> int:
+        """
+        Real UID from /proc/[pid]/status (-1 if unreadable).
+        """
+        try:
+            # Uid: is within the first few hundred bytes
+            data = tick.read_transient(f"{self.PROC_PATH}/{pid}/status", 1024)
+        except OSError:
+            return -1
+
+        start = data.find(b"\nUid:")
+        if start < 0:
+            return -1
+        try:
+            return int(data[start + 5:].split(None, 1)[0])
+        except (IndexError, ValueError):
+            return -1
+
+    def _read_users(self, tick: TickSnapshot) -> Dict[int, str]:
+        """
+        uid -> name, read once through the tick (so captures and remote
+        agents carry the scanned host's names).
+        """
+        users: Dict[int, str] = {}
+        try:
+            text = tick.read(self.PASSWD_PATH, keep_open=False)
+        except OSError:
+            return users
+
+        for line in text.splitlines():
+            fields = line.split(":")
+            if len(fields) > 2 and fields[2].isdigit():
+                users.setdefault(int(fields[2]), fields[0])
+        return users
+
+    def scan(self, tick: Optional[TickSnapshot] = None) -> ProcessSnapshot:
+        """
+        Reads every process once and computes CPU % since the last scan.
+        """
+        tick = tick or TickSnapshot()
+        now = tick.timestamp
+        processes: Dict[str, Dict[str, object]] = {}
+        current: Dict[Tuple[str, int], Tuple[int, float]] = {}
+        uids: Dict[Tuple[str, int], int] = {}
+
+        if self.users is None:
+            self.users = self._read_users(tick)
+
+        try:
+            pids = tick.listdir(self.PROC_PATH)
+        except OSError:
+            pids = []
+
+        # Iterate numeric PIDs in /proc
+        for pid in filter(str.isdigit, pids):
+            record = self._read_stat(pid, tick)
+            if record is None:
+                continue
+
+            key = (pid, record["start"])
+            ticks = record["ticks"]
+            prev_ticks, prev_time = self.last.get(key, (ticks, now))
+
+            tick_diff = ticks - prev_ticks
+            time_diff = now - prev_time
+
+            if tick_diff > 0 and time_diff > 0:
+                # CPU % = (delta_ticks / clock_ticks_per_sec) / delta_time * 100
+                record["cpu"] = round((tick_diff / self.clk) / time_diff * 100, 1)
+            else:
+                record["cpu"] = 0.0
+
+            uid = self.uids.get(key)
+            if uid is None:
+                uid = self._read_uid(pid, tick)
+            record["uid"] = uids[key] = uid
+
+            processes[pid] = record
+            current[key] = (ticks, now)
+
+        # Exited PIDs drop out here instead of accumulating forever
+        self.last = current
+        self.uids = uids
+        self.snapshot = ProcessSnapshot(processes, now, self.users)
+        return self.snapshot
@@ -0,0 +1,234 @@
+import math
+from typing import Dict, List, Optional, Sequence, Tuple
+
+
+# Rolling windows offered for percentiles (seconds)
+SKETCH_WINDOWS: Tuple[int, ...] = (60, 900, 3600)
+
+# What widgets show: p50 / p95 / p99 (max is tracked exactly)
+QUANTILES: Tuple[float, ...] = (0.5, 0.95, 0.99)
+
+
+class QuantileSketch:
+    """
+    Mergeable streaming quantile sketch with relative error `alpha`
+    (DDSketch-style logarithmic buckets).
+
+    A value v > 0 lands in bucket ceil(log(v) / log(gamma)), with
+    gamma = (1 + alpha) / (1 - alpha), so every quantile is within
+    alpha of the true value however skewed the data is. Memory is
+    bounded by MAX_BUCKETS: past that the lowest buckets are folded
+    together, which only affects the lowest quantiles. Two sketches
+    with the same alpha merge by adding bucket counts.
+    """
+
+    MAX_BUCKETS = 2048
+
+    # Values at or below this count as zero (idle cores, silent links)
+    ZERO = 1e-9
+
+    def __init__(self, alpha: float = 0.01) -> None:
+        self.alpha = alpha
+        self.gamma = (1 + alpha) / (1 - alpha)
+        self._log_gamma = math.log(self.gamma)
+
+        self.buckets: Dict[int, int] = {}
+        self.zeros = 0
+        self.count = 0
+        self.max = 0.0
+
+    def clear(self) -> None:
+        self.buckets.clear()
+        self.zeros = 0
+        self.count = 0
+        self.max = 0.0
+
+    # ---------------- WRITE ----------------
+    def add(self, value: float) -> None:
+        self.count += 1
+        if self.count == 1 or value > self.max:
+            self.max = value
+
+        if value <= self.ZERO:
+            self.zeros += 1
+            return
+
+        key = math.ceil(math.log(value) / self._log_gamma)
+        buckets = self.buckets
+        buckets[key] = buckets.get(key, 0) + 1
+
+        if len(buckets) > self.MAX_BUCKETS:
+            self._collapse()
+
+    def _collapse(self) -> None:
+        keys = sorted(self.buckets)
+        excess = len(keys) - self.MAX_BUCKETS
+        folded = sum(self.buckets.pop(key) for key in keys[:excess])
+        first = keys[excess]
+        self.buckets[first] += folded
+
+    def merge(self, other: "QuantileSketch") -> None:
+        if other.gamma != self.gamma:
+            raise ValueError("cannot merge sketches with different accuracy")
+        if not other.count:
+            return
+
+        if not self.count or other.max > self.max:
+            self.max = other.max
+        self.count += other.count
+        self.zeros += other.zeros
+
+        buckets = self.buckets
+        for key, n in other.buckets.items():
+            buckets[key] = buckets.get(key, 0) + n
+
+        if len(buckets) > self.MAX_BUCKETS:
+            self._collapse()
+
+    # ---------------- READ ----------------
+    def quantiles(self, qs: Sequence[float]) -> List[float]:
+        """
+        Returns the value at each quantile in `qs` (ascending, 0..1).
+        """
+        if not self.count:
+            return [0.0 for _ in qs]
+
+        out: List[float] = []
+        keys = sorted(self.buckets)
+        index = 0
+        seen = self.zeros
+
+        for q in qs:
+            rank = q * (self.count - 1)
+            if rank < self.zeros:
+                out.append(0.0)
+                continue
+
+            while index < len(keys) and seen + self.buckets[keys[index]] <= rank:
+                seen += self.buckets[keys[index]]
+                index += 1
+
+            if index == len(keys):
+                out.append(self.max)
+                continue
+
+            # Bucket midpoint (in relative terms) → error ≤ alpha
+            value = 2 * self.gamma ** keys[index] / (self.gamma + 1)
+            out.append(min(value, self.max))
+
+        return out
+
+
+class RollingQuantiles:
+    """
+    Quantiles of one metric over several rolling windows.
+
+    Each window is a ring of `slices` sketches covering window / slices
+    seconds each; a query merges the slices still inside the window
+    (so the window edge has slice granularity, 5 s for 1 minute). A
+    sample costs one sketch insert per window and memory stays bounded
+    no matter how long mtop runs.
+    """
+
+    def __init__(
+        self,
+        windows: Sequence[int] = SKETCH_WINDOWS,
+        slices: int = 12,
+        alpha: float = 0.01,
+    ) -> None:
+        self.windows = tuple(windows)
+        self.slices = slices
+        self.alpha = alpha
+
+        # window -> ring of [slice start, sketch]
+        self._rings: Dict[int, List[list]] = {
+            window: [[-1.0, QuantileSketch(alpha)] for _ in range(slices)]
+            for window in self.windows
+        }
+        self.latest: Optional[float] = None
+
+    def add(self, ts: float, value: float) -> None:
+        self.latest = ts
+        for window, ring in self._rings.items():
+            step = window / self.slices
+            start = ts - ts % step
+            slot = ring[int(start // step) % self.slices]
+
+            if slot[0] != start:
+                # Slot still holds a slice from one lap ago → reuse it
+                slot[0] = start
+                slot[1].clear()
+            slot[1].add(value)
+
+    def sketch(self, window: int, now: Optional[float] = None) -> QuantileSketch:
+        """
+        Merged sketch of the last `window` seconds.
+        """
+        if now is None:
+            now = self.latest if self.latest is not None else 0.0
+
+        merged = QuantileSketch(self.alpha)
+        oldest = now - window
+        for start, sketch in self._rings[window]:
+            if start > oldest:
+                merged.merge(sketch)
+        return merged
+
+
+class SketchStore:
+    """
+    Named RollingQuantiles, created on first use.
+
+    Summaries are memoized for SUMMARY_TTL seconds of sample time:
+    percentiles over a minute or more barely move between ticks, and
+    many cores x windows would otherwise be merged on every redraw.
+    """
+
+    SUMMARY_TTL = 1.0
+
+    def __init__(self, windows: Sequence[int] = SKETCH_WINDOWS) -> None:
+        self.windows = tuple(windows)
+        self.metrics: Dict[str, RollingQuantiles] = {}
+
+        # (name, window, qs) -> (computed at, summary)
+        self._summaries: Dict[tuple, Tuple[float, Optional[List[float]]]] = {}
+
+    def add(self, name: str, ts: float, value: float) -> None:
+        metric = self.metrics.get(name)
+        if metric is None:
+            metric = self.metrics[name] = RollingQuantiles(self.windows)
+        metric.add(ts, value)
+
+    def discard(self, prefix: str) -> None:
+        """
+        Forgets every metric whose name starts with `prefix`, and its
+        cached summaries (an interface or disk that went away). Include
+        the trailing dot: "net.eth1." must not match net.eth10.
+        """
+        for name in [n for n in self.metrics if n.startswith(prefix)]:
+            del self.metrics[name]
+        for key in [k for k in self._summaries if k[0].startswith(prefix)]:
+            del self._summaries[key]
+
+    def summary(
+        self,
+        name: str,
+        window: int,
+        qs: Sequence[float] = QUANTILES,
+    ) -> Optional[List[float]]:
+        """
+        Returns [q..., max] for `name` over `window`, or None if unknown.
+        """
+        metric = self.metrics.get(name)
+        if metric is None or metric.latest is None:
+            return None
+
+        key = (name, window, tuple(qs))
+        cached = self._summaries.get(key)
+        if cached is not None and metric.latest - cached[0] < self.SUMMARY_TTL:
+            return cached[1]
+
+        sketch = metric.sketch(window)
+        summary = sketch.quantiles(qs) + [sketch.max] if sketch.count else None
+        self._summaries[key] = (metric.latest, summary)
+        return summary
@@ -0,0 +1,251 @@
+from typing import Dict, List, Optional, Sequence, Tuple
+
+
+# (bucket seconds, buckets kept) → 1 s for 10 min, 10 s for 6 h, 1 min for 7 days
+DEFAULT_TIERS: Tuple[Tuple[float, int], ...] = (
+    (1.0, 600),
+    (10.0, 2160),
+    (60.0, 10080),
+)
+
+# Graph zoom levels (seconds shown)
+ZOOM_SPANS: Tuple[int, ...] = (60, 600, 3600, 6 * 3600, 86400, 7 * 86400)
+
+
+def format_span(seconds: float) -> str:
+    """
+    Formats a zoom span as 1m / 10m / 1h / 6h / 1d / 7d.
+    """
+    if seconds >= 86400:
+        return f"{seconds / 86400:g}d"
+    if seconds >= 3600:
+        return f"{seconds / 3600:g}h"
+    if seconds >= 60:
+        return f"{seconds / 60:g}m"
+    return f"{seconds:g}s"
+
+
+class Tier:
+    """
+    Fixed-size ring of (timestamp, min, max, avg) buckets over one buffer.
+
+    All state, including the ring head and the bucket currently being
+    accumulated, lives in the buffer itself, so a tier can be backed by
+    plain memory or by a memory-mapped file without any extra bookkeeping.
+
+    Buffer layout (native endianness):
+        meta  8 x f64   head, count, bucket_ts, min, max, sum, n, reserved
+        ts    capacity x f64
+        min   capacity x f32
+        max   capacity x f32
+        avg   capacity x f32
+    """
+
+    META_FIELDS = 8
+    HEAD, COUNT, BUCKET, MIN, MAX, SUM, N = range(7)
+
+    @staticmethod
+    def nbytes(capacity: int) -> int:
+        size = Tier.META_FIELDS * 8 + capacity * 8 + capacity * 4 * 3
+        # Keep the next tier 8-byte aligned
+        return (size + 7) & ~7
+
+    def __init__(self, step: float, capacity: int, buf: memoryview) -> None:
+        self.step = step
+        self.capacity = capacity
+
+        offset = self.META_FIELDS * 8
+        self.meta = buf[:offset].cast("d")
+
+        self.ts = buf[offset:offset + capacity * 8].cast("d")
+        offset += capacity * 8
+        self.min = buf[offset:offset + capacity * 4].cast("f")
+        offset += capacity * 4
+        self.max = buf[offset:offset + capacity * 4].cast("f")
+        offset += capacity * 4
+        self.avg = buf[offset:offset + capacity * 4].cast("f")
+
+    def __len__(self) -> int:
+        return int(self.meta[self.COUNT])
+
+    # ---------------- WRITE ----------------
+    def add(self, ts: float, value: float) -> None:
+        """
+        Folds one sample into its bucket (O(1), no allocation).
+        """
+        meta = self.meta
+        bucket = ts - ts % self.step
+
+        if meta[self.N] and bucket != meta[self.BUCKET]:
+            self._flush()
+
+        if meta[self.N]:
+            if value < meta[self.MIN]:
+                meta[self.MIN] = value
+            if value > meta[self.MAX]:
+                meta[self.MAX] = value
+            meta[self.SUM] += value
+            meta[self.N] += 1
+        else:
+            meta[self.BUCKET] = bucket
+            meta[self.MIN] = meta[self.MAX] = meta[self.SUM] = value
+            meta[self.N] = 1
+
+    def _flush(self) -> None:
+        meta = self.meta
+        head = int(meta[self.HEAD])
+
+        self.ts[head] = meta[self.BUCKET]
+        self.min[head] = meta[self.MIN]
+        self.max[head] = meta[self.MAX]
+        self.avg[head] = meta[self.SUM] / meta[self.N]
+
+        meta[self.HEAD] = (head + 1) % self.capacity
+        meta[self.COUNT] = min(meta[self.COUNT] + 1, self.capacity)
+        meta[self.N] = 0
+
+    # ---------------- READ ----------------
+    def buckets(self, since: float) -> List[Tuple[float, float, float, float]]:
+        """
+        Returns [(ts, min, max, avg), ...] oldest first, for buckets at or
+        after `since`, including the one still being filled.
+        """
+        meta = self.meta
+        count = int(meta[self.COUNT])
+        head = int(meta[self.HEAD])
+        capacity = self.capacity
+
+        out: List[Tuple[float, float, float, float]] = []
+        ts, mins, maxs, avgs = self.ts, self.min, self.max, self.avg
+
+        if meta[self.N] and meta[self.BUCKET] >= since:
+            out.append((
+                meta[self.BUCKET],
+                meta[self.MIN],
+                meta[self.MAX],
+                meta[self.SUM] / meta[self.N],
+            ))
+
+        # Walk back from the newest bucket → cost is O(window), not O(capacity)
+        for i in range(1, count + 1):
+            slot = (head - i) % capacity
+            if ts[slot] < since:
+                break
+            out.append((ts[slot], mins[slot], maxs[slot], avgs[slot]))
+
+        out.reverse()
+        return out
+
+    def latest(self) -> Optional[float]:
+        """
+        Returns the timestamp of the newest sample folded in, if any.
+        """
+        if self.meta[self.N]:
+            return self.meta[self.BUCKET]
+        if self.meta[self.COUNT]:
+            return self.ts[(int(self.meta[self.HEAD]) - 1) % self.capacity]
+        return None
+
+
+class Series:
+    """
+    One metric stored at several resolutions at once.
+
+    Every sample is folded into every tier, so rollups are always up to
+    date and reads never have to aggregate raw history.
+    """
+
+    # Column in Tier.buckets() tuples
+    FIELDS = {"min": 1, "max": 2, "avg": 3}
+
+    def __init__(
+        self,
+        tiers: Sequence[Tuple[float, int]] = DEFAULT_TIERS,
+        buf: Optional[memoryview] = None,
+    ) -> None:
+        if buf is None:
+            buf = memoryview(bytearray(self.nbytes(tiers)))
+
+        self.tiers: List[Tier] = []
+        offset = 0
+        for step, capacity in tiers:
+            size = Tier.nbytes(capacity)
+            self.tiers.append(Tier(step, capacity, buf[offset:offset + size]))
+            offset += size
+
+    @staticmethod
+    def nbytes(tiers: Sequence[Tuple[float, int]] = DEFAULT_TIERS) -> int:
+        return sum(Tier.nbytes(capacity) for _, capacity in tiers)
+
+    def add(self, ts: float, value: float) -> None:
+        for tier in self.tiers:
+            tier.add(ts, value)
+
+    def latest(self) -> Optional[float]:
+        return self.tiers[0].latest()
+
+    def window(
+        self,
+        span: float,
+        points: int = 60,
+        now: Optional[float] = None,
+        field: str = "avg",
+    ) -> List[float]:
+        """
+        Returns at most `points` values covering the last `span` seconds.
+
+        Uses the finest tier that still covers the span and averages
+        neighbouring buckets down to `points`. `field` is one of
+        "min", "max" or "avg".
+        """
+        if now is None:
+            now = self.latest()
+            if now is None:
+                return []
+
+        tier = self.tiers[-1]
+        for candidate in self.tiers:
+            if candidate.step * candidate.capacity >= span:
+                tier = candidate
+                break
+
+        index = self.FIELDS[field]
+        values = [b[index] for b in tier.buckets(now - span + tier.step)]
+
+        if len(values) <= points:
+            return values
+
+        # Downsample: average equal-sized groups (last group may be short)
+        group = -(-len(values) // points)
+        return [
+            sum(values[i:i + group]) / len(values[i:i + group])
+            for i in range(0, len(values), group)
+        ]
+
+
+class TimeSeriesStore:
+    """
+    Named multi-resolution series with bounded, preallocated memory.
+
+    Memory per series is fixed at creation (~250 KiB with DEFAULT_TIERS).
+    """
+
+    def __init__(self, tiers: Sequence[Tuple[float, int]] = DEFAULT_TIERS) -> None:
+        self.tiers = tuple(tiers)
+        self.series: Dict[str, Series] = {}
+
+    def get(self, name: str) -> Series:
+        series = self.series.get(name)
+        if series is None:
+            series = self.series[name] = self._create(name)
+        return series
+
+    def _create(self, name: str) -> Series:
+        return Series(self.tiers)
+
+    def add(self, name: str, ts: float, value: float) -> None:
+        self.get(name).add(ts, value)
+
+    def window(self, name: str, span: float, points: int = 60) -> List[float]:
+        series = self.series.get(name)
+        return series.window(span, points) if series is not None else []
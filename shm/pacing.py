@@ -0,0 +1,156 @@
+from typing import Dict, Optional
+
+from shm.scheduler import Scheduler
+
+
+class RefreshPacer:
+    """
+    Scales a Collector's schedule to what is on screen and what is changing.
+
+    The "refresh interval" is the period of the 1 s tasks of
+    Collector.DEFAULT_SCHEDULE; every task keeps its ratio to it (CPU 4x
+    as often, processes half as often, ...). It is 1 s normally, longer
+    while the terminal is in the background or nothing has moved for a
+    while, and always between `min_interval` and `max_interval`. The task
+    behind a fullscreen panel runs at FAST on top of that, and no task
+    may spend more than BUDGET of its interval collecting, so a slow
+    process scan backs itself off instead of eating a core. Whatever the
+    scaling and backoff, no task runs less often than every
+    `max_interval` unless its own schedule is slower than that.
+
+    UI-side setters only store state; apply() runs on the collector
+    thread between ticks, so the Scheduler is never touched concurrently.
+    """
+
+    BASE = 1.0
+    UNFOCUSED = 4.0     # terminal in the background
+    IDLE = 10.0         # nothing changed for QUIET_TICKS CPU samples
+
+    # Fullscreen panel → interval of its task (a process scan is not
+    # worth repeating every 200 ms)
+    FAST: Dict[str, float] = {
+        "cpu": 0.2,
+        "memory": 0.2,
+        "disk": 0.2,
+        "network": 0.2,
+        "processes": 1.0,
+    }
+
+    # Share of an interval a task may spend collecting
+    BUDGET = 0.1
+
+    # "Nothing is changing": CPU total within QUIET_CPU points and memory
+    # use within QUIET_MEMORY of RAM since the quiet stretch began
+    QUIET_TICKS = 40
+    QUIET_CPU = 2.0
+    QUIET_MEMORY = 0.01
+
+    def __init__(
+        self,
+        scheduler: Scheduler,
+        min_interval: float = 0.2,
+        max_interval: float = 10.0,
+    ) -> None:
+        if min_interval > max_interval:
+            raise ValueError("min_interval is larger than max_interval")
+
+        self.scheduler = scheduler
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+
+        # Intervals the schedule was built with
+        self.base: Dict[str, float] = {
+            name: task.interval for name, task in scheduler.tasks.items()
+        }
+
+        # -------- Set from the UI thread --------
+        self.panel: Optional[str] = None
+        self.focused = True
+
+        # -------- Set on the collector thread --------
+        self.quiet = 0
+        self._reference: Optional[tuple] = None
+
+    # ---------------- UI STATE ----------------
+    def set_panel(self, panel: Optional[str]) -> None:
+        self.panel = panel
+        self.quiet = 0
+
+    def set_focused(self, focused: bool) -> None:
+        self.focused = focused
+        self.quiet = 0
+
+    def touch(self) -> None:
+        """
+        User input: leave idle pacing.
+        """
+        self.quiet = 0
+
+    # ---------------- SAMPLES ----------------
+    def observe(self, sample) -> None:
+        """
+        Collector listener: counts CPU samples in a row where nothing moved.
+        """
+        if "cpu" not in sample.updated:
+            return
+
+        memory = sample.memory
+        current = (
+            sample.cpu.get("total", 0.0),
+            memory.get("used", 0) / (memory.get("total") or 1),
+        )
+
+        reference = self._reference
+        if (
+            self.quiet
+            and reference is not None
+            and abs(current[0] - reference[0]) < self.QUIET_CPU
+            and abs(current[1] - reference[1]) < self.QUIET_MEMORY
+        ):
+            self.quiet += 1
+        else:
+            self._reference = current
+            self.quiet = 1
+
+    @property
+    def idle(self) -> bool:
+        return self.quiet > self.QUIET_TICKS
+
+    # ---------------- SCHEDULE ----------------
+    def refresh_interval(self) -> float:
+        """
+        Period of the 1 s tasks right now.
+        """
+        interval = self.BASE
+        if not self.focused:
+            interval = max(interval, self.UNFOCUSED)
+        if self.idle:
+            interval = max(interval, self.IDLE)
+        return min(max(interval, self.min_interval), self.max_interval)
+
+    def intervals(self) -> Dict[str, float]:
+        scale = self.refresh_interval() / self.BASE
+        fast = self.FAST.get(self.panel) if self.focused else None
+
+        intervals = {}
+        for name, task in self.scheduler.tasks.items():
+            interval = self.base[name] * scale
+            if name == self.panel and fast is not None:
+                interval = min(interval, fast)
+
+            # Back off before collecting crowds out the interval
+            interval = max(interval, self.min_interval, task.duration / self.BUDGET)
+
+            # ... but never past max_interval (tasks scheduled slower than
+            # that to begin with, like partitions, keep their own interval)
+            intervals[name] = min(interval, max(self.max_interval, self.base[name]))
+        return intervals
+
+    def apply(self) -> None:
+        """
+        Moves the schedule to the current intervals (collector thread only).
+        """
+        tasks = self.scheduler.tasks
+        for name, interval in self.intervals().items():
+            if abs(tasks[name].interval - interval) > 1e-6:
+                self.scheduler.set_interval(name, interval)
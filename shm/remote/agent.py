@@ -0,0 +1,167 @@
+"""
+mtop agent: streams recorded ticks to remote viewers over TCP
+
+    mtop agent --listen 0.0.0.0:9106      on every node
+    mtop connect node1:9106               from anywhere
+
+An idle agent does nothing. Each connection gets its own Collector,
+running at the interval the viewer asked for, and its own FrameEncoder,
+so a slow or new viewer never affects another one. There is no
+authentication or encryption: listen on a trusted network only.
+"""
+
+import asyncio
+import socket
+import time
+from typing import Dict, Optional
+
+from shm.capture import collect_recorded
+from shm.collector import Collector
+from shm.headless import uniform_intervals
+from shm.remote.protocol import (
+    VERSION,
+    FrameEncoder,
+    hello,
+    pack_message,
+    parse_hello,
+    read_message_async,
+)
+
+DEFAULT_PORT = 9106
+
+# Fastest sampling a viewer can ask for
+MIN_INTERVAL = 0.1
+
+
+class Agent:
+    """
+    asyncio TCP server; one collector + encoder per connected viewer.
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = DEFAULT_PORT) -> None:
+        self.host = host
+        self.port = port
+
+        self.connections = 0
+        self.frames_sent = 0
+        self.bytes_sent = 0
+
+        self._server: Optional[asyncio.AbstractServer] = None
+
+    def _tick(self, collector: Collector) -> Dict[str, object]:
+        _, frame = collect_recorded(collector)
+        return frame
+
+    async def _handle(
+        self,
+        reader: asyncio.StreamReader,
+        writer: asyncio.StreamWriter,
+    ) -> None:
+        self.connections += 1
+        try:
+            request = parse_hello(await read_message_async(reader))
+
+            interval = max(float(request.get("interval", 1.0)), MIN_INTERVAL)
+            processes = bool(request.get("processes", True))
+
+            writer.write(pack_message(hello({
+                "version": VERSION,
+                "host": socket.gethostname(),
+                "interval": interval,
+                "processes": processes,
+            })))
+
+            collector = Collector(intervals=uniform_intervals(interval, processes))
+            encoder = FrameEncoder()
+
+            while True:
+                # Collect off the event loop; other viewers keep streaming
+                frame = await asyncio.to_thread(self._tick, collector)
+
+                message = pack_message(encoder.encode(frame))
+                writer.write(message)
+                await writer.drain()
+
+                self.frames_sent += 1
+                self.bytes_sent += len(message)
+
+                delay = collector.next_deadline() - time.monotonic()
+                await asyncio.sleep(max(delay, 0.0))
+        except (asyncio.IncompleteReadError, ConnectionError, ValueError, TypeError):
+            pass
+        finally:
+            self.connections -= 1
+            writer.close()
+
+    async def serve_forever(self) -> None:
+        self._server = await asyncio.start_server(self._handle, self.host, self.port)
+        async with self._server:
+            await self._server.serve_forever()
+
+
+class FakeAgents:
+    """
+    `count` agents on consecutive ports fed by one collector.
+
+    For load testing the fleet view on one machine: every fake host
+    streams the same local samples, but each connection still gets its
+    own encoder, exactly like a real agent.
+    """
+
+    # Drop a viewer that has this much unsent data queued
+    MAX_BACKLOG = 1024 * 1024
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = DEFAULT_PORT,
+        count: int = 10,
+        interval: float = 1.0,
+    ) -> None:
+        self.host = host
+        self.ports = range(port, port + count)
+        self.interval = interval
+
+        self._clients: Dict[asyncio.StreamWriter, FrameEncoder] = {}
+
+    def _handler(self, port: int):
+        async def handle(
+            reader: asyncio.StreamReader,
+            writer: asyncio.StreamWriter,
+        ) -> None:
+            try:
+                parse_hello(await read_message_async(reader))
+                writer.write(pack_message(hello({
+                    "version": VERSION,
+                    "host": f"fake-{port}",
+                    "interval": self.interval,
+                    "processes": False,
+                })))
+                self._clients[writer] = FrameEncoder()
+
+                # Nothing more is expected from the viewer; wait for EOF
+                await reader.read()
+            except (asyncio.IncompleteReadError, ConnectionError, ValueError):
+                pass
+            finally:
+                self._clients.pop(writer, None)
+                writer.close()
+
+        return handle
+
+    async def serve_forever(self) -> None:
+        for port in self.ports:
+            await asyncio.start_server(self._handler(port), self.host, port)
+
+        collector = Collector(intervals=uniform_intervals(self.interval, False))
+        while True:
+            _, frame = await asyncio.to_thread(collect_recorded, collector)
+
+            for writer, encoder in list(self._clients.items()):
+                if writer.transport.get_write_buffer_size() > self.MAX_BACKLOG:
+                    writer.close()
+                    self._clients.pop(writer, None)
+                    continue
+                writer.write(pack_message(encoder.encode(frame)))
+
+            await asyncio.sleep(max(collector.next_deadline() - time.monotonic(), 0.0))
@@ -0,0 +1,100 @@
+import socket
+import time
+from typing import Dict, Optional
+
+from shm.capture import FrameCollector
+from shm.collector import Sample
+from shm.remote.agent import DEFAULT_PORT
+from shm.remote.protocol import (
+    VERSION,
+    FrameDecoder,
+    hello,
+    pack_message,
+    parse_hello,
+    read_message,
+)
+
+
+class RemoteCollector(FrameCollector):
+    """
+    Collector look-alike fed by an mtop agent instead of local /proc.
+
+    collect() blocks until the agent sends the next frame, so the agent
+    sets the pace and next_deadline() is always "now". On a dropped
+    connection collect() raises ConnectionError; the next call
+    reconnects (CollectorThread retries after its error backoff).
+    """
+
+    CONNECT_TIMEOUT = 5.0
+
+    def __init__(
+        self,
+        host: str,
+        port: int = DEFAULT_PORT,
+        interval: float = 1.0,
+        processes: bool = True,
+    ) -> None:
+        super().__init__(processes=processes)
+
+        self.host = host
+        self.port = port
+        self.interval = interval
+        self.processes = processes
+
+        self.remote: Dict[str, object] = {}
+        self.frames = 0
+        self.bytes_received = 0
+
+        self._sock: Optional[socket.socket] = None
+        self._file = None
+        self._decoder = FrameDecoder()
+
+    # ---------------- CONNECTION ----------------
+    def connect(self) -> None:
+        sock = socket.create_connection((self.host, self.port), self.CONNECT_TIMEOUT)
+        try:
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            sock.sendall(pack_message(hello({
+                "version": VERSION,
+                "interval": self.interval,
+                "processes": self.processes,
+            })))
+
+            self._file = sock.makefile("rb")
+            self.remote = parse_hello(read_message(self._file))
+
+            # Frames may be far apart; only the connect itself times out
+            sock.settimeout(None)
+        except (OSError, ValueError):
+            sock.close()
+            raise
+
+        self._sock = sock
+        # Every connection starts from an empty dictionary on both ends
+        self._decoder = FrameDecoder()
+
+    def close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        if self._sock is not None:
+            self._sock.close()
+            self._sock = None
+
+    # ---------------- COLLECTOR API ----------------
+    def next_deadline(self) -> float:
+        return time.monotonic()
+
+    def collect(self) -> Sample:
+        if self._sock is None:
+            self.connect()
+
+        try:
+            payload = read_message(self._file)
+        except (OSError, ValueError):
+            self.close()
+            raise ConnectionError(f"lost connection to {self.host}:{self.port}") from None
+
+        self.bytes_received += len(payload)
+        self.frames += 1
+        return self.collect_frame(self._decoder.decode(payload))
@@ -0,0 +1,295 @@
+"""
+Fleet: many mtop agents on one asyncio loop
+
+Every host connection is a coroutine on a single event loop running in
+a background thread. Frames are decoded and run through that host's
+providers as they arrive. A frame only replaces its host's summary, so
+it costs O(1) here no matter how many hosts there are; the cluster
+totals are summed from the current summaries when the UI next reads
+them. The UI only redraws the hosts marked dirty since its last refresh.
+"""
+
+import asyncio
+import heapq
+import threading
+import time
+from typing import Iterable, List, NamedTuple, Optional, Set, Tuple
+
+from shm.capture import FrameCollector
+from shm.collector import Sample
+from shm.remote.agent import DEFAULT_PORT
+from shm.remote.protocol import (
+    VERSION,
+    FrameDecoder,
+    hello,
+    pack_message,
+    parse_hello,
+    read_message_async,
+    split_address,
+)
+
+def _port(text: str, spec: str) -> int:
+    if not text.isdigit() or not 0 < int(text) < 65536:
+        raise ValueError(f"bad port {text!r} in agent address {spec!r}")
+    return int(text)
+
+
+def parse_addresses(specs: Iterable[str]) -> List[Tuple[str, int]]:
+    """
+    HOST, HOST:PORT or HOST:FIRST-LAST (a port range) → [(host, port), ...]
+
+    IPv6 addresses go in brackets: [::1], [::1]:9106, [fe80::1]:9000-9009.
+    Raises ValueError naming the offending spec.
+    """
+    addresses: List[Tuple[str, int]] = []
+    for spec in specs:
+        host, ports = split_address(spec, "agent address")
+        if not host:
+            raise ValueError(f"bad agent address {spec!r}: missing host")
+
+        if ports is None:
+            addresses.append((host, DEFAULT_PORT))
+            continue
+
+        first, dash, last = ports.partition("-")
+        first_port = _port(first, spec)
+        last_port = _port(last, spec) if dash else first_port
+        if last_port < first_port:
+            raise ValueError(f"bad port range {ports!r} in agent address {spec!r}")
+        for port in range(first_port, last_port + 1):
+            addresses.append((host, port))
+    return addresses
+
+
+class HostSummary(NamedTuple):
+    """
+    The few numbers the fleet view shows per host.
+    """
+
+    cpu: float          # %
+    load: float         # 1 min
+    mem_used: int       # bytes
+    mem_total: int      # bytes
+    disk_bps: float     # read + write, bytes/s
+    rx_bps: float       # bytes/s, all interfaces
+    tx_bps: float
+
+    @classmethod
+    def from_sample(cls, sample: Sample) -> "HostSummary":
+        disks = sample.disk.get("disks", {})
+        network = sample.network.values()
+        return cls(
+            cpu=sample.cpu.get("total", 0.0),
+            load=sample.load.get("1min", 0.0),
+            mem_used=sample.memory.get("used", 0),
+            mem_total=sample.memory.get("total", 0),
+            disk_bps=sum(
+                d["read_bytes_per_sec"] + d["write_bytes_per_sec"]
+                for d in disks.values()
+            ),
+            rx_bps=sum(n["download_speed"] for n in network),
+            tx_bps=sum(n["upload_speed"] for n in network),
+        )
+
+    @property
+    def mem_pct(self) -> float:
+        return self.mem_used / self.mem_total * 100 if self.mem_total else 0.0
+
+
+class FleetTotals:
+    """
+    Cluster-wide sums over the hosts that are up.
+    """
+
+    def __init__(self, summaries: Iterable[HostSummary] = ()) -> None:
+        self.hosts_up = 0
+        self.cpu = 0.0
+        self.mem_used = 0
+        self.mem_total = 0
+        self.disk_bps = 0.0
+        self.rx_bps = 0.0
+        self.tx_bps = 0.0
+
+        # Summed from scratch each time: running float sums adjusted by
+        # +new -old drift with every frame and never go back to zero
+        for summary in summaries:
+            self.hosts_up += 1
+            self.cpu += summary.cpu
+            self.mem_used += summary.mem_used
+            self.mem_total += summary.mem_total
+            self.disk_bps += summary.disk_bps
+            self.rx_bps += summary.rx_bps
+            self.tx_bps += summary.tx_bps
+
+    @property
+    def cpu_avg(self) -> float:
+        return self.cpu / self.hosts_up if self.hosts_up else 0.0
+
+    @property
+    def mem_pct(self) -> float:
+        return self.mem_used / self.mem_total * 100 if self.mem_total else 0.0
+
+
+class Host:
+    """
+    One agent connection and its latest summary.
+    """
+
+    def __init__(self, index: int, address: str, port: int) -> None:
+        self.index = index
+        self.address = address
+        self.port = port
+
+        self.name = f"[{address}]:{port}" if ":" in address else f"{address}:{port}"
+        self.state = "connecting"       # connecting | up | down
+        self.error = ""
+        self.summary: Optional[HostSummary] = None
+
+        self.frames = 0
+        self.bytes_received = 0
+        self.last_frame = 0.0
+
+
+class Fleet:
+    """
+    Connects to every agent and keeps per-host summaries and totals.
+
+    All mutation happens on the fleet thread under `lock`; the UI takes
+    the dirty host indexes and reads the summaries under the same lock.
+    """
+
+    CONNECT_TIMEOUT = 5.0
+    RECONNECT_MIN = 1.0
+    RECONNECT_MAX = 30.0
+
+    def __init__(
+        self,
+        addresses: Iterable[Tuple[str, int]],
+        interval: float = 1.0,
+    ) -> None:
+        self.interval = interval
+        self.hosts = [
+            Host(index, address, port)
+            for index, (address, port) in enumerate(addresses)
+        ]
+        self._totals: Optional[FleetTotals] = None
+
+        self.lock = threading.Lock()
+        self._dirty: Set[int] = set(range(len(self.hosts)))
+
+    # ---------------- STATE ----------------
+    def _set(
+        self,
+        host: Host,
+        state: str,
+        summary: Optional[HostSummary],
+        error: str = "",
+    ) -> None:
+        with self.lock:
+            self._totals = None
+            host.summary = summary
+            host.state = state
+            host.error = error
+            self._dirty.add(host.index)
+
+    @property
+    def totals(self) -> FleetTotals:
+        """
+        Totals over the current host summaries (hold `lock`). Rebuilt at
+        most once per change, on read: O(hosts) per redraw, not per frame.
+        """
+        if self._totals is None:
+            self._totals = FleetTotals(
+                host.summary for host in self.hosts if host.summary is not None
+            )
+        return self._totals
+
+    def take_dirty(self) -> Set[int]:
+        """
+        Returns (and clears) the hosts changed since the last call.
+        """
+        with self.lock:
+            dirty, self._dirty = self._dirty, set()
+        return dirty
+
+    def hottest(
+        self,
+        limit: int = 5,
+        key: str = "cpu",
+    ) -> List[Tuple[str, HostSummary]]:
+        """
+        (name, summary) of the hosts with the highest `key` (a
+        HostSummary field or property). O(hosts), so call it per
+        redraw, not per frame.
+        """
+        with self.lock:
+            up = [
+                (host.name, host.summary)
+                for host in self.hosts
+                if host.summary is not None
+            ]
+        return heapq.nlargest(limit, up, key=lambda item: getattr(item[1], key))
+
+    # ---------------- CONNECTIONS ----------------
+    async def _stream(self, host: Host) -> None:
+        reader, writer = await asyncio.wait_for(
+            asyncio.open_connection(host.address, host.port),
+            self.CONNECT_TIMEOUT,
+        )
+        try:
+            writer.write(pack_message(hello({
+                "version": VERSION,
+                "interval": self.interval,
+                "processes": False,
+            })))
+            remote = parse_hello(await read_message_async(reader))
+            host.name = str(remote.get("host") or host.name)
+
+            # A fresh collector per connection: rates restart cleanly
+            collector = FrameCollector(processes=False)
+            decoder = FrameDecoder()
+
+            while True:
+                payload = await read_message_async(reader)
+                sample = collector.collect_frame(decoder.decode(payload))
+
+                host.frames += 1
+                host.bytes_received += len(payload)
+                host.last_frame = time.time()
+
+                self._set(host, "up", HostSummary.from_sample(sample))
+        finally:
+            writer.close()
+
+    async def _run_host(self, host: Host) -> None:
+        delay = self.RECONNECT_MIN
+        while True:
+            try:
+                await self._stream(host)
+            except asyncio.CancelledError:
+                raise
+            except Exception as exc:
+                # Anything one agent sends (or fails to) only takes that
+                # host down; gather() must never see it
+                error = str(exc) or type(exc).__name__
+            else:
+                error = "closed"
+
+            if host.state == "up":
+                delay = self.RECONNECT_MIN
+            self._set(host, "down", None, error)
+
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, self.RECONNECT_MAX)
+
+    async def run(self) -> None:
+        await asyncio.gather(*(self._run_host(host) for host in self.hosts))
+
+    def start_in_thread(self) -> threading.Thread:
+        thread = threading.Thread(
+            target=lambda: asyncio.run(self.run()),
+            name="mtop-fleet",
+            daemon=True,
+        )
+        thread.start()
+        return thread
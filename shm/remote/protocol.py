@@ -0,0 +1,397 @@
+"""
+mtop agent wire protocol, version 1
+
+Every message is a varint byte length followed by the payload; the
+first payload byte is the message type.
+
+    HELLO  JSON object, once in each direction when a connection opens
+    FRAME  one tick of recorded /proc data (see shm.capture frames)
+
+Frames are delta encoded against the previous frame of the same
+connection. Each source text is split into a template (everything that
+is not a decimal number) and its numbers. A path is named in full only
+the first time it is sent. A text is sent in full only when its
+template changes, otherwise only the zigzag varint difference of each
+number is sent, so a counter from /proc/stat, /proc/diskstats or
+/proc/net/dev that moved a little costs a byte or two, and an unchanged
+file costs a single byte. Rarely read sources (/proc/cpuinfo) go out
+once per connection, because each connection has its own collector.
+
+FRAME layout:
+    zigzag   t - previous t                       (microseconds)
+    varint   entry count
+    entry:   varint  id << 1 | new
+             [new]   u8 kind, varint length, UTF-8 path
+             [file]  zigzag read time - t         (microseconds)
+             u8      mode: FULL, DELTA or SAME
+             [FULL]  varint part count, (varint length, UTF-8 part) x
+                     count, varint number x (count - 1)
+             [DELTA] zigzag difference x (count - 1)
+    varint   forgotten id count, varint id x count
+    u8       1 if partition capacity follows (varint length, JSON)
+"""
+
+import json
+import re
+from typing import Dict, List, Optional, Tuple
+
+VERSION = 1
+
+MSG_HELLO = 0
+MSG_FRAME = 1
+
+KIND_FILE = 0
+KIND_TRANSIENT = 1
+KIND_DIR = 2
+
+MODE_FULL = 0
+MODE_DELTA = 1
+MODE_SAME = 2
+
+# Largest message accepted from a peer
+MAX_MESSAGE = 16 * 1024 * 1024
+
+# "0" or a number without leading zeros, so "05" → "0" + "5" and the
+# text always round-trips exactly
+_NUMBER = re.compile(r"([1-9][0-9]*|0)")
+
+
+# ================= VARINTS =================
+def write_varint(out: bytearray, value: int) -> None:
+    """
+    Appends an unsigned LEB128 varint (any size).
+    """
+    while value > 0x7F:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def read_varint(data: bytes, pos: int) -> Tuple[int, int]:
+    """
+    Returns (value, position after the varint).
+    """
+    value = 0
+    shift = 0
+    while True:
+        byte = data[pos]
+        pos += 1
+        value |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return value, pos
+        shift += 7
+
+
+def zigzag(value: int) -> int:
+    return value << 1 if value >= 0 else ((-value) << 1) - 1
+
+
+def unzigzag(value: int) -> int:
+    return value >> 1 if not value & 1 else -((value + 1) >> 1)
+
+
+def _write_bytes(out: bytearray, data: bytes) -> None:
+    write_varint(out, len(data))
+    out += data
+
+
+def _read_bytes(data: bytes, pos: int) -> Tuple[bytes, int]:
+    size, pos = read_varint(data, pos)
+    return data[pos:pos + size], pos + size
+
+
+# ================= ADDRESSES =================
+def split_address(spec: str, what: str = "address") -> Tuple[str, Optional[str]]:
+    """
+    HOST, HOST:PORT, [IPV6] or [IPV6]:PORT → (host, port text or None)
+
+    The port text is returned unchecked and the host may be empty
+    (":9000"). A bare IPv6 address is rejected, its last group could be
+    taken for a port. Raises ValueError naming `what` and the spec.
+    """
+    if spec.startswith("["):
+        host, bracket, rest = spec[1:].partition("]")
+        if not bracket or not host or (rest and not rest.startswith(":")):
+            raise ValueError(f"bad {what} {spec!r}: expected [IPV6]:PORT")
+        return host, rest[1:] if rest else None
+
+    host, sep, port = spec.rpartition(":")
+    if ":" in host:
+        raise ValueError(
+            f"bad {what} {spec!r}: put IPv6 addresses in brackets, e.g. [::1]:PORT"
+        )
+    if not sep:
+        return spec, None
+    return host, port
+
+
+# ================= MESSAGES =================
+def pack_message(payload: bytes) -> bytes:
+    out = bytearray()
+    write_varint(out, len(payload))
+    out += payload
+    return bytes(out)
+
+
+def hello(values: Dict[str, object]) -> bytes:
+    return bytes([MSG_HELLO]) + json.dumps(values).encode("utf-8")
+
+
+def parse_hello(payload: bytes) -> Dict[str, object]:
+    if not payload or payload[0] != MSG_HELLO:
+        raise ValueError("expected a HELLO message")
+    values = json.loads(payload[1:].decode("utf-8"))
+    if values.get("version") != VERSION:
+        raise ValueError(f"unsupported protocol version {values.get('version')}")
+    return values
+
+
+def _message_size(header: bytes) -> int:
+    size, _ = read_varint(header, 0)
+    if size > MAX_MESSAGE:
+        raise ValueError(f"message of {size} bytes exceeds the limit")
+    return size
+
+
+def read_message(file) -> bytes:
+    """
+    Reads one message from a blocking binary file (socket.makefile("rb")).
+
+    Raises ConnectionError when the peer goes away.
+    """
+    header = bytearray()
+    while True:
+        byte = file.read(1)
+        if not byte:
+            raise ConnectionError("connection closed")
+        header += byte
+        if byte[0] < 0x80:
+            break
+
+    size = _message_size(header)
+    payload = file.read(size)
+    if len(payload) != size:
+        raise ConnectionError("connection closed")
+    return payload
+
+
+async def read_message_async(reader) -> bytes:
+    """
+    read_message() for an asyncio.StreamReader.
+
+    Raises asyncio.IncompleteReadError when the peer goes away.
+    """
+    header = bytearray()
+    while True:
+        byte = await reader.readexactly(1)
+        header += byte
+        if byte[0] < 0x80:
+            break
+
+    return await reader.readexactly(_message_size(header))
+
+
+# ================= FRAMES =================
+def _split(text: str) -> Tuple[Tuple[str, ...], List[int]]:
+    parts = _NUMBER.split(text)
+    return tuple(parts[0::2]), [int(n) for n in parts[1::2]]
+
+
+def _join(template: Tuple[str, ...], numbers: List[int]) -> str:
+    out = [template[0]]
+    for number, part in zip(numbers, template[1:]):
+        out.append(str(number))
+        out.append(part)
+    return "".join(out)
+
+
+class FrameEncoder:
+    """
+    Agent side: encodes frames against what this connection already has.
+    """
+
+    def __init__(self) -> None:
+        self._ids: Dict[Tuple[int, str], int] = {}
+        self._next_id = 0
+        self._t = 0
+
+        # id -> (text, template, numbers) last sent
+        self._sent: Dict[int, Tuple[str, Tuple[str, ...], List[int]]] = {}
+
+    def encode(self, frame: Dict[str, object]) -> bytes:
+        out = bytearray([MSG_FRAME])
+
+        t = round(frame["t"] * 1e6)
+        write_varint(out, zigzag(t - self._t))
+        self._t = t
+
+        entries: List[Tuple[int, str, str, Optional[float]]] = []
+        for path, (read_at, text) in frame["files"].items():
+            entries.append((KIND_FILE, path, text, read_at))
+        for path, text in frame["transient"].items():
+            entries.append((KIND_TRANSIENT, path, text, None))
+        for path, names in frame["dirs"].items():
+            entries.append((KIND_DIR, path, "\n".join(names), None))
+
+        write_varint(out, len(entries))
+        seen = set()
+        for kind, path, text, read_at in entries:
+            key = (kind, path)
+            entry_id = self._ids.get(key)
+            if entry_id is None:
+                entry_id = self._ids[key] = self._next_id
+                self._next_id += 1
+                write_varint(out, entry_id << 1 | 1)
+                out.append(kind)
+                _write_bytes(out, path.encode("utf-8"))
+            else:
+                write_varint(out, entry_id << 1)
+            seen.add(key)
+
+            if kind == KIND_FILE:
+                write_varint(out, zigzag(round(read_at * 1e6) - t))
+
+            self._encode_text(out, entry_id, text)
+
+        # Per-PID files that were not read on a process scan → gone
+        forget = []
+        if frame["transient"]:
+            forget = [
+                key for key in self._ids
+                if key[0] == KIND_TRANSIENT and key not in seen
+            ]
+        write_varint(out, len(forget))
+        for key in forget:
+            entry_id = self._ids.pop(key)
+            self._sent.pop(entry_id, None)
+            write_varint(out, entry_id)
+
+        partitions = frame.get("partitions")
+        if partitions is None:
+            out.append(0)
+        else:
+            out.append(1)
+            _write_bytes(out, json.dumps(partitions, separators=(",", ":")).encode("utf-8"))
+
+        return bytes(out)
+
+    def _encode_text(self, out: bytearray, entry_id: int, text: str) -> None:
+        previous = self._sent.get(entry_id)
+        if previous is not None and previous[0] == text:
+            out.append(MODE_SAME)
+            return
+
+        template, numbers = _split(text)
+        self._sent[entry_id] = (text, template, numbers)
+
+        if previous is not None and previous[1] == template:
+            out.append(MODE_DELTA)
+            for old, new in zip(previous[2], numbers):
+                write_varint(out, zigzag(new - old))
+            return
+
+        out.append(MODE_FULL)
+        write_varint(out, len(template))
+        for part in template:
+            _write_bytes(out, part.encode("utf-8"))
+        for number in numbers:
+            write_varint(out, number)
+
+
+class FrameDecoder:
+    """
+    Viewer side: rebuilds the frames a FrameEncoder encoded.
+    """
+
+    def __init__(self) -> None:
+        self._entries: Dict[int, Tuple[int, str]] = {}
+        self._t = 0
+
+        # id -> (text, template, numbers)
+        self._state: Dict[int, Tuple[str, Tuple[str, ...], List[int]]] = {}
+
+    def decode(self, payload: bytes) -> Dict[str, object]:
+        if not payload or payload[0] != MSG_FRAME:
+            raise ValueError("expected a FRAME message")
+
+        delta, pos = read_varint(payload, 1)
+        self._t += unzigzag(delta)
+        t = self._t
+
+        frame: Dict[str, object] = {
+            "t": t / 1e6,
+            "files": {},
+            "transient": {},
+            "dirs": {},
+        }
+
+        count, pos = read_varint(payload, pos)
+        for _ in range(count):
+            value, pos = read_varint(payload, pos)
+            entry_id = value >> 1
+            if value & 1:
+                kind = payload[pos]
+                raw, pos = _read_bytes(payload, pos + 1)
+                self._entries[entry_id] = (kind, raw.decode("utf-8"))
+            kind, path = self._entries[entry_id]
+
+            read_at = None
+            if kind == KIND_FILE:
+                value, pos = read_varint(payload, pos)
+                read_at = (t + unzigzag(value)) / 1e6
+
+            text, pos = self._decode_text(payload, pos, entry_id)
+
+            if kind == KIND_FILE:
+                frame["files"][path] = [read_at, text]
+            elif kind == KIND_TRANSIENT:
+                frame["transient"][path] = text
+            else:
+                frame["dirs"][path] = text.split("\n") if text else []
+
+        count, pos = read_varint(payload, pos)
+        for _ in range(count):
+            entry_id, pos = read_varint(payload, pos)
+            self._entries.pop(entry_id, None)
+            self._state.pop(entry_id, None)
+
+        if payload[pos]:
+            raw, pos = _read_bytes(payload, pos + 1)
+            frame["partitions"] = json.loads(raw.decode("utf-8"))
+
+        return frame
+
+    def _decode_text(
+        self,
+        payload: bytes,
+        pos: int,
+        entry_id: int,
+    ) -> Tuple[str, int]:
+        mode = payload[pos]
+        pos += 1
+
+        if mode == MODE_SAME:
+            return self._state[entry_id][0], pos
+
+        if mode == MODE_DELTA:
+            _, template, previous = self._state[entry_id]
+            numbers = []
+            for old in previous:
+                value, pos = read_varint(payload, pos)
+                numbers.append(old + unzigzag(value))
+        else:
+            parts, pos = read_varint(payload, pos)
+            template_parts = []
+            for _ in range(parts):
+                raw, pos = _read_bytes(payload, pos)
+                template_parts.append(raw.decode("utf-8"))
+            template = tuple(template_parts)
+
+            numbers = []
+            for _ in range(parts - 1):
+                value, pos = read_varint(payload, pos)
+                numbers.append(value)
+
+        text = _join(template, numbers)
+        self._state[entry_id] = (text, template, numbers)
+        return text, pos
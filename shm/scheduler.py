@@ -0,0 +1,126 @@
+import time
+from typing import Callable, Dict, List, Optional
+
+
+# Cost classes: cheap tasks run first in a tick so a slow process scan
+# never delays the fast graphs sharing that tick.
+COST_CHEAP = "cheap"
+COST_EXPENSIVE = "expensive"
+
+
+class ScheduledTask:
+    """
+    One provider call with its own sampling interval.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        func: Callable[..., object],
+        interval: float,
+        cost: str = COST_CHEAP,
+    ) -> None:
+        self.name = name
+        self.func = func
+        self.interval = interval
+        self.cost = cost
+
+        # Due immediately so the first tick fills every value
+        self.next_due: float = 0.0
+        self.last_run: Optional[float] = None
+        self.value: object = None
+
+        # Seconds per run, smoothed over the last few runs
+        self.duration: float = 0.0
+
+
+class Scheduler:
+    """
+    Runs tasks whose interval has elapsed and keeps each one's latest value.
+
+    Time is passed in by the caller (the tick clock: time.monotonic()
+    live, recorded time on replay) so the same schedule works for live
+    collection and for replayed captures. Wall time is never used here;
+    a stepped system clock would otherwise stall or burst the schedule.
+    """
+
+    # Tasks due within this window run together instead of waking twice
+    SLACK = 0.005
+
+    # Weight of the newest run in ScheduledTask.duration
+    SMOOTHING = 0.3
+
+    def __init__(self) -> None:
+        self.tasks: Dict[str, ScheduledTask] = {}
+
+    def add(
+        self,
+        name: str,
+        func: Callable[..., object],
+        interval: float,
+        cost: str = COST_CHEAP,
+    ) -> ScheduledTask:
+        task = ScheduledTask(name, func, interval, cost)
+        self.tasks[name] = task
+        return task
+
+    def set_interval(self, name: str, interval: float) -> None:
+        task = self.tasks[name]
+        if task.last_run is not None:
+            task.next_due = task.last_run + interval
+        task.interval = interval
+
+    def due(self, now: float, cost: Optional[str] = None) -> List[ScheduledTask]:
+        """
+        Returns tasks due at `now`, cheap ones first (only `cost` ones if given).
+        """
+        tasks = [
+            t for t in self.tasks.values()
+            if t.next_due <= now + self.SLACK and (cost is None or t.cost == cost)
+        ]
+        tasks.sort(key=lambda t: t.cost != COST_CHEAP)
+        return tasks
+
+    def run_due(self, now: float, *args, cost: Optional[str] = None) -> List[str]:
+        """
+        Calls every due task (of `cost`, if given) with `args` and stores
+        its result.
+
+        Returns:
+            Names of the tasks that ran
+        """
+        ran: List[str] = []
+
+        for task in self.due(now, cost):
+            started = time.perf_counter()
+            task.value = task.func(*args)
+            elapsed = time.perf_counter() - started
+
+            task.duration = (
+                elapsed if task.last_run is None
+                else task.duration + self.SMOOTHING * (elapsed - task.duration)
+            )
+            task.last_run = now
+
+            # Stay on the original cadence, but skip missed slots
+            # instead of running them back to back after an overrun
+            task.next_due += task.interval
+            if task.next_due <= now:
+                task.next_due = now + task.interval
+
+            ran.append(task.name)
+
+        return ran
+
+    def next_deadline(self) -> float:
+        """
+        Returns the earliest time any task is due.
+        """
+        return min((t.next_due for t in self.tasks.values()), default=0.0)
+
+    def value(self, name: str) -> object:
+        """
+        Returns the latest result of `name` (None if never run or not scheduled).
+        """
+        task = self.tasks.get(name)
+        return task.value if task is not None else None
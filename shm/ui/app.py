@@ -9,15 +9,33 @@ Responsibilities:
 - Keep app.py minimal (no UI logic here)
 """
 
+from typing import Optional
+
 from shm.ui.layout import SystemMonitor
 
 
 
-def main() -> None:
+def main(
+    history_path: Optional[str] = None,
+    persist_history: bool = True,
+    collector=None,
+    listeners=(),
+    alerts=None,
+    min_interval: float = 0.2,
+    max_interval: float = 10.0,
+) -> None:
     """
     Start the System Monitor TUI application.
     """
-    app = SystemMonitor()
+    app = SystemMonitor(
+        history_path=history_path,
+        persist_history=persist_history,
+        collector=collector,
+        listeners=listeners,
+        alerts=alerts,
+        min_interval=min_interval,
+        max_interval=max_interval,
+    )
     app.run()
 
 
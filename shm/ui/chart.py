@@ -0,0 +1,359 @@
+"""
+Built-in line charts for the terminal (no asciichartpy)
+
+    braille  2 x 4 dots per cell, a connected line per series
+    block    1 x 8 levels per cell, a filled bar per point (▁▂▃▄▅▆▇█)
+
+Charts are redrawn incrementally. Each point's vertical level is kept
+between updates, and so is each rendered cell column. When a new window
+of data turns out to be the previous one shifted left by a few points,
+the kept levels and columns move along and only the columns holding new
+points are computed. A shift by part of a cell (an odd number of
+points in braille) redraws every column from the kept levels.
+Everything is recomputed only when the scale changes: the top of the
+scale is rounded up to a 1 / 2 / 2.5 / 5 step, so it moves much less
+often than the maximum itself.
+
+Pure Python, no Textual: shm.ui.widgets.common.GraphBox puts it on
+screen.
+"""
+
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+CHART_MODES: Tuple[str, ...] = ("braille", "block")
+
+# Y axis: a label of at most LABEL_WIDTH characters, then " ┤" / " │"
+LABEL_WIDTH = 6
+GUTTER = LABEL_WIDTH + 2
+
+# Rich colors given to the series of a multi-series chart, in order
+SERIES_COLORS: Tuple[str, ...] = ("green", "cyan", "magenta", "yellow", "red", "blue")
+
+# Shifts tried before a changed window is redrawn from scratch
+MAX_SHIFT = 16
+
+# Braille dot bits, [x][dot row from the top]
+_BRAILLE_DOTS = (
+    (0x01, 0x02, 0x04, 0x40),
+    (0x08, 0x10, 0x20, 0x80),
+)
+_BLOCKS = " ▁▂▃▄▅▆▇█"
+
+# (mode) -> (x positions, y levels) per cell
+_RESOLUTION = {"braille": (2, 4), "block": (1, 8)}
+
+# One rendered cell column: (character per row, series index per row
+# or -1), top row first
+Column = Tuple[Tuple[str, ...], Tuple[int, ...]]
+
+
+def compact(value: float) -> str:
+    """
+    Axis label in at most LABEL_WIDTH characters: 12.5, 980.0, 1.2k, 35.0M
+    """
+    for unit in ("", "k", "M", "G", "T"):
+        if abs(value) < 1000:
+            return f"{value:.1f}{unit}"
+        value /= 1000
+    return f"{value:.0f}P"
+
+
+def nice_ceil(value: float) -> float:
+    """
+    Smallest 1 / 2 / 2.5 / 5 x 10^n that is >= value (value > 0).
+    """
+    magnitude = 1.0
+    while magnitude * 10 < value:
+        magnitude *= 10
+    while magnitude > value:
+        magnitude /= 10
+
+    for step in (1, 2, 2.5, 5, 10):
+        if step * magnitude >= value:
+            return step * magnitude
+    return 10 * magnitude
+
+
+class Chart:
+    """
+    Multi-series line chart with an auto-scaled Y axis.
+
+    `points` data points fit across `width` cells; shorter windows are
+    stretched to the full width and right-aligned series of different
+    lengths share the X axis. update() takes the whole visible window
+    every time, render() returns Rich markup.
+    """
+
+    def __init__(
+        self,
+        width: int = 60,
+        height: int = 8,
+        mode: str = "braille",
+        minimum: float = 0.0,
+        fmt: Callable[[float], str] = compact,
+    ) -> None:
+        if mode not in _RESOLUTION:
+            raise ValueError(f"unknown chart mode {mode!r}")
+
+        self.width = max(width, 1)
+        self.height = max(height, 1)
+        self.mode = mode
+        self.minimum = minimum
+        self.fmt = fmt
+        self.colors: Sequence[str] = SERIES_COLORS
+
+        self._series: List[List[float]] = []
+        self._reset()
+
+    # ---------------- GEOMETRY ----------------
+    @property
+    def points(self) -> int:
+        """
+        Data points that fit across the chart without downsampling.
+        """
+        return self.width * _RESOLUTION[self.mode][0]
+
+    def resize(self, width: int, height: int) -> None:
+        width, height = max(width, 1), max(height, 1)
+        if (width, height) == (self.width, self.height):
+            return
+        self.width, self.height = width, height
+        self._rebuild([s[-self.points:] for s in self._series])
+
+    def set_mode(self, mode: str) -> None:
+        if mode not in _RESOLUTION:
+            raise ValueError(f"unknown chart mode {mode!r}")
+        if mode != self.mode:
+            self.mode = mode
+            self._rebuild([s[-self.points:] for s in self._series])
+
+    # ---------------- DATA ----------------
+    def _reset(self) -> None:
+        self._levels: List[List[int]] = []
+        self._columns: Dict[int, Column] = {}
+        self._n = 0             # points in the longest series
+        self._repeat = 1        # X positions per point (stretching)
+        self._origin = 0        # absolute index of the first point
+        self._top = 0.0         # top of the scale
+        self._text: Optional[str] = None
+
+    def update(self, series: Sequence[Sequence[float]]) -> None:
+        """
+        Replaces the data with `series` (oldest point first in each).
+        """
+        points = self.points
+        new = [list(s)[-points:] for s in series]
+        old = self._series
+
+        n = max((len(s) for s in new), default=0)
+        if (
+            not n
+            or len(new) != len(old)
+            or n != self._n
+            or any(len(s) != n for s in new)
+            or self._scale(new) != self._top
+        ):
+            # First data, growing window, ragged series or a new scale
+            self._rebuild(new)
+            return
+
+        shift = self._find_shift(old, new)
+        if shift is None:
+            self._rebuild(new)
+            return
+
+        # Points [0, kept) are old points moved left by `shift`
+        kept = n - shift - 1
+        self._origin += shift
+        self._levels = [
+            levels[shift:shift + kept] + [self._level(v) for v in values[kept:]]
+            for levels, values in zip(self._levels, new)
+        ]
+        self._series = new
+        self._text = None
+
+        xres = _RESOLUTION[self.mode][0]
+        if (self._origin * self._repeat) % xres:
+            # Moved by part of a cell (an odd shift in braille): every cell
+            # now pairs different points, so redraw all columns at the
+            # phase _rebuild() uses. The kept levels are still valid.
+            self._origin = 0
+            self._columns = {}
+            first, last = self._column_range()
+            for col in range(first, last + 1):
+                self._columns[col] = self._column(col)
+            return
+
+        first, last = self._column_range()
+        for col in [c for c in self._columns if c < first]:
+            del self._columns[col]
+
+        # The first column may have lost points; the rest from the first
+        # new point on is new
+        dirty = ((self._origin + kept) * self._repeat) // xres
+        self._columns[first] = self._column(first)
+        for col in range(max(dirty, first + 1), last + 1):
+            self._columns[col] = self._column(col)
+
+    def _find_shift(
+        self,
+        old: List[List[float]],
+        new: List[List[float]],
+    ) -> Optional[int]:
+        """
+        Smallest k such that every new series starts with its old
+        series minus the first k points (the last old point, which may
+        still have been accumulating, is allowed to differ).
+        """
+        n = self._n
+        for k in range(min(MAX_SHIFT, n - 1) + 1):
+            if all(b[:n - k - 1] == a[k:-1] for a, b in zip(old, new)):
+                return k
+        return None
+
+    def _scale(self, series: List[List[float]]) -> float:
+        peak = max((max(s) for s in series if s), default=self.minimum)
+        span = peak - self.minimum
+        return self.minimum + (nice_ceil(span) if span > 0 else 1.0)
+
+    def _level(self, value: float) -> int:
+        yres = _RESOLUTION[self.mode][1]
+        levels = self.height * yres
+        ratio = (value - self.minimum) / (self._top - self.minimum)
+        ratio = min(max(ratio, 0.0), 1.0)
+
+        if self.mode == "block":
+            return round(ratio * levels)             # 0 = empty bar
+        return round(ratio * (levels - 1))           # 0 = bottom dot row
+
+    def _rebuild(self, series: List[List[float]]) -> None:
+        self._reset()
+        self._series = series
+
+        n = max((len(s) for s in series), default=0)
+        if not n:
+            return
+
+        self._n = n
+        self._repeat = max(1, self.points // n)
+        self._top = self._scale(series)
+        self._levels = [
+            [-1] * (n - len(values)) + [self._level(v) for v in values]
+            for values in series
+        ]
+
+        first, last = self._column_range()
+        for col in range(first, last + 1):
+            self._columns[col] = self._column(col)
+
+    # ---------------- CELLS ----------------
+    def _column_range(self) -> Tuple[int, int]:
+        xres = _RESOLUTION[self.mode][0]
+        start = self._origin * self._repeat
+        end = (self._origin + self._n) * self._repeat - 1
+        return start // xres, end // xres
+
+    def _level_at(self, levels: List[int], x: int) -> int:
+        """
+        Level of the point drawn at absolute X position x (-1 = none).
+        """
+        index = x // self._repeat - self._origin
+        if 0 <= index < len(levels):
+            return levels[index]
+        return -1
+
+    def _column(self, col: int) -> Column:
+        xres, yres = _RESOLUTION[self.mode]
+        height = self.height
+        owners = [-1] * height
+
+        if self.mode == "block":
+            fills = [0] * height
+            for j, levels in enumerate(self._levels):
+                level = self._level_at(levels, col)
+                for row in range(height):
+                    fill = min(max(level - (height - 1 - row) * yres, 0), yres)
+                    if fill > fills[row]:
+                        fills[row] = fill
+                        owners[row] = j
+            return tuple(_BLOCKS[f] for f in fills), tuple(owners)
+
+        masks = [0] * height
+        for j, levels in enumerate(self._levels):
+            for dx in range(xres):
+                x = col * xres + dx
+                level = self._level_at(levels, x)
+                if level < 0:
+                    continue
+
+                # Connect to the previous point with a vertical run
+                previous = self._level_at(levels, x - 1)
+                low, high = (level, level) if previous < 0 else sorted((previous, level))
+                for y in range(low, high + 1):
+                    row = height - 1 - y // yres
+                    masks[row] |= _BRAILLE_DOTS[dx][yres - 1 - y % yres]
+                    if owners[row] < 0:
+                        owners[row] = j
+
+        return tuple(chr(0x2800 + m) if m else " " for m in masks), tuple(owners)
+
+    # ---------------- OUTPUT ----------------
+    def _labels(self) -> List[str]:
+        height = self.height
+        labels = [""] * height
+        labels[0] = self.fmt(self._top)
+        labels[-1] = self.fmt(self.minimum)
+        if height >= 5:
+            labels[height // 2] = self.fmt(
+                self._top - (self._top - self.minimum) * (height // 2) / (height - 1)
+            )
+        return [
+            f"{label:>{LABEL_WIDTH}} ┤" if label else " " * LABEL_WIDTH + " │"
+            for label in labels
+        ]
+
+    def render(self) -> str:
+        """
+        Rich markup, `height` lines of GUTTER + `width` cells.
+        """
+        if self._text is not None:
+            return self._text
+        if not self._n:
+            self._text = ""
+            return self._text
+
+        first, last = self._column_range()
+        first = max(first, last - self.width + 1)
+        columns = [self._columns[col] for col in range(first, last + 1)]
+        blank = " " * (self.width - len(columns))
+        colored = len(self._levels) > 1 and bool(self.colors)
+
+        rows = []
+        for row, label in enumerate(self._labels()):
+            if not colored:
+                cells = "".join(chars[row] for chars, _ in columns)
+                rows.append(f"{label}{blank}{cells}")
+                continue
+
+            # Multi-series: one color tag per run of cells of one series
+            out = [label, blank]
+            run_owner, run = -1, []
+            for chars, owners in columns:
+                owner = owners[row]
+                if owner != run_owner and run:
+                    out.append(self._paint(run_owner, "".join(run)))
+                    run = []
+                run_owner = owner
+                run.append(chars[row])
+            if run:
+                out.append(self._paint(run_owner, "".join(run)))
+            rows.append("".join(out))
+
+        self._text = "\n".join(rows)
+        return self._text
+
+    def _paint(self, owner: int, text: str) -> str:
+        if owner < 0:
+            return text
+        color = self.colors[owner % len(self.colors)]
+        return f"[{color}]{text}[/{color}]"
@@ -0,0 +1,139 @@
+"""
+Fleet view: one summary row per agent plus cluster-wide totals
+
+    mtop fleet node1 node2:9106 10.0.0.5:9106-9110
+
+Network and decoding run on the Fleet thread. The UI refreshes on a
+timer and only reformats the rows of hosts that changed since the
+previous refresh, so the cost of a refresh follows the number of
+changed hosts, not the fleet size.
+"""
+
+from typing import List
+
+from textual.app import App, ComposeResult
+from textual.containers import Vertical, VerticalScroll
+from textual.widgets import Header, Footer, Static
+
+from shm.remote.fleet import Fleet, Host
+from shm.ui.widgets.network import format_bytes, format_speed
+
+ROW_HEADER = (
+    f"[b]{'HOST':<28} {'STATE':<10} {'CPU%':>6} {'LOAD':>6} {'MEM%':>6} "
+    f"{'DISK':>13} {'RX':>14} {'TX':>14}[/b]"
+)
+
+
+def format_row(host: Host) -> str:
+    name = host.name[:28]
+    summary = host.summary
+    if summary is None:
+        detail = f"[dim]{host.error[:60]}[/dim]" if host.error else ""
+        return f"{name:<28} {host.state:<10} {detail}"
+
+    return (
+        f"{name:<28} {host.state:<10} "
+        f"{summary.cpu:>6.1f} {summary.load:>6.2f} {summary.mem_pct:>6.1f} "
+        f"{format_bytes(summary.disk_bps) + '/s':>13} "
+        f"{format_speed(summary.rx_bps):>14} {format_speed(summary.tx_bps):>14}"
+    )
+
+
+class FleetMonitor(App):
+    """
+    Fleet Layout
+    - Cluster totals + hottest hosts
+    - Scrollable per-host table
+    """
+
+    # Seconds between redraws (independent of how often frames arrive)
+    REFRESH = 1.0
+    HOTTEST = 5
+
+    CSS = """
+    Screen { background: black; }
+
+    .box {
+        border: round green;
+        padding: 0 1;
+    }
+
+    #summary { height: auto; }
+    """
+
+    def __init__(self, fleet: Fleet):
+        super().__init__()
+
+        self.fleet = fleet
+
+        # Cached, already formatted table rows (index = host index)
+        self._rows: List[str] = [format_row(host) for host in fleet.hosts]
+
+        self.totals = Static()
+        self.hottest = Static()
+        self.table = Static()
+
+    # ==================================================
+    # COMPOSE
+    # ==================================================
+    def compose(self) -> ComposeResult:
+        yield Header(show_clock=True)
+
+        with Vertical(classes="box", id="summary"):
+            yield self.totals
+            yield self.hottest
+
+        with VerticalScroll(classes="box", id="hosts"):
+            yield self.table
+
+        yield Footer()
+
+    # ==================================================
+    # LIFECYCLE
+    # ==================================================
+    def on_mount(self):
+        self.fleet.start_in_thread()
+        self.refresh_fleet()
+        self.set_interval(self.REFRESH, self.refresh_fleet)
+
+    # ==================================================
+    # DATA REFRESH LOOP
+    # ==================================================
+    def refresh_fleet(self):
+        fleet = self.fleet
+        dirty = fleet.take_dirty()
+
+        if dirty:
+            with fleet.lock:
+                for index in dirty:
+                    self._rows[index] = format_row(fleet.hosts[index])
+            self.table.update("\n".join([ROW_HEADER] + self._rows))
+
+        with fleet.lock:
+            totals = fleet.totals
+            hosts_up = totals.hosts_up
+            summary = (
+                f"[b]{hosts_up}/{len(fleet.hosts)} hosts up[/b]   "
+                f"CPU avg {totals.cpu_avg:.1f}%   "
+                f"MEM {totals.mem_pct:.1f}% of {format_bytes(totals.mem_total)}   "
+                f"DISK {format_bytes(totals.disk_bps)}/s   "
+                f"RX {format_speed(totals.rx_bps)}   "
+                f"TX {format_speed(totals.tx_bps)}"
+            )
+
+        hot_cpu = ", ".join(
+            f"{name} {s.cpu:.0f}%" for name, s in fleet.hottest(self.HOTTEST, "cpu")
+        )
+        hot_mem = ", ".join(
+            f"{name} {s.mem_pct:.0f}%" for name, s in fleet.hottest(self.HOTTEST, "mem_pct")
+        )
+
+        self.title = f"mtop fleet — {hosts_up}/{len(fleet.hosts)} up"
+        self.totals.update(summary)
+        self.hottest.update(
+            f"Hottest CPU  {hot_cpu or '-'}\nHottest MEM  {hot_mem or '-'}"
+        )
+
+
+def main(fleet: Fleet) -> None:
+    FleetMonitor(fleet).run()
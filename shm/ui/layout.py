@@ -1,16 +1,20 @@
+from typing import TYPE_CHECKING, Callable, Dict, Optional, Sequence
+
 from textual.app import App, ComposeResult
 from textual.containers import Horizontal, Vertical
 from textual.widgets import Header, Footer, Static
 from textual.reactive import reactive
 from textual.events import Click
+from textual.message import Message
 
-# ================= PROVIDERS =================
-from shm.core.cpu import CPUProvider
-from shm.metrics.cpu_calc import ProcessProvider
-from shm.core.memory import MemoryProvider
-from shm.core.disk import DiskProvider
-from shm.metrics.net_calc import NetworkCalcProvider
-from shm.core.uptime import UptimeProvider
+# ================= COLLECTION =================
+from shm.collector import Collector, CollectorThread, Sample
+from shm.metrics.history_file import open_history
+from shm.metrics.overhead import Overhead
+from shm.metrics.sketch import SKETCH_WINDOWS, SketchStore
+from shm.metrics.timeseries import TimeSeriesStore, ZOOM_SPANS
+from shm.pacing import RefreshPacer
+from shm.ui.chart import CHART_MODES
 
 # ================= WIDGETS =================
 from shm.ui.widgets.cpu import CPUWidget
@@ -18,15 +22,29 @@ from shm.ui.widgets.memory import MemoryWidget
 from shm.ui.widgets.disk import DiskWidget
 from shm.ui.widgets.network import NetworkWidget
 
+# Fullscreen-only widgets (processes, diagnostics) and the alert engine
+# are imported when first needed, not at startup
+if TYPE_CHECKING:
+    from shm.alerts import AlertEngine
+    from shm.ui.widgets.overhead import OverheadWidget
+    from shm.ui.widgets.processes import ProcessWidget
+
 
 class SystemMonitor(App):
     """
     System Monitor Layout
     - Dashboard view (CPU / MEM / DISK / NET)
-    - Fullscreen CPU / MEMORY / DISK / NETWORK
+    - Fullscreen CPU / MEMORY / DISK / NETWORK / PROCESSES
+    - Fullscreen diagnostics: mtop's own cost
     """
 
-    focused_panel = reactive(None)  # None | "cpu" | "memory" | "disk" | "network"
+    # None | "cpu" | "memory" | "disk" | "network" | "processes" | "overhead"
+    focused_panel = reactive(None)
+
+    class SampleReady(Message):
+        """
+        Posted from the collector thread when a new Sample is published.
+        """
 
     CSS = """
     Screen { background: black; }
@@ -39,27 +57,80 @@ class SystemMonitor(App):
     .mem  { border: round blue; }
     .disk { border: round yellow; }
     .net  { border: round magenta; }
+    .proc { border: round cyan; }
+    .diag { border: round white; }
     """
 
     # ==================================================
     # INIT
     # ==================================================
-    def __init__(self):
+    def __init__(
+        self,
+        history_path: Optional[str] = None,
+        persist_history: bool = True,
+        collector: Optional[Collector] = None,
+        listeners: Sequence[Callable[[Sample], None]] = (),
+        alerts: Optional["AlertEngine"] = None,
+        min_interval: float = 0.2,
+        max_interval: float = 10.0,
+    ):
         super().__init__()
 
-        # -------- Providers --------
-        self.cpu_p = CPUProvider()
-        self.proc_p = ProcessProvider()
-        self.mem_p = MemoryProvider()
-        self.disk_p = DiskProvider()
-        self.net_p = NetworkCalcProvider()
-        self.up_p = UptimeProvider()
+        # -------- Collection (runs off the UI thread) --------
+        # (a ReplayCollector plays back a capture instead)
+        # (our own Collector draws a first frame before the first process scan)
+        self.collector = collector or Collector(top_limit=5, defer_expensive=True)
+        self.collector_thread = CollectorThread(
+            self.collector,
+            on_sample=lambda sample: self.post_message(self.SampleReady()),
+        )
+        # e.g. exporters fed from the same samples as the UI
+        for listener in listeners:
+            self.collector_thread.add_listener(listener)
+
+        # Refresh rate follows the visible panel, terminal focus and
+        # activity (only for our own Collector: replays and remote agents
+        # keep their recorded / agent-side pace)
+        self.pacer: Optional[RefreshPacer] = None
+        if collector is None:
+            self.pacer = RefreshPacer(
+                self.collector.scheduler, min_interval, max_interval
+            )
+            self.collector_thread.pacer = self.pacer
+            self.collector_thread.add_listener(self.pacer.observe)
+
+        # Rules run on the collector thread; the header shows what fires
+        self.alerts = alerts
+        if alerts is not None:
+            self.collector_thread.add_listener(alerts.update)
+
+        # -------- History (shared by every graph) --------
+        # Memory-mapped file → graphs reopen onto the previous run's data
+        self.history = (
+            open_history(history_path) if persist_history else TimeSeriesStore()
+        )
+        self.zoom = 0  # index into ZOOM_SPANS
+
+        # -------- Percentiles (rolling sketches, in memory) --------
+        self.sketches = SketchStore()
+        self.sketch_window = 0  # index into SKETCH_WINDOWS
+        self.chart_mode = 0     # index into CHART_MODES
 
         # -------- Widgets --------
-        self.cpu = CPUWidget()
-        self.mem = MemoryWidget()
-        self.disk = DiskWidget()
-        self.net = NetworkWidget()
+        self.cpu = CPUWidget(self.history, self.sketches)
+        self.mem = MemoryWidget(self.history)
+        self.disk = DiskWidget(self.history, self.sketches)
+        self.net = NetworkWidget(self.history, self.sketches)
+
+        # Fullscreen-only, created on first open
+        self.procs: Optional["ProcessWidget"] = None
+        self.overhead: Optional["OverheadWidget"] = None
+
+        # -------- Self-overhead (UI side; the collector keeps its own) --------
+        self.ui_overhead = Overhead()
+
+        # -------- Fullscreen panels (mounted on first open) --------
+        self.panels: Dict[str, Vertical] = {}
 
     # ==================================================
     # COMPOSE
@@ -87,41 +158,96 @@ class SystemMonitor(App):
                     yield self.net.graph
                     yield self.net.data
 
+        yield Footer()
+
+    def build_panel(self, name: str) -> Vertical:
+        """
+        Fullscreen view of `name`; built and mounted when first opened so
+        startup only lays out the dashboard.
+        """
+        back = "(Esc / B to go back)"
+
         # ================= FULLSCREEN CPU =================
-        with Vertical(id="cpu-full", classes="box"):
-            yield Static("[b]CPU — Full View (Esc / B to go back)[/b]\n")
-            yield self.cpu.full_graph
-            yield self.cpu.full_data
+        if name == "cpu":
+            return Vertical(
+                Static(f"[b]CPU — Full View {back}[/b]\n"),
+                self.cpu.full_graph,
+                self.cpu.full_data,
+                id="cpu-full",
+                classes="box",
+            )
 
         # ================= FULLSCREEN MEMORY =================
-        with Vertical(id="memory-full", classes="box mem"):
-            yield Static("[b]MEMORY — Full View (Esc / B to go back)[/b]\n")
-            yield self.mem.full_graph
-            yield self.mem.full_data
+        if name == "memory":
+            return Vertical(
+                Static(f"[b]MEMORY — Full View {back}[/b]\n"),
+                self.mem.full_graph,
+                self.mem.full_data,
+                id="memory-full",
+                classes="box mem",
+            )
 
         # ================= FULLSCREEN DISK =================
-        with Vertical(id="disk-full", classes="box disk"):
-            yield Static("[b]DISK — Full View (Esc / B to go back)[/b]\n")
-            yield self.disk.full_graph
-            yield self.disk.full_data
+        if name == "disk":
+            return Vertical(
+                Static(f"[b]DISK — Full View {back}[/b]\n"),
+                self.disk.full_graph,
+                self.disk.full_data,
+                id="disk-full",
+                classes="box disk",
+            )
 
         # ================= FULLSCREEN NETWORK =================
-        with Vertical(id="network-full", classes="box net"):
-            yield Static("[b]NETWORK — Full View (Esc / B to go back)[/b]\n")
-            yield self.net.full_graph
-            yield self.net.full_data
-
-        yield Footer()
+        if name == "network":
+            return Vertical(
+                Static(f"[b]NETWORK — Full View {back}[/b]\n"),
+                self.net.full_graph,
+                self.net.full_data,
+                id="network-full",
+                classes="box net",
+            )
+
+        # ================= FULLSCREEN PROCESSES =================
+        if name == "processes":
+            from shm.ui.widgets.processes import ProcessWidget
+
+            self.procs = ProcessWidget()
+            latest = self.collector_thread.latest
+            self.procs.update(latest.processes if latest is not None else None)
+            return Vertical(
+                Static(
+                    "[b]PROCESSES — 1-7 sort, / filter, ↑↓ PgUp PgDn Home End "
+                    f"{back}[/b]\n"
+                ),
+                self.procs.full_table,
+                id="processes-full",
+                classes="box proc",
+            )
+
+        # ================= FULLSCREEN DIAGNOSTICS =================
+        if name == "overhead":
+            from shm.ui.widgets.overhead import OverheadWidget
+
+            self.overhead = OverheadWidget(self.collector.overhead, self.ui_overhead)
+            return Vertical(
+                Static(f"[b]MTOP OVERHEAD — Full View {back}[/b]\n"),
+                self.overhead.full_data,
+                id="overhead-full",
+                classes="box diag",
+            )
+
+        raise ValueError(f"unknown panel {name!r}")
 
     # ==================================================
     # LIFECYCLE
     # ==================================================
     def on_mount(self):
-        self.query_one("#cpu-full").display = False
-        self.query_one("#memory-full").display = False
-        self.query_one("#disk-full").display = False
-        self.query_one("#network-full").display = False
-        self.set_interval(1, self.refresh_data)
+        self.collector_thread.start()
+
+    def on_unmount(self):
+        self.collector_thread.stop()
+        if hasattr(self.history, "flush"):
+            self.history.flush()
 
     # ==================================================
     # EVENTS
@@ -143,55 +269,189 @@ class SystemMonitor(App):
                 return
             node = node.parent
 
+    def on_app_focus(self, event):
+        self.set_pacing(focused=True)
+
+    def on_app_blur(self, event):
+        self.set_pacing(focused=False)
+
     def on_key(self, event):
+        if self.pacer is not None:
+            self.pacer.touch()
+
+        # The process table takes its own keys (and everything while
+        # a filter is being typed)
+        if self.focused_panel == "processes" and self.procs.handle_key(
+            event.key, event.character
+        ):
+            return
+
         if event.key in ("escape", "b"):
             self.focused_panel = None
+        elif event.key in ("plus", "equals_sign"):
+            self.set_zoom(self.zoom - 1)
+        elif event.key == "minus":
+            self.set_zoom(self.zoom + 1)
+        elif event.key == "w":
+            self.set_sketch_window(self.sketch_window + 1)
+        elif event.key == "g":
+            self.set_chart_mode(self.chart_mode + 1)
+        elif event.key == "p":
+            self.focused_panel = "processes"
+        elif event.key == "d":
+            self.focused_panel = "overhead"
+        elif event.key == "i":
+            self.net.cycle_view()
+            self.render_visible()
+
+    def set_pacing(self, focused: Optional[bool] = None):
+        """
+        Passes panel / focus changes to the pacer and re-paces right away.
+        """
+        if self.pacer is None:
+            return
+        if focused is not None:
+            self.pacer.set_focused(focused)
+        self.pacer.set_panel(self.focused_panel)
+        self.collector_thread.wake()
+
+    def set_zoom(self, zoom: int):
+        """
+        +/- zoom every graph between 1 minute and 7 days of history.
+        """
+        self.zoom = min(max(zoom, 0), len(ZOOM_SPANS) - 1)
+        for widget in (self.cpu, self.mem, self.disk, self.net):
+            widget.span = ZOOM_SPANS[self.zoom]
+        self.render_visible()
+
+    def set_sketch_window(self, index: int):
+        """
+        W cycles the percentile window (1m → 15m → 1h).
+        """
+        self.sketch_window = index % len(SKETCH_WINDOWS)
+        for widget in (self.cpu, self.disk, self.net):
+            widget.window = SKETCH_WINDOWS[self.sketch_window]
+        self.render_visible()
+
+    def set_chart_mode(self, index: int):
+        """
+        G switches every graph between braille lines and block bars.
+        """
+        self.chart_mode = index % len(CHART_MODES)
+        for widget in (self.cpu, self.mem, self.disk, self.net):
+            widget.graph.set_mode(CHART_MODES[self.chart_mode])
+            widget.full_graph.set_mode(CHART_MODES[self.chart_mode])
 
     # ==================================================
     # VISIBILITY SWITCH
     # ==================================================
     def watch_focused_panel(self, value):
-        dashboard = self.query_one("#dashboard")
-        cpu_full = self.query_one("#cpu-full")
-        mem_full = self.query_one("#memory-full")
-        disk_full = self.query_one("#disk-full")
-        net_full = self.query_one("#network-full")
-
-        dashboard.display = value is None
-        cpu_full.display = value == "cpu"
-        mem_full.display = value == "memory"
-        disk_full.display = value == "disk"
-        net_full.display = value == "network"
+        if value is not None and value not in self.panels:
+            panel = self.panels[value] = self.build_panel(value)
+            self.mount(panel, before=self.query_one(Footer))
+
+        self.query_one("#dashboard").display = value is None
+        for name, panel in self.panels.items():
+            panel.display = name == value
+
+        # Hidden panels were not drawn → catch up from their last data
+        self.render_visible()
+        self.set_pacing()
+
+    def render_visible(self):
+        """
+        Redraws the visible panels from each widget's last sample.
+        """
+        dashboard = self.focused_panel is None
+        with self.ui_overhead.measure("SystemMonitor.render_visible"):
+            self.cpu.render(full=(self.focused_panel == "cpu"), dashboard=dashboard)
+            self.mem.render(full=(self.focused_panel == "memory"), dashboard=dashboard)
+            self.disk.render(full=(self.focused_panel == "disk"), dashboard=dashboard)
+            self.net.render(full=(self.focused_panel == "network"), dashboard=dashboard)
+            if self.procs is not None:
+                self.procs.render(full=(self.focused_panel == "processes"))
+        if self.overhead is not None:
+            self.overhead.render(full=(self.focused_panel == "overhead"))
 
     # ==================================================
     # DATA REFRESH LOOP
     # ==================================================
-    def refresh_data(self):
-        uptime = self.up_p.format_uptime()
-        load = self.up_p.get_load_average()
+    def on_system_monitor_sample_ready(self, message: "SystemMonitor.SampleReady"):
+        # Several queued notifications collapse into one render of
+        # whatever is newest right now, gated on every task refreshed
+        # since the last render (not just the newest sample's)
+        sample = self.collector_thread.take_latest()
+        if sample is None:
+            return
 
-        self.title = (
-            f"SystemMonitor — Up {uptime} | "
-            f"Load {load['1min']} {load['5min']} {load['15min']}"
-        )
+        self.render_sample(sample)
 
-        self.cpu.update(
-            self.cpu_p.get_metrics(),
-            self.proc_p.get_top(5),
-            full=(self.focused_panel == "cpu"),
-        )
+    def render_sample(self, sample: Sample):
+        with self.ui_overhead.measure("SystemMonitor.render_sample"):
+            self._render_sample(sample)
 
-        self.mem.update(
-            self.mem_p.get_system_memory(),
-            full=(self.focused_panel == "memory"),
-        )
+        # Drawn after the timing so its own numbers are complete
+        if self.overhead is not None:
+            self.overhead.render(full=(self.focused_panel == "overhead"))
 
-        self.disk.update(
-            self.disk_p.get_metrics(),
-            full=(self.focused_panel == "disk"),
-        )
+    def _render_sample(self, sample: Sample):
+        load = sample.load
+        measure = self.ui_overhead.measure
 
-        self.net.update(
-            self.net_p.get_metrics(),
-            full=(self.focused_panel == "network"),
+        self.title = (
+            f"SystemMonitor — Up {sample.uptime} | "
+            f"Load {load['1min']} {load['5min']} {load['15min']}"
         )
+        if self.alerts is not None and self.alerts.firing:
+            self.title += f" | {self.alerts.summary()}"
+
+        # Providers run on independent intervals → only feed a widget
+        # (and its history) when its own data was refreshed. History is
+        # always recorded; only the visible view is drawn.
+        updated = sample.updated
+        dashboard = self.focused_panel is None
+
+        if "cpu" in updated:
+            with measure("CPUWidget.update"):
+                self.cpu.update(
+                    sample.cpu,
+                    sample.top_cpu,
+                    full=(self.focused_panel == "cpu"),
+                    timestamp=sample.timestamp,
+                    dashboard=dashboard,
+                )
+
+        if "memory" in updated:
+            with measure("MemoryWidget.update"):
+                self.mem.update(
+                    sample.memory,
+                    sample.top_memory,
+                    full=(self.focused_panel == "memory"),
+                    timestamp=sample.timestamp,
+                    dashboard=dashboard,
+                )
+
+        if "disk" in updated:
+            with measure("DiskWidget.update"):
+                self.disk.update(
+                    sample.disk,
+                    full=(self.focused_panel == "disk"),
+                    timestamp=sample.timestamp,
+                    dashboard=dashboard,
+                )
+
+        if "network" in updated:
+            with measure("NetworkWidget.update"):
+                self.net.update(
+                    sample.network,
+                    full=(self.focused_panel == "network"),
+                    timestamp=sample.timestamp,
+                    dashboard=dashboard,
+                )
+
+        if "processes" in updated and self.procs is not None:
+            with measure("ProcessWidget.update"):
+                self.procs.update(
+                    sample.processes,
+                    full=(self.focused_panel == "processes"),
+                )
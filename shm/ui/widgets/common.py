@@ -1,53 +1,40 @@
-# from collections import deque
-# import asciichartpy
-# from textual.widgets import Static
-
-
-# def ascii_line(data, height=8):
-#     if not data:
-#         return ""
-#     return asciichartpy.plot(list(data), {"height": height})
-
-
-# class DataBox(Static):
-#     def update_data(self, title: str, data):
-#         lines = [f"[b]{title}[/b]\n"]
-
-#         if isinstance(data, list):
-#             lines.extend(data)
-#         elif isinstance(data, dict):
-#             for k, v in data.items():
-#                 lines.append(f"{k:<28} {v}")
+from typing import Optional, Sequence, Tuple
+from textual.widgets import Static
 
-#         self.update("\n".join(lines))
+from shm.ui.chart import GUTTER, Chart
 
 
-# class GraphBox(Static):
-#     def update_graph(self, title: str, data: deque):
-#         self.update(f"[b]{title}[/b]\n\n{ascii_line(data)}")
+def format_quantiles(summary, fmt=lambda v: f"{v:.1f}") -> str:
+    """
+    [p50, p95, p99, max] → "p50 1.0  p95 2.0  p99 3.0  max 4.0"
+    """
+    if not summary:
+        return "(no data)"
 
-from collections import deque
-import asciichartpy
-from textual.widgets import Static
+    p50, p95, p99, peak = summary
+    return (
+        f"p50 {fmt(p50)}  p95 {fmt(p95)}  "
+        f"p99 {fmt(p99)}  max {fmt(peak)}"
+    )
 
 
-def ascii_line(data, height: int = 8):
+class CachedStatic(Static):
     """
-    Draw ascii chart with configurable height.
+    Static that only calls update() (→ re-layout + repaint) when the
+    rendered text actually changed.
     """
-    if not data:
-        return ""
-
-    return asciichartpy.plot(
-        list(data),
-        {
-            "height": height,
-            "min": 0,
-        },
-    )
+
+    _content: Optional[str] = None
+
+    def set_content(self, text: str) -> bool:
+        if text == self._content:
+            return False
+        self._content = text
+        self.update(text)
+        return True
 
 
-class DataBox(Static):
+class DataBox(CachedStatic):
     """
     Generic data renderer.
     - list[str]  → preformatted lines
@@ -64,18 +51,95 @@ class DataBox(Static):
             for k, v in data.items():
                 lines.append(f"{k:<28} {v}")
 
-        self.update("\n".join(lines))
+        self.set_content("\n".join(lines))
 
 
-class GraphBox(Static):
+class GraphBox(CachedStatic):
     """
-    Graph renderer with dynamic height support.
+    Graph renderer (built-in braille / block chart) as wide as the widget.
     """
 
-    def update_graph(self, title: str, data: deque, height: int = 8):
-        if not data:
-            self.update(f"[b]{title}[/b]\n\n(no data)")
+    # Plot width until the widget has been laid out, and the least it gets
+    DEFAULT_WIDTH = 60
+    MIN_WIDTH = 10
+
+    _graph_key: Optional[Tuple] = None
+
+    def __init__(self, *args, mode: str = "braille", **kwargs):
+        super().__init__(*args, **kwargs)
+        self.chart = Chart(self.DEFAULT_WIDTH, mode=mode)
+        self._last: Optional[Tuple] = None
+
+    def _plot_width(self) -> int:
+        width = self.size.width
+        if not width:
+            return self.DEFAULT_WIDTH
+        return max(width - GUTTER, self.MIN_WIDTH)
+
+    @property
+    def points(self) -> int:
+        """
+        Data points that fit the current width (ask the store for this many).
+        """
+        self.chart.resize(self._plot_width(), self.chart.height)
+        return self.chart.points
+
+    def update_graph(self, title: str, data: Sequence[float], height: int = 8):
+        self.update_series(title, (data,), height)
+
+    def update_series(
+        self,
+        title: str,
+        series: Sequence[Sequence[float]],
+        height: int = 8,
+        legend: Sequence[str] = (),
+    ):
+        """
+        One chart, one line per series (colored when there are several,
+        `legend` names them in the same colors).
+        """
+        width = self._plot_width()
+
+        # Same points, size and mode → same chart; skip plotting altogether
+        key = (
+            title,
+            tuple(tuple(s) for s in series),
+            height,
+            tuple(legend),
+            width,
+            self.chart.mode,
+        )
+        if key == self._graph_key:
             return
+        self._graph_key = key
+        self._last = (title, series, height, legend)
+
+        header = f"[b]{title}[/b]"
+        if legend:
+            colors = self.chart.colors
+            header += "\n" + "  ".join(
+                f"[{colors[i % len(colors)]}]■ {name}[/]"
+                for i, name in enumerate(legend)
+            )
+
+        if not any(series):
+            self.set_content(f"{header}\n\n(no data)")
+            return
+
+        self.chart.resize(width, height)
+        self.chart.update(series)
+        self.set_content(f"{header}\n\n{self.chart.render()}")
+
+    def set_mode(self, mode: str):
+        self.chart.set_mode(mode)
+        self.redraw()
+
+    def redraw(self):
+        """
+        Draws the last data again (after a resize or mode change).
+        """
+        if self._last is not None:
+            self.update_series(*self._last)
 
-        graph = ascii_line(data, height=height)
-        self.update(f"[b]{title}[/b]\n\n{graph}")
+    def on_resize(self, event):
+        self.redraw()
@@ -1,6 +1,10 @@
-from collections import deque
-from typing import List
-from .common import GraphBox, DataBox
+import time
+from typing import List, Optional
+
+from shm.metrics.sketch import SKETCH_WINDOWS, SketchStore
+from shm.metrics.timeseries import TimeSeriesStore, ZOOM_SPANS, format_span
+from .common import GraphBox, DataBox, format_quantiles
+from .heatmap import CoreHeatmap
 
 
 class CPUWidget:
@@ -10,7 +14,12 @@ class CPUWidget:
     - Fullscreen graph
     """
 
-    def __init__(self):
+    SERIES = "cpu.total"
+
+    # More cores than this → heatmap instead of one text entry per core
+    TEXT_CORES = 12
+
+    def __init__(self, store: TimeSeriesStore, sketches: Optional[SketchStore] = None):
         # -------- Dashboard widgets --------
         self.graph = GraphBox()
         self.data = DataBox()
@@ -19,7 +28,19 @@ class CPUWidget:
         self.full_graph = GraphBox()
         self.full_data = DataBox()
 
-        self.hist = deque(maxlen=60)
+        # History lives in the shared store; span = zoomed time range
+        self.store = store
+        self.span = ZOOM_SPANS[0]
+
+        # Per-core percentiles (fullscreen) over the selected window
+        self.sketches = sketches if sketches is not None else SketchStore()
+        self.window = SKETCH_WINDOWS[0]
+
+        self.heatmap = CoreHeatmap()
+
+        # Last data received, so a hidden panel can be drawn when shown
+        self.cpu: Optional[dict] = None
+        self.procs: list = []
 
     # -------------------------------------------------
     def format_block(self, cpu: dict, procs: list) -> List[str]:
@@ -28,13 +49,21 @@ class CPUWidget:
         lines.append(f"Model : {cpu['model']}")
         lines.append(f"Total : {cpu['total']}%\n")
 
-        cores = sorted(cpu["cores"].items(), key=lambda x: int(x[0][3:]))
+        if len(cpu["cores"]) > self.TEXT_CORES:
+            # Many cores → one colored cell each, rows re-rendered only
+            # when a core changes bucket
+            self.heatmap.update(cpu["cores"], cpu.get("sockets", {}))
+            lines.extend(self.heatmap.lines())
+            lines.append(self.heatmap.legend())
+            lines.append(f"Hottest: {self.heatmap.hottest(cpu['cores'])}")
+        else:
+            cores = sorted(cpu["cores"].items(), key=lambda x: int(x[0][3:]))
 
-        for i in range(0, len(cores), 3):
-            row = []
-            for c, v in cores[i:i + 3]:
-                row.append(f"{c.upper():<5} {v:>4}%")
-            lines.append("   ".join(row))
+            for i in range(0, len(cores), 3):
+                row = []
+                for c, v in cores[i:i + 3]:
+                    row.append(f"{c.upper():<5} {v:>4}%")
+                lines.append("   ".join(row))
 
         lines.append("\nTop CPU Processes:")
         for p in procs:
@@ -44,34 +73,72 @@ class CPUWidget:
 
         return lines
 
+    def format_percentiles(self, cpu: dict) -> List[str]:
+        lines = [f"\nPer-core usage % over {format_span(self.window)} (W to change):"]
+
+        for core in sorted(cpu["cores"], key=lambda c: int(c[3:])):
+            summary = self.sketches.summary(f"cpu.{core}", self.window)
+            lines.append(f"{core.upper():<6} {format_quantiles(summary)}")
+
+        return lines
+
     # -------------------------------------------------
-    def update(self, cpu: dict, procs: list, full: bool = False):
+    def update(
+        self,
+        cpu: dict,
+        procs: list,
+        full: bool = False,
+        timestamp: Optional[float] = None,
+        dashboard: bool = True,
+    ):
         """
-        full=False → dashboard
-        full=True  → fullscreen
+        Records the sample, then draws only what is visible:
+        dashboard=True → dashboard
+        full=True      → fullscreen
         """
 
-        self.hist.append(cpu["total"])
+        ts = time.time() if timestamp is None else timestamp
+        self.store.add(self.SERIES, ts, cpu["total"])
+
+        # Every tick goes into the sketches → bursts between redraws count
+        for core, usage in cpu["cores"].items():
+            self.sketches.add(f"cpu.{core}", ts, usage)
+
+        self.cpu, self.procs = cpu, procs
+        self.render(full, dashboard)
+
+    def render(self, full: bool = False, dashboard: bool = True):
+        """
+        Draws the last sample (no new history)
+        """
+
+        cpu = self.cpu
+        if cpu is None or not (full or dashboard):
+            return
+
+        title = f"CPU % ({format_span(self.span)})"
+        block = self.format_block(cpu, self.procs)
 
         # -------- Dashboard --------
-        self.graph.update_graph(
-            "CPU %",
-            self.hist,
-            height=8,
-        )
-        self.data.update_data(
-            "CPU",
-            self.format_block(cpu, procs),
-        )
+        if dashboard:
+            self.graph.update_graph(
+                title,
+                self.store.window(self.SERIES, self.span, self.graph.points),
+                height=8,
+            )
+            self.data.update_data(
+                "CPU",
+                block,
+            )
 
         # -------- Fullscreen --------
         if full:
             self.full_graph.update_graph(
-                "CPU %",
-                self.hist,
+                title,
+                self.store.window(self.SERIES, self.span, self.full_graph.points),
                 height=22,
             )
             self.full_data.update_data(
                 "CPU",
-                self.format_block(cpu, procs),
+                block + self.format_percentiles(cpu),
             )
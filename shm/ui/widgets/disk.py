@@ -65,10 +65,14 @@
 #                 flatten(disk),
 #             )
 
-from collections import deque
-from typing import Dict
+import time
+from typing import Dict, Optional, Set
 
-from .common import GraphBox, DataBox
+from shm.metrics.sketch import SKETCH_WINDOWS, SketchStore
+from shm.metrics.timeseries import TimeSeriesStore, ZOOM_SPANS, format_span
+from .common import GraphBox, DataBox, format_quantiles
+
+BYTES_IN_MIB = 1024 ** 2
 
 
 class DiskWidget:
@@ -80,7 +84,18 @@ class DiskWidget:
     - Human readable keys
     """
 
-    def __init__(self):
+    SERIES = "disk.pct"
+
+    # (sketch suffix, label, value from a disks entry)
+    PERCENTILES = (
+        # Raw byte rates: the *_speed display values are rounded GiB/s
+        ("read", "Read (MiB/s)", lambda s: s["read_bytes_per_sec"] / BYTES_IN_MIB),
+        ("write", "Write (MiB/s)", lambda s: s["write_bytes_per_sec"] / BYTES_IN_MIB),
+        ("iops", "IOPS", lambda s: s["iops"]),
+        ("util", "Util (%)", lambda s: s["util_pct"]),
+    )
+
+    def __init__(self, store: TimeSeriesStore, sketches: Optional[SketchStore] = None):
         # Dashboard
         self.graph = GraphBox()
         self.data = DataBox()
@@ -89,17 +104,69 @@ class DiskWidget:
         self.full_graph = GraphBox()
         self.full_data = DataBox()
 
-        self.hist = deque(maxlen=60)
+        # History lives in the shared store; span = zoomed time range
+        self.store = store
+        self.span = ZOOM_SPANS[0]
+
+        # Per-disk percentiles (fullscreen) over the selected window
+        self.sketches = sketches if sketches is not None else SketchStore()
+        self.window = SKETCH_WINDOWS[0]
+        self._sketched: Set[str] = set()
+
+        # Last data received, so a hidden panel can be drawn when shown
+        self.disk: Optional[Dict] = None
 
     # -------------------------------------------------
-    def update(self, disk: Dict, full: bool = False):
+    def update(
+        self,
+        disk: Dict,
+        full: bool = False,
+        timestamp: Optional[float] = None,
+        dashboard: bool = True,
+    ):
         """
         disk = DiskProvider.get_metrics()
+
+        Records the sample, then draws only what is visible
         """
 
-        # ---------- Disk usage history ----------
-        for p in disk.get("partitions", {}).values():
-            self.hist.append(p.get("pct", 0.0))
+        ts = time.time() if timestamp is None else timestamp
+
+        # ---------- Per-disk IO distributions ----------
+        disks = disk.get("disks") or {}
+        for dev, s in disks.items():
+            for suffix, _, value in self.PERCENTILES:
+                self.sketches.add(f"disk.{dev}.{suffix}", ts, value(s))
+            self._sketched.add(dev)
+
+        # Disk removed (USB stick, detached volume) → drop its sketches;
+        # a sample without IO data says nothing about which disks exist
+        for dev in [d for d in self._sketched if disks and d not in disks]:
+            self.sketches.discard(f"disk.{dev}.")
+            self._sketched.discard(dev)
+
+        # ---------- Disk usage history (fullest partition) ----------
+        partitions = disk.get("partitions", {})
+        if partitions:
+            self.store.add(
+                self.SERIES,
+                ts,
+                max(p.get("pct", 0.0) for p in partitions.values()),
+            )
+
+        self.disk = disk
+        self.render(full, dashboard)
+
+    def render(self, full: bool = False, dashboard: bool = True):
+        """
+        Draws the last sample (no new history)
+        """
+
+        disk = self.disk
+        if disk is None or not (full or dashboard):
+            return
+
+        title = f"Disk % ({format_span(self.span)})"
 
         # ---------- Build FLAT + HUMAN dict ----------
         out: Dict[str, object] = {}
@@ -113,34 +180,44 @@ class DiskWidget:
 
         # ---- Partitions ----
         for part, p in disk.get("partitions", {}).items():
-            out[f"{part} Used (%)"] = p["pct"]
-            out[f"{part} Free (GiB)"] = p["free"]
+            # statvfs timed out → last good value, flagged
+            stale = " (stale)" if p.get("stale") else ""
+            out[f"{part} Used (%)"] = f"{p['pct']}{stale}"
+            out[f"{part} Free (GiB)"] = f"{p['free']}{stale}"
 
         # ---- Swap ----
         if disk.get("swap"):
             out["Swap Used (%)"] = disk["swap"]["pct"]
 
         # ---------- Dashboard ----------
-        self.graph.update_graph(
-            "Disk %",
-            self.hist,
-            height=8,
-        )
-        self.data.update_data(
-            "DISK",
-            out,
-        )
+        if dashboard:
+            self.graph.update_graph(
+                title,
+                self.store.window(self.SERIES, self.span, self.graph.points),
+                height=8,
+            )
+            self.data.update_data(
+                "DISK",
+                out,
+            )
 
         # ---------- Fullscreen ----------
         if full:
             self.full_graph.update_graph(
-                "Disk %",
-                self.hist,
+                title,
+                self.store.window(self.SERIES, self.span, self.full_graph.points),
                 height=22,
             )
+            full_out = dict(out)
+            full_out[f"Percentiles over {format_span(self.window)}"] = "(W to change)"
+            for dev in disk.get("disks", {}):
+                for suffix, label, _ in self.PERCENTILES:
+                    summary = self.sketches.summary(f"disk.{dev}.{suffix}", self.window)
+                    full_out[f"{dev} {label}"] = format_quantiles(summary)
+
             self.full_data.update_data(
                 "DISK",
-                out,
+                full_out,
             )
 
 
@@ -0,0 +1,140 @@
+import heapq
+from typing import Dict, List, Mapping, Optional, Tuple
+
+
+# Utilization buckets: 0-9 %, 10-19 %, ... 90-100 %
+BUCKETS = 10
+BUCKET_COLORS: Tuple[str, ...] = (
+    "#303030", "#1b5e20", "#2e7d32", "#558b2f", "#9e9d24",
+    "#f9a825", "#ff8f00", "#ef6c00", "#d84315", "#c62828",
+)
+
+CELL = "█"
+
+
+def bucket(usage: float) -> int:
+    return min(int(usage) // (100 // BUCKETS), BUCKETS - 1)
+
+
+class CoreHeatmap:
+    """
+    Per-core CPU heatmap: one colored cell per core, grouped by socket.
+
+    Each row of cells is rendered once and kept. A tick only compares
+    each core's utilization bucket with the previous one and re-renders
+    the rows where a bucket changed, so a 512-core machine costs 512
+    integer comparisons per tick plus the (few) rows that moved, and the
+    text stays a handful of lines however many cores there are.
+    """
+
+    def __init__(self, columns: int = 32, group: int = 8) -> None:
+        self.columns = columns      # cells per row
+        self.group = group          # a space every `group` cells
+
+        # Layout, rebuilt when the core set or the sockets change
+        self._cores: Tuple[str, ...] = ()
+        self._sockets: Dict[str, int] = {}
+        self._sockets_seen: Optional[Mapping[str, int]] = None
+        self._row_of: Dict[str, int] = {}
+        self._rows: List[List[str]] = []        # cores per row
+        self._headers: Dict[int, str] = {}      # row index → socket header
+
+        self._buckets: Dict[str, int] = {}
+        self._rendered: List[str] = []
+        self._lines: Optional[List[str]] = None
+
+    # ---------------- LAYOUT ----------------
+    def _layout(self, cores: Mapping[str, float], sockets: Mapping[str, int]) -> None:
+        self._cores = tuple(cores)
+        self._sockets = dict(sockets)
+
+        by_socket: Dict[int, List[str]] = {}
+        for core in sorted(cores, key=lambda c: int(c[3:])):
+            by_socket.setdefault(sockets.get(core, 0), []).append(core)
+
+        self._rows, self._headers, self._row_of = [], {}, {}
+        for socket, members in sorted(by_socket.items()):
+            if len(by_socket) > 1:
+                self._headers[len(self._rows)] = (
+                    f"Socket {socket} ({members[0].upper()}–{members[-1].upper()})"
+                )
+            for i in range(0, len(members), self.columns):
+                row = members[i:i + self.columns]
+                for core in row:
+                    self._row_of[core] = len(self._rows)
+                self._rows.append(row)
+
+        self._buckets = {core: -1 for core in cores}
+        self._rendered = [""] * len(self._rows)
+        self._lines = None
+
+    def _render_row(self, index: int) -> str:
+        out = []
+        run_bucket, run = -1, 0
+        for n, core in enumerate(self._rows[index]):
+            value = self._buckets[core]
+            if n and n % self.group == 0:
+                # Group gap: close the run so the space stays uncolored
+                if run:
+                    out.append(f"[{BUCKET_COLORS[run_bucket]}]{CELL * run}[/]")
+                out.append(" ")
+                run_bucket, run = -1, 0
+            if value != run_bucket and run:
+                out.append(f"[{BUCKET_COLORS[run_bucket]}]{CELL * run}[/]")
+                run = 0
+            run_bucket = value
+            run += 1
+        if run:
+            out.append(f"[{BUCKET_COLORS[run_bucket]}]{CELL * run}[/]")
+        return "".join(out)
+
+    # ---------------- UPDATE ----------------
+    def update(self, cores: Mapping[str, float], sockets: Mapping[str, int]) -> bool:
+        """
+        Takes one tick of per-core usage. Returns True if anything changed.
+        """
+        # Sockets come from /proc/cpuinfo: the same dict every tick
+        if tuple(cores) != self._cores or (
+            sockets is not self._sockets_seen and sockets != self._sockets
+        ):
+            self._layout(cores, sockets)
+        self._sockets_seen = sockets
+
+        dirty = set()
+        buckets = self._buckets
+        for core, usage in cores.items():
+            value = bucket(usage)
+            if buckets[core] != value:
+                buckets[core] = value
+                dirty.add(self._row_of[core])
+
+        for index in dirty:
+            self._rendered[index] = self._render_row(index)
+        if dirty:
+            self._lines = None
+        return bool(dirty)
+
+    def lines(self) -> List[str]:
+        """
+        Socket headers and cell rows (cached until a bucket changes).
+        """
+        if self._lines is None:
+            lines = []
+            for index, row in enumerate(self._rendered):
+                header = self._headers.get(index)
+                if header:
+                    lines.append(f"[b]{header}[/b]")
+                lines.append(row)
+            self._lines = lines
+        return self._lines
+
+    @staticmethod
+    def legend() -> str:
+        return "0% " + "".join(
+            f"[{color}]{CELL}[/]" for color in BUCKET_COLORS
+        ) + " 100%"
+
+    @staticmethod
+    def hottest(cores: Mapping[str, float], limit: int = 4) -> str:
+        top = heapq.nlargest(limit, cores.items(), key=lambda item: item[1])
+        return "  ".join(f"{core.upper()} {usage:.0f}%" for core, usage in top)
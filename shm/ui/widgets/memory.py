@@ -1,5 +1,8 @@
-from collections import deque
-from .common import GraphBox, DataBox  
+import time
+from typing import Optional
+
+from shm.metrics.timeseries import TimeSeriesStore, ZOOM_SPANS, format_span
+from .common import GraphBox, DataBox
 
 
 def format_bytes(v: float) -> str:
@@ -17,7 +20,9 @@ class MemoryWidget:
     - Fullscreen graph
     """
 
-    def __init__(self):
+    SERIES = "memory.used_pct"
+
+    def __init__(self, store: TimeSeriesStore):
         # -------- Dashboard widgets --------
         self.graph = GraphBox()
         self.data = DataBox()
@@ -26,20 +31,52 @@ class MemoryWidget:
         self.full_graph = GraphBox()
         self.full_data = DataBox()
 
-        self.history = deque(maxlen=60)
+        # History lives in the shared store; span = zoomed time range
+        self.store = store
+        self.span = ZOOM_SPANS[0]
+
+        # Last data received, so a hidden panel can be drawn when shown
+        self.mem: Optional[dict] = None
+        self.procs: Optional[list] = None
 
     # -------------------------------------------------
-    def update(self, mem: dict, full: bool = False):
+    def update(
+        self,
+        mem: dict,
+        procs: list = None,
+        full: bool = False,
+        timestamp: Optional[float] = None,
+        dashboard: bool = True,
+    ):
         """
-        full=False → dashboard
-        full=True  → fullscreen
+        Records the sample, then draws only what is visible:
+        dashboard=True → dashboard
+        full=True      → fullscreen
         """
 
         total = mem.get("total", 1) or 1
         used = mem.get("used", 0)
 
         used_pct = (used / total) * 100
-        self.history.append(used_pct)
+
+        ts = time.time() if timestamp is None else timestamp
+        self.store.add(self.SERIES, ts, used_pct)
+
+        self.mem, self.procs = mem, procs
+        self.render(full, dashboard)
+
+    def render(self, full: bool = False, dashboard: bool = True):
+        """
+        Draws the last sample (no new history)
+        """
+
+        mem = self.mem
+        if mem is None or not (full or dashboard):
+            return
+
+        total = mem.get("total", 1) or 1
+
+        title = f"Memory % ({format_span(self.span)})"
 
         # -------- render table --------
         render = {}
@@ -53,25 +90,35 @@ class MemoryWidget:
             else:
                 render[k] = str(v)
 
+        lines = [f"{k:<28} {v}" for k, v in render.items()]
+
+        if self.procs:
+            lines.append("\nTop Memory Processes:")
+            for p in self.procs:
+                lines.append(
+                    f"PID {p['pid']:<6} {p['name']:<18} {format_bytes(p['mem'])}"
+                )
+
         # -------- Dashboard --------
-        self.graph.update_graph(
-            "Memory %",
-            self.history,
-            height=8,
-        )
-        self.data.update_data(
-            "MEMORY",
-            render,
-        )
+        if dashboard:
+            self.graph.update_graph(
+                title,
+                self.store.window(self.SERIES, self.span, self.graph.points),
+                height=8,
+            )
+            self.data.update_data(
+                "MEMORY",
+                lines,
+            )
 
         # -------- Fullscreen --------
         if full:
             self.full_graph.update_graph(
-                "Memory %",
-                self.history,
+                title,
+                self.store.window(self.SERIES, self.span, self.full_graph.points),
                 height=22,
             )
             self.full_data.update_data(
                 "MEMORY",
-                render,
+                lines,
             )
@@ -152,8 +152,14 @@
 #         # fullscreen
 #         self.full_graph.update_graph("Network RX + TX", mix, height=22)
 #         self.full_data.update_data("NETWORK", lines)
-from collections import deque
-from .common import GraphBox, DataBox
+import heapq
+import time
+from typing import List, Optional, Set
+
+from shm.metrics.net_history import InterfaceHistory
+from shm.metrics.sketch import SKETCH_WINDOWS, SketchStore
+from shm.metrics.timeseries import TimeSeriesStore, ZOOM_SPANS, format_span
+from .common import GraphBox, DataBox, format_quantiles
 
 
 def format_speed(bytes_per_sec: float) -> str:
@@ -179,9 +185,18 @@ class NetworkWidget:
     - Dashboard graph (small)
     - Fullscreen graph (big)
     - Interface name shown once
+    - Graph view (I to cycle): all interfaces, busiest overlaid, one interface
     """
 
-    def __init__(self):
+    TOTAL = "total"     # RX + TX of every interface
+    TOP = "top"         # busiest OVERLAY_LIMIT interfaces, one line each
+
+    OVERLAY_LIMIT = 5
+
+    # Interfaces listed on the dashboard (fullscreen lists all)
+    DASHBOARD_LIMIT = 3
+
+    def __init__(self, store: TimeSeriesStore, sketches: Optional[SketchStore] = None):
         # dashboard
         self.graph = GraphBox()
         self.data = DataBox()
@@ -190,49 +205,172 @@ class NetworkWidget:
         self.full_graph = GraphBox()
         self.full_data = DataBox()
 
-        self.rx_hist = deque(maxlen=60)
-        self.tx_hist = deque(maxlen=60)
-
-    def update(self, net: dict, full: bool = False):
-        lines = []
-
-        for iface, stats in net.items():
-            down = stats.get("download_speed", 0.0)
-            up = stats.get("upload_speed", 0.0)
-
-            self.rx_hist.append(down)
-            self.tx_hist.append(up)
-
-            lines.append(f"[b]{iface.upper()}[/b]")
-            lines.append(f"  Download Speed      {format_speed(down)}")
-            lines.append(f"  Upload Speed        {format_speed(up)}")
-            lines.append(
-                f"  Total Receive       {format_bytes(stats.get('total_receive', 0))}"
+        # History lives in the shared store; span = zoomed time range
+        self.store = store
+        self.span = ZOOM_SPANS[0]
+
+        # Per-interface rates (in memory, only interfaces with traffic)
+        self.history = InterfaceHistory()
+        self.view = self.TOTAL  # TOTAL | TOP | interface name
+
+        # Per-interface rate percentiles (fullscreen) over the selected window
+        self.sketches = sketches if sketches is not None else SketchStore()
+        self.window = SKETCH_WINDOWS[0]
+        self._sketched: Set[str] = set()
+
+        # Last data received, so a hidden panel can be drawn when shown
+        self.net: Optional[dict] = None
+        self.rx_total = 0.0
+        self.tx_total = 0.0
+
+    def update(
+        self,
+        net: dict,
+        full: bool = False,
+        timestamp: Optional[float] = None,
+        dashboard: bool = True,
+    ):
+        """
+        Records the sample, then draws only what is visible
+        """
+
+        ts = time.time() if timestamp is None else timestamp
+
+        # Idle interfaces (most veths) get neither history nor sketches
+        rx_total, tx_total = self.history.add(ts, net)
+        for iface in self.history.series:
+            stats = net[iface]
+            self.sketches.add(f"net.{iface}.rx", ts, stats.get("download_speed", 0.0))
+            self.sketches.add(f"net.{iface}.tx", ts, stats.get("upload_speed", 0.0))
+            self._sketched.add(iface)
+
+        # Interface gone → drop its sketches with its history
+        for iface in [i for i in self._sketched if i not in net]:
+            self.sketches.discard(f"net.{iface}.")
+            self._sketched.discard(iface)
+
+        # One point per tick for all interfaces together
+        self.store.add("net.rx", ts, rx_total)
+        self.store.add("net.tx", ts, tx_total)
+        self.store.add("net.total", ts, rx_total + tx_total)
+
+        self.net = net
+        self.rx_total, self.tx_total = rx_total, tx_total
+        self.render(full, dashboard)
+
+    # -------------------------------------------------
+    def busiest(self, limit: Optional[int] = None) -> List[str]:
+        """
+        Interfaces by current RX + TX, busiest first.
+        """
+        net = self.net or {}
+
+        def rate(iface: str) -> float:
+            stats = net[iface]
+            return stats.get("download_speed", 0.0) + stats.get("upload_speed", 0.0)
+
+        if limit is None:
+            return sorted(net, key=rate, reverse=True)
+        return heapq.nlargest(limit, net, key=rate)
+
+    def cycle_view(self):
+        """
+        All interfaces → busiest overlaid → each interface, busiest first.
+        """
+        views = [self.TOTAL, self.TOP] + self.busiest()
+        index = views.index(self.view) if self.view in views else 0
+        self.view = views[(index + 1) % len(views)]
+
+    def draw_graph(self, box: GraphBox, height: int):
+        points = box.points
+        span = format_span(self.span)
+        view = self.view
+
+        if view not in (self.TOTAL, self.TOP) and view not in (self.net or {}):
+            # Selected interface went away
+            view = self.view = self.TOTAL
+
+        if view == self.TOTAL:
+            box.update_graph(
+                f"Network RX + TX, all interfaces ({span}, I to change)",
+                self.store.window("net.total", self.span, points),
+                height=height,
             )
-            lines.append(
-                f"  Total Transmit      {format_bytes(stats.get('total_transmit', 0))}"
+        elif view == self.TOP:
+            names = self.busiest(self.OVERLAY_LIMIT)
+            box.update_series(
+                f"Network RX + TX, busiest interfaces ({span}, I to change)",
+                [self.history.combined(name, self.span, points) for name in names],
+                height=height,
+                legend=names,
             )
-            lines.append(f"  Receive Packets     {stats.get('receive_packets', 0)}")
-            lines.append(f"  Transmit Packets    {stats.get('transmit_packets', 0)}")
-            lines.append(f"  Receive Errors      {stats.get('receive_errors', 0)}")
-            lines.append(f"  Transmit Errors     {stats.get('transmit_errors', 0)}")
-            lines.append(
-                f"  Dropped Packets     {stats.get('total_dropped_packets', 0)}"
+        else:
+            box.update_series(
+                f"Network {view} ({span}, I to change)",
+                self.history.window(view, self.span, points),
+                height=height,
+                legend=("RX", "TX"),
             )
-            lines.append("")
 
-        mix = deque(
-            [r + t for r, t in zip(self.rx_hist, self.tx_hist)],
-            maxlen=60,
-        )
+    def format_interface(self, iface: str, stats: dict) -> List[str]:
+        return [
+            f"[b]{iface.upper()}[/b]",
+            f"  Download Speed      {format_speed(stats.get('download_speed', 0.0))}",
+            f"  Upload Speed        {format_speed(stats.get('upload_speed', 0.0))}",
+            f"  Total Receive       {format_bytes(stats.get('total_receive', 0))}",
+            f"  Total Transmit      {format_bytes(stats.get('total_transmit', 0))}",
+            f"  Receive Packets     {stats.get('receive_packets', 0)}",
+            f"  Transmit Packets    {stats.get('transmit_packets', 0)}",
+            f"  Receive Errors      {stats.get('receive_errors', 0)}",
+            f"  Transmit Errors     {stats.get('transmit_errors', 0)}",
+            f"  Dropped Packets     {stats.get('total_dropped_packets', 0)}",
+            "",
+        ]
+
+    def render(self, full: bool = False, dashboard: bool = True):
+        """
+        Draws the last sample (no new history)
+        """
+
+        net = self.net
+        if net is None or not (full or dashboard):
+            return
+
+        summary = [
+            f"[b]ALL ({len(net)} interfaces)[/b]",
+            f"  Download Speed      {format_speed(self.rx_total)}",
+            f"  Upload Speed        {format_speed(self.tx_total)}",
+            "",
+        ]
 
         # -------- dashboard --------
-        self.graph.update_graph("Network RX + TX", mix, height=8)
-        self.data.update_data("NETWORK", lines)
+        if dashboard:
+            lines = list(summary)
+            shown = self.busiest(self.DASHBOARD_LIMIT)
+            for iface in shown:
+                lines += self.format_interface(iface, net[iface])
+            if len(net) > len(shown):
+                lines.append(f"(+{len(net) - len(shown)} more, click for all)")
+
+            self.draw_graph(self.graph, height=8)
+            self.data.update_data("NETWORK", lines)
 
         # -------- fullscreen --------
         if full:
-            self.full_graph.update_graph(
-                "Network RX + TX", mix, height=24
-            )
-            self.full_data.update_data("NETWORK", lines)
+            lines = list(summary)
+            percentiles = [
+                f"[b]Rates over {format_span(self.window)}[/b] (W to change)"
+            ]
+            for iface in self.busiest():
+                lines += self.format_interface(iface, net[iface])
+                if iface not in self.history.series:
+                    continue
+                for direction in ("rx", "tx"):
+                    stat = self.sketches.summary(f"net.{iface}.{direction}", self.window)
+                    percentiles.append(
+                        f"  {iface} {direction.upper()}  "
+                        f"{format_quantiles(stat, format_speed)}"
+                    )
+
+            self.draw_graph(self.full_graph, height=24)
+            self.full_data.update_data("NETWORK", lines + percentiles)
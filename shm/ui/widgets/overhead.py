@@ -0,0 +1,75 @@
+from typing import List
+
+from shm.metrics.overhead import Overhead, Stage
+from .common import CachedStatic
+from .memory import format_bytes
+
+
+def _ms(seconds: float) -> str:
+    return f"{seconds * 1000:9.2f}"
+
+
+class OverheadWidget:
+    """
+    Overhead Widget
+    - Fullscreen only (D): what mtop itself costs, per stage
+    - Collector thread: every provider call and the whole tick
+    - UI thread: every widget update and the whole sample render
+    - Per tick: files read / opened and directories listed
+    """
+
+    HEADER = (
+        f"[b]{'STAGE':<48}{'RUNS':>8}"
+        f"{'WALL ms':>10}{'max':>9}{'CPU ms':>10}{'max':>9}[/b]"
+    )
+
+    def __init__(self, collector: Overhead, ui: Overhead):
+        self.collector = collector
+        self.ui = ui
+        self.full_data = CachedStatic()
+
+    # -------------------------------------------------
+    @staticmethod
+    def _stage(stage: Stage, indent: str = "  ") -> str:
+        return (
+            f"{indent + stage.name:<48}{stage.wall.total:>8}"
+            f"{_ms(stage.wall.average)} {_ms(stage.wall.maximum)}"
+            f"{_ms(stage.cpu.average)} {_ms(stage.cpu.maximum)}"
+        )
+
+    def _section(self, title: str, overhead: Overhead, total: str) -> List[str]:
+        lines = [f"[b]{title}[/b]"]
+        whole = None
+        for stage in overhead.rows():
+            if stage.name == total:
+                whole = stage
+            else:
+                lines.append(self._stage(stage))
+        if whole is not None:
+            lines.append(self._stage(whole, indent="= "))
+        return lines
+
+    def render(self, full: bool = False):
+        if not full:
+            return
+
+        overhead = self.collector
+        lines = [
+            f"RSS {format_bytes(overhead.rss())}   "
+            f"CPU {overhead.cpu_percent():.1f}% of one core   "
+            f"(averages and maxima over the last {overhead.window} runs)",
+            "",
+            self.HEADER,
+        ]
+        lines += self._section("Collector thread", overhead, "Collector.collect")
+        lines.append("")
+        lines += self._section("UI thread", self.ui, "SystemMonitor.render_sample")
+
+        lines += ["", f"[b]{'PER TICK':<48}{'last':>8}{'avg':>10}{'max':>10}[/b]"]
+        for name, counter in list(overhead.counters.items()):
+            lines.append(
+                f"  {name:<46}{counter.last:>8.0f}"
+                f"{counter.average:>10.1f}{counter.maximum:>10.0f}"
+            )
+
+        self.full_data.set_content("\n".join(lines))
@@ -0,0 +1,297 @@
+from operator import itemgetter
+from typing import Callable, Dict, List, Optional, Tuple
+
+from rich.markup import escape
+
+from shm.metrics.proc_scan import ProcessSnapshot
+from .common import CachedStatic
+from .memory import format_bytes
+
+
+# (key, header, width, align); keys 1-7 sort by these in order
+COLUMNS: Tuple[Tuple[str, str, int, str], ...] = (
+    ("pid", "PID", 7, ">"),
+    ("user", "USER", 10, "<"),
+    ("state", "S", 1, "<"),
+    ("threads", "THR", 5, ">"),
+    ("cpu", "CPU%", 6, ">"),
+    ("rss", "RSS", 11, ">"),
+    ("name", "NAME", 0, "<"),
+)
+
+# Text columns sort A→Z first, numbers biggest first
+TEXT_COLUMNS = ("user", "state", "name")
+
+
+Record = Dict[str, object]
+
+_PID = itemgetter("pid")
+
+
+class ProcessTable:
+    """
+    Sorted, filtered list of the process records of one ProcessSnapshot.
+
+    Nothing is formatted here. The order of the previous snapshot is
+    kept: exited PIDs are dropped, new ones appended and the list is
+    sorted again, which Timsort does in close to linear time because
+    most processes keep their place between two scans. Ties keep their
+    previous order, so idle processes do not shuffle around. Numeric
+    columns sort with itemgetter, so the whole pass stays in C. Typing
+    more of a filter only narrows the previous matches.
+    """
+
+    def __init__(self) -> None:
+        self.sort = "cpu"
+        self.descending = True
+        self.filter = ""
+
+        self.snapshot: Optional[ProcessSnapshot] = None
+
+        self._order: List[Record] = []
+        self._pids: List[str] = []
+        self._sorted: Optional[Tuple] = None        # (snapshot, sort, descending)
+        self._matches: Optional[List[Record]] = None
+        self._matched: Optional[Tuple] = None       # (sorted key, filter)
+
+    # ---------------- INPUT ----------------
+    def set_snapshot(self, snapshot: Optional[ProcessSnapshot]) -> None:
+        # Sorting waits until the rows are actually needed
+        self.snapshot = snapshot
+
+    def set_sort(self, column: str) -> None:
+        """
+        Sort by `column`; the same column again flips the direction.
+        """
+        if column == self.sort:
+            self.descending = not self.descending
+        else:
+            self.sort = column
+            self.descending = column not in TEXT_COLUMNS
+
+    def set_filter(self, text: str) -> None:
+        self.filter = text
+
+    # ---------------- OUTPUT ----------------
+    def _key(self) -> Callable[[Record], object]:
+        snapshot = self.snapshot
+        column = self.sort
+
+        if column == "pid":
+            return lambda p: int(p["pid"])
+        if column == "name":
+            return lambda p: p["name"].lower()
+        if column == "user":
+            return lambda p: snapshot.user(p["uid"]).lower()
+        return itemgetter(column)
+
+    def _refresh(self) -> None:
+        snapshot = self.snapshot
+        key = (snapshot, self.sort, self.descending)
+        if key == self._sorted:
+            return
+
+        # Previous order with this scan's records (exited PIDs → None)
+        procs = snapshot.processes
+        pids = self._pids
+        order = list(filter(None, map(procs.get, pids)))
+        if len(order) != len(procs):
+            order.extend(map(procs.__getitem__, procs.keys() - set(pids)))
+
+        order.sort(key=self._key(), reverse=self.descending)
+        self._order = order
+        self._pids = list(map(_PID, order))
+        self._sorted = key
+
+    def rows(self) -> List[Record]:
+        """
+        Records to show, in order.
+        """
+        if self.snapshot is None:
+            return []
+        self._refresh()
+
+        text = self.filter.lower()
+        if not text:
+            return self._order
+
+        if self._matched is not None and self._matched == (self._sorted, text):
+            return self._matches
+
+        # Same order, longer filter → only the previous matches can match
+        candidates = self._order
+        if (
+            self._matched is not None
+            and self._matched[0] == self._sorted
+            and text.startswith(self._matched[1])
+        ):
+            candidates = self._matches
+
+        user = self.snapshot.user
+        self._matches = [
+            p for p in candidates
+            if text in p["name"].lower()
+            or text in p["pid"]
+            or text in user(p["uid"]).lower()
+        ]
+        self._matched = (self._sorted, text)
+        return self._matches
+
+
+class ProcessView(CachedStatic):
+    """
+    Virtualized table: only the rows on screen are formatted.
+    """
+
+    # Status + column header lines above the rows
+    HEADER_LINES = 2
+    DEFAULT_ROWS = 40
+
+    def __init__(self, table: ProcessTable, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.table = table
+        self.offset = 0
+        self.editing = False
+
+    def visible_rows(self) -> int:
+        height = self.size.height
+        if not height:
+            return self.DEFAULT_ROWS
+        return max(height - self.HEADER_LINES, 1)
+
+    def scroll_rows(self, delta: int):
+        self.offset += delta
+        self.redraw()
+
+    def scroll_to(self, offset: int):
+        self.offset = offset
+        self.redraw()
+
+    # -------------------------------------------------
+    def _header(self) -> str:
+        cells = []
+        for key, title, width, align in COLUMNS:
+            if key == self.table.sort:
+                title += "▼" if self.table.descending else "▲"
+            cells.append(f"{title:{align}{width}}" if width else title)
+        return "[b]" + " ".join(cells) + "[/b]"
+
+    def _row(self, snapshot: ProcessSnapshot, p: Record) -> str:
+        user = snapshot.user(p["uid"])[:10]
+        return (
+            f"{p['pid']:>7} {escape(user):<10} {p['state']:<1} {p['threads']:>5} "
+            f"{p['cpu']:>6.1f} {format_bytes(p['rss']):>11} {escape(p['name'])}"
+        )
+
+    def redraw(self):
+        table = self.table
+        snapshot = table.snapshot
+        if snapshot is None:
+            self.set_content("(process scanning is off)")
+            return
+
+        rows = table.rows()
+        count = self.visible_rows()
+        self.offset = max(0, min(self.offset, len(rows) - count))
+
+        cursor = "▏" if self.editing else ""
+        status = (
+            f"Filter: {escape(table.filter)}{cursor}   "
+            f"{len(rows)} of {len(snapshot)} processes   "
+            f"rows {self.offset + 1 if rows else 0}–"
+            f"{min(self.offset + count, len(rows))}"
+        )
+
+        lines = [status, self._header()]
+        lines.extend(
+            self._row(snapshot, p)
+            for p in rows[self.offset:self.offset + count]
+        )
+        self.set_content("\n".join(lines))
+
+    # -------------------------------------------------
+    def on_mouse_scroll_down(self, event):
+        self.scroll_rows(3)
+
+    def on_mouse_scroll_up(self, event):
+        self.scroll_rows(-3)
+
+    def on_resize(self, event):
+        self.redraw()
+
+
+class ProcessWidget:
+    """
+    Process Widget
+    - Fullscreen only (P): every process, sortable, filterable
+    """
+
+    # key → rows to scroll (None = page)
+    SCROLL_KEYS: Dict[str, Optional[int]] = {
+        "up": -1,
+        "down": 1,
+        "pageup": None,
+        "pagedown": None,
+    }
+
+    def __init__(self):
+        self.table = ProcessTable()
+        self.full_table = ProcessView(self.table)
+
+    # -------------------------------------------------
+    def update(self, snapshot: Optional[ProcessSnapshot], full: bool = False):
+        """
+        Keeps the newest snapshot; sorting and formatting wait until shown.
+        """
+        self.table.set_snapshot(snapshot)
+        self.render(full)
+
+    def render(self, full: bool = False):
+        if full:
+            self.full_table.redraw()
+
+    # -------------------------------------------------
+    def handle_key(self, key: str, character: Optional[str]) -> bool:
+        """
+        Returns True if the key was used by the table.
+        """
+        view = self.full_table
+        table = self.table
+
+        if view.editing:
+            if key in ("enter", "escape"):
+                view.editing = False
+                if key == "escape":
+                    table.set_filter("")
+            elif key == "backspace":
+                table.set_filter(table.filter[:-1])
+            elif character and character.isprintable():
+                table.set_filter(table.filter + character)
+            view.scroll_to(0)
+            return True
+
+        if key == "slash":
+            view.editing = True
+            view.redraw()
+            return True
+
+        if character and character.isdigit() and 1 <= int(character) <= len(COLUMNS):
+            table.set_sort(COLUMNS[int(character) - 1][0])
+            view.scroll_to(0)
+            return True
+
+        if key in self.SCROLL_KEYS:
+            delta = self.SCROLL_KEYS[key]
+            if delta is None:
+                delta = view.visible_rows() * (1 if key == "pagedown" else -1)
+            view.scroll_rows(delta)
+            return True
+
+        if key == "home":
+            view.scroll_to(0)
+            return True
+        if key == "end":
+            view.scroll_to(len(table.rows()))
+            return True
+
+        return False
@@ -0,0 +1,205 @@
+import pytest
+
+from shm.alerts import AlertEngine, FileSink, Rule, RuleError, parse_duration
+from shm.collector import Sample
+
+
+def make_sample(
+    ts: float,
+    total: float = 0.0,
+    updated=frozenset(("cpu",)),
+    partitions=None,
+    network=None,
+) -> Sample:
+    return Sample(
+        seq=int(ts),
+        timestamp=ts,
+        duration=0.0,
+        updated=updated,
+        uptime="",
+        load={},
+        cpu={"total": total, "cores": {}},
+        top_cpu=[],
+        memory={},
+        top_memory=[],
+        disk={"partitions": partitions or {}},
+        network=network or {},
+        processes=None,
+    )
+
+
+# ---------------- PARSER ----------------
+def test_parse_duration_units():
+    assert parse_duration("500ms") == 0.5
+    assert parse_duration("30s") == 30.0
+    assert parse_duration("2m") == 120.0
+    assert parse_duration("1.5h") == 5400.0
+    assert parse_duration("7") == 7.0
+    with pytest.raises(RuleError):
+        parse_duration("soon")
+
+
+def test_parse_rule_forms():
+    rule = Rule.parse("cpu.total  >  90 for 30s")
+    assert (rule.text, rule.key, rule.field, rule.op_text) == ("cpu.total > 90 for 30s", None, "total", ">")
+    assert (rule.threshold, rule.duration, rule.rate) == (90.0, 30.0, False)
+
+    rule = Rule.parse("net * receive_errors rate > 0")
+    assert (rule.key, rule.field, rule.rate, rule.keyed) == ("*", "receive_errors", True, True)
+
+    rule = Rule.parse("partition / pct >= 95")
+    assert (rule.section_name, rule.key, rule.field) == ("partition", "/", "pct")
+
+
+@pytest.mark.parametrize("line", [
+    "cpu.total 90",
+    "bogus x > 1",
+    "cpu > 90",
+    "partition pct > 1",
+    "memory pct > lots",
+    "rate > 1",
+])
+def test_parse_rule_errors(line):
+    with pytest.raises(RuleError):
+        Rule.parse(line)
+
+
+# ---------------- STATE MACHINE ----------------
+def test_duration_pending_then_firing_then_resolved():
+    engine = AlertEngine([Rule.parse("cpu.total > 50 for 10s")])
+
+    assert engine.evaluate(make_sample(0.0, 90.0)) == []       # pending
+    assert engine.evaluate(make_sample(5.0, 90.0)) == []
+    [event] = engine.evaluate(make_sample(10.0, 90.0))
+    assert (event.state, event.since, event.value) == ("firing", 0.0, 90.0)
+    assert engine.evaluate(make_sample(11.0, 95.0)) == []      # still firing
+    assert engine.summary() == "⚠ 1 alert: cpu.total > 50 for 10s"
+
+    [event] = engine.evaluate(make_sample(12.0, 10.0))
+    assert event.state == "resolved"
+    assert engine.firing == {}
+
+
+def test_pending_that_clears_never_fires():
+    engine = AlertEngine([Rule.parse("cpu.total > 50 for 10s")])
+    engine.evaluate(make_sample(0.0, 90.0))
+    engine.evaluate(make_sample(5.0, 10.0))
+    assert engine.evaluate(make_sample(10.0, 90.0)) == []
+    assert engine.evaluate(make_sample(20.0, 90.0))[0].since == 10.0
+
+
+def test_rules_only_run_when_their_task_ran():
+    engine = AlertEngine([Rule.parse("cpu.total > 50")])
+    assert engine.evaluate(make_sample(0.0, 90.0, updated=frozenset(("memory",)))) == []
+    assert engine.evaluations == 0
+
+
+def test_rate_of_a_counter_and_reset():
+    engine = AlertEngine([Rule.parse("net eth0 receive_errors rate > 1")])
+    updated = frozenset(("network",))
+
+    def step(ts, errors):
+        return engine.evaluate(
+            make_sample(ts, updated=updated, network={"eth0": {"receive_errors": errors}})
+        )
+
+    assert step(0.0, 100) == []                 # first reading
+    assert step(1.0, 101) == []                 # 1/s, not > 1
+    assert step(2.0, 105)[0].state == "firing"  # 4/s
+    assert step(3.0, 0)[0].state == "resolved"  # counter reset
+
+
+def test_templates_expand_and_vanished_instances_resolve():
+    engine = AlertEngine([Rule.parse("net * download_speed > 10")])
+    updated = frozenset(("network",))
+    busy = {"eth0": {"download_speed": 50}, "eth1": {"download_speed": 50}}
+
+    events = engine.evaluate(make_sample(0.0, updated=updated, network=busy))
+    assert sorted(e.name for e in events) == [
+        "net eth0 download_speed > 10",
+        "net eth1 download_speed > 10",
+    ]
+
+    events = engine.evaluate(
+        make_sample(1.0, updated=updated, network={"eth0": {"download_speed": 50}})
+    )
+    assert [(e.name, e.state) for e in events] == [("net eth1 download_speed > 10", "resolved")]
+    assert len(engine.firing) == 1
+
+
+def test_rules_expanding_to_the_same_name_are_tracked_separately():
+    rules = [
+        Rule.parse("partition / pct > 90"),
+        Rule.parse("partition * pct > 90"),
+        Rule.parse("partition / pct > 90"),     # duplicate line
+    ]
+    engine = AlertEngine(rules)
+    updated = frozenset(("partitions",))
+
+    def step(ts, pct):
+        return engine.evaluate(make_sample(
+            ts, updated=updated, partitions={"sda1": {"mount": "/", "pct": pct}}
+        ))
+
+    events = step(0.0, 95.0)
+    assert len(events) == 2
+    assert {e.name for e in events} == {"partition / pct > 90"}
+    assert len(engine.firing) == 2
+    assert engine.summary().startswith("⚠ 2 alerts")
+
+    engine.rules[1].threshold = 99.0            # only the template resolves
+    [event] = step(1.0, 95.0)
+    assert event.rule == "partition * pct > 90"
+    assert list(engine.firing) == [("partition / pct > 90", "partition / pct > 90")]
+
+
+def test_named_rules_resolve_by_key_or_label_and_expand_only_on_change(monkeypatch):
+    rules = [Rule.parse(f"partition {name} pct > 90") for name in ("sda1", "/data", "sdz9")]
+    engine = AlertEngine(rules)
+    updated = frozenset(("partitions",))
+    parts = {"sda1": {"mount": "/", "pct": 95.0}, "sdb1": {"mount": "/data", "pct": 95.0}}
+
+    expanded = []
+    real = engine._expand
+    monkeypatch.setattr(
+        engine, "_expand", lambda rule, *args: expanded.append(rule) or real(rule, *args)
+    )
+
+    events = engine.evaluate(make_sample(0.0, updated=updated, partitions=parts))
+    assert sorted(e.name for e in events) == ["partition /data pct > 90", "partition sda1 pct > 90"]
+    assert len(expanded) == 3
+
+    # Same keys → no re-expansion, whatever the values
+    engine.evaluate(make_sample(1.0, updated=updated, partitions=dict(parts)))
+    assert len(expanded) == 3
+
+    # A partition appears → every partition rule sees the new key set once
+    parts["sdz9"] = {"mount": "/mnt", "pct": 99.0}
+    events = engine.evaluate(make_sample(2.0, updated=updated, partitions=parts))
+    assert [e.name for e in events] == ["partition sdz9 pct > 90"]
+    assert len(expanded) == 6
+
+
+# ---------------- SINKS ----------------
+def test_failing_sinks_are_counted_and_do_not_stop_the_others():
+    seen = []
+
+    def broken(event):
+        raise RuntimeError("sink down")
+
+    engine = AlertEngine([Rule.parse("cpu.total > 50")], [broken, seen.append])
+    engine.evaluate(make_sample(1.0, 90.0))
+    engine.evaluate(make_sample(2.0, 10.0))
+
+    assert [event.state for event in seen] == ["firing", "resolved"]
+    assert engine.sink_errors == {broken: 2}
+
+
+def test_file_sink_counts_write_errors():
+    sink = FileSink("/dev/full")
+    engine = AlertEngine([Rule.parse("cpu.total > 50")], [sink])
+    engine.evaluate(make_sample(1.0, 90.0))
+    sink.close = lambda: None   # closing would flush into /dev/full again
+
+    assert sink.dropped == 1
+    assert engine.sink_errors == {}
@@ -0,0 +1,59 @@
+import os
+import threading
+import time
+
+import pytest
+
+from shm.core import capacity
+from shm.core.capacity import CapacityProber
+
+
+@pytest.fixture
+def hung(monkeypatch):
+    """
+    statvfs() blocks on paths under /hung until the event is set.
+    """
+    release = threading.Event()
+    real = os.statvfs
+
+    def statvfs(path):
+        if path.startswith("/hung"):
+            release.wait()
+        return real("/")
+
+    monkeypatch.setattr(capacity.os, "statvfs", statvfs)
+    yield release
+    release.set()
+
+
+def test_stuck_workers_are_replaced_up_to_the_cap(hung):
+    prober = CapacityProber(workers=2, timeout=0.05, max_workers=4)
+    paths = ["/hung/a", "/hung/b", "/hung/c", "/"]
+
+    first = prober.probe(paths)
+    assert first["/hung/a"]["stale"] and first["/hung/b"]["stale"]
+
+    # Both workers are stuck: two replacements take /hung/c and /
+    time.sleep(0.06)
+    second = prober.probe(paths)
+    assert second["/"]["stale"] is False
+    assert second["/"]["stat"] is not None
+    assert second["/hung/c"]["stale"]
+
+    time.sleep(0.06)
+    prober.probe(paths)
+    assert len(prober._threads) == 4
+
+    # Stuck calls return → back to `workers` threads
+    hung.set()
+    deadline = time.monotonic() + 2.0
+    while len(prober._threads) > 2 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert len(prober._threads) == 2
+
+
+def test_healthy_mounts_are_not_stale():
+    prober = CapacityProber(workers=2, timeout=1.0)
+    result = prober.probe(["/"])
+    assert result["/"]["stale"] is False
+    assert result["/"]["stat"] is not None
@@ -0,0 +1,80 @@
+import gzip
+import time
+
+import pytest
+
+from shm.capture import (
+    CaptureWriter,
+    ReplayCollector,
+    collect_recorded,
+    read_capture,
+)
+from shm.collector import Collector
+
+# Every task on every tick, like replay does, and no process scan
+EVERY_TICK = {name: 1e-9 for name in Collector.DEFAULT_SCHEDULE}
+EVERY_TICK["processes"] = 0
+
+
+def record_live(path, ticks=3):
+    collector = Collector(intervals=EVERY_TICK)
+    writer = CaptureWriter(str(path), interval=0.05, processes=False)
+    samples = []
+    try:
+        for _ in range(ticks):
+            sample, frame = collect_recorded(collector)
+            writer.write_frame(frame)
+            samples.append(sample)
+            time.sleep(0.05)
+    finally:
+        writer.close()
+    return samples
+
+
+def test_replay_reproduces_the_recorded_samples(tmp_path):
+    path = tmp_path / "capture.mtr.gz"
+    live = record_live(path)
+
+    replay = ReplayCollector(str(path), speed=0)
+    assert replay.header["processes"] is False
+
+    for recorded in live:
+        sample = replay.collect()
+        assert sample.timestamp == pytest.approx(recorded.timestamp, abs=1e-6)
+        assert sample.uptime == recorded.uptime
+        assert sample.load == recorded.load
+        assert sample.cpu == recorded.cpu
+        assert sample.memory == recorded.memory
+        assert sample.network == recorded.network
+        assert sample.disk["disks"] == recorded.disk["disks"]
+        assert sample.disk["partitions"] == recorded.disk["partitions"]
+
+    assert replay.frames == len(live)
+    with pytest.raises(EOFError):
+        replay.collect()
+
+
+def test_replay_paces_frames_by_recorded_time(tmp_path):
+    path = tmp_path / "capture.mtr.gz"
+    record_live(path, ticks=2)
+
+    replay = ReplayCollector(str(path), speed=2.0)
+    first_t = replay._next["t"]
+    replay.collect()
+    gap = replay._next["t"] - first_t
+    assert replay.next_deadline() == pytest.approx(replay._started + gap / 2.0)
+
+    assert ReplayCollector(str(path), speed=0).next_deadline() == 0.0
+
+
+def test_read_capture_rejects_other_files(tmp_path):
+    path = tmp_path / "other.gz"
+    with gzip.open(path, "wt") as file:
+        file.write('{"format": "something-else"}\n')
+    with pytest.raises(ValueError, match="not an mtop capture"):
+        list(read_capture(str(path)))
+
+    with gzip.open(path, "wt") as file:
+        file.write('{"format": "mtop-capture", "version": 99}\n')
+    with pytest.raises(ValueError, match="unsupported capture version"):
+        list(read_capture(str(path)))
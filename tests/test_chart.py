@@ -0,0 +1,27 @@
+import random
+
+import pytest
+
+from shm.ui.chart import Chart
+
+
+def rebuilt(chart: Chart, series) -> str:
+    fresh = Chart(chart.width, chart.height, chart.mode)
+    fresh.update(series)
+    return fresh.render()
+
+
+@pytest.mark.parametrize("mode", ["braille", "block"])
+@pytest.mark.parametrize("step", [1, 2, 3])
+@pytest.mark.parametrize("count", [1, 2])
+def test_incremental_updates_match_a_rebuild(mode, step, count):
+    rng = random.Random(step * 10 + count)
+    chart = Chart(width=12, height=4, mode=mode)
+    streams = [[rng.uniform(10, 90) for _ in range(200)] for _ in range(count)]
+    window = chart.points
+
+    for end in range(window, 200, step):
+        series = [s[end - window:end] for s in streams]
+        chart.update(series)
+        assert chart.render() == rebuilt(chart, series), end
+
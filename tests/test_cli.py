@@ -0,0 +1,101 @@
+import pytest
+
+from shm import cli
+
+
+def parse(argv):
+    parser = cli.build_parser()
+    args = parser.parse_args(argv)
+    cli._resolve_headless(parser, args)
+    return args
+
+
+def test_headless_alone_runs_collect_with_its_options():
+    args = parse(["--headless", "-i", "2", "-n", "3", "--no-processes"])
+    assert (args.command, args.interval, args.count, args.no_processes) == (
+        "collect", 2.0, 3, True
+    )
+    args = parse(["--headless"])
+    assert (args.command, args.interval, args.count, args.no_processes) == (
+        "collect", 1.0, None, False
+    )
+
+
+def test_headless_before_replay_and_connect_uses_theirs():
+    assert parse(["--headless", "replay", "capture.mtr.gz"]).headless is True
+    assert parse(["replay", "capture.mtr.gz", "--headless"]).headless is True
+    assert parse(["replay", "capture.mtr.gz"]).headless is False
+    assert parse(["--headless", "connect", "db1"]).headless is True
+
+
+def test_argument_values_are_not_mistaken_for_commands():
+    # A rules file named `replay` used to stop --headless from mapping to collect
+    args = parse(["--alerts", "replay", "--headless"])
+    assert args.command == "collect"
+    assert args.alerts == "replay"
+
+
+@pytest.mark.parametrize(
+    "argv, message",
+    [
+        (["--headless", "record", "-o", "x"], "does not apply to `record`"),
+        (["-i", "2"], "need --headless"),
+        (["-i", "2", "collect"], "after `collect`"),
+    ],
+)
+def test_misplaced_options_are_errors(argv, message, capsys):
+    with pytest.raises(SystemExit) as exit:
+        parse(argv)
+    assert exit.value.code == 2
+    assert message in capsys.readouterr().err
+
+
+def test_main_dispatches_headless_to_collect(monkeypatch):
+    import shm.headless
+
+    calls = []
+    monkeypatch.setattr(shm.headless, "run", lambda **kwargs: calls.append(kwargs))
+    cli.main(["--headless", "-n", "1"])
+    assert calls == [{"interval": 1.0, "count": 1, "processes": True}]
+
+
+@pytest.mark.parametrize(
+    "value, expected",
+    [
+        ("db1", ("db1", 9106)),
+        ("db1:9000", ("db1", 9000)),
+        ("[::1]", ("::1", 9106)),
+        ("[::1]:9200", ("::1", 9200)),
+    ],
+)
+def test_connect_address(value, expected):
+    assert parse(["connect", value]).address == expected
+
+
+@pytest.mark.parametrize("value", ["::1", "fe80::1:9000", "[::1", "db1:x", ":9000"])
+def test_connect_rejects_bad_address(value, capsys):
+    with pytest.raises(SystemExit) as exit:
+        parse(["connect", value])
+    assert exit.value.code == 2
+    assert "agent address" in capsys.readouterr().err
+
+
+@pytest.mark.parametrize(
+    "value, expected",
+    [
+        ("9105", ("127.0.0.1", 9105)),
+        (":9105", ("127.0.0.1", 9105)),
+        ("0.0.0.0:9105", ("0.0.0.0", 9105)),
+        ("[::1]:9105", ("::1", 9105)),
+    ],
+)
+def test_listen_address(value, expected):
+    assert parse(["--prometheus", value]).prometheus == expected
+
+
+@pytest.mark.parametrize("value", ["::1", "[::1]", "db1", "db1:x", "db1:0"])
+def test_listen_rejects_bad_address(value, capsys):
+    with pytest.raises(SystemExit) as exit:
+        parse(["--prometheus", value])
+    assert exit.value.code == 2
+    assert "argument --prometheus" in capsys.readouterr().err
@@ -0,0 +1,68 @@
+import time
+
+from shm.collector import Collector, CollectorThread, Sample
+
+
+def make_sample(seq, updated):
+    return Sample(
+        seq=seq, timestamp=float(seq), duration=0.0, updated=frozenset(updated),
+        uptime="", load={}, cpu={}, top_cpu=[], memory={}, top_memory=[],
+        disk={}, network={}, processes=None,
+    )
+
+
+class ScriptedCollector:
+    """
+    Returns the given samples, then ends like a finished replay.
+    """
+
+    def __init__(self, samples):
+        self.samples = list(samples)
+
+    def collect(self):
+        if not self.samples:
+            raise EOFError
+        return self.samples.pop(0)
+
+    def next_deadline(self):
+        return 0.0
+
+
+def run(samples):
+    thread = CollectorThread(ScriptedCollector(samples))
+    thread.start()
+    thread.join(5)
+    return thread
+
+
+def test_take_latest_reports_tasks_updated_by_skipped_samples():
+    thread = run([
+        make_sample(1, ("cpu", "processes")),
+        make_sample(2, ("cpu", "partitions")),
+        make_sample(3, ("cpu",)),
+    ])
+
+    sample = thread.take_latest()
+    assert sample.seq == 3
+    assert sample.updated == {"cpu", "processes", "partitions"}
+    # The plain latest sample is untouched
+    assert thread.latest.updated == {"cpu"}
+    # Consumed → nothing new until the next sample
+    assert thread.take_latest() is None
+
+
+def test_take_latest_before_any_sample():
+    assert CollectorThread(ScriptedCollector([])).take_latest() is None
+
+
+def test_schedule_ignores_wall_clock_steps(monkeypatch):
+    collector = Collector(intervals={name: 60.0 for name in Collector.DEFAULT_SCHEDULE})
+    collector.collect()
+
+    # Wall clock stepped back an hour: still due in about a minute, not an hour
+    wall = time.time()
+    monkeypatch.setattr(time, "time", lambda: wall - 3600.0)
+    sample = collector.collect()
+    assert sample.updated == frozenset()
+    assert sample.timestamp == wall - 3600.0
+    assert 0.0 < collector.next_deadline() - time.monotonic() <= 60.0
@@ -0,0 +1,23 @@
+from shm.capture import ReplaySource
+from shm.core.cpu import CPUProvider
+from shm.core.snapshot import TickSnapshot
+
+CPUINFO = """processor\t: 0
+model name\t: Test CPU
+physical id\t: 0
+
+processor\t: 1
+model name\t: Test CPU
+physical id\t: ?
+
+processor\t: 2
+model name\t: Test CPU
+physical id\t: 1
+"""
+
+
+def test_cpuinfo_skips_a_bad_physical_id_and_keeps_parsing():
+    frame = {"t": 0.0, "files": {}, "transient": {CPUProvider.CPUINFO_PATH: CPUINFO}}
+    model, sockets = CPUProvider()._read_cpuinfo(TickSnapshot(ReplaySource(frame)))
+    assert model == "Test CPU"
+    assert sockets == {"cpu0": 0, "cpu2": 1}
@@ -0,0 +1,90 @@
+import asyncio
+
+import pytest
+
+from shm.cli import main
+from shm.remote.agent import DEFAULT_PORT
+from shm.remote.fleet import Fleet, HostSummary, parse_addresses
+
+
+def test_one_failing_host_does_not_stop_the_others():
+    fleet = Fleet([("bad", 1), ("good", 2)])
+    fleet.RECONNECT_MIN = 0.01
+    streamed = []
+
+    async def stream(host):
+        if host.address == "bad":
+            raise RuntimeError("corrupt frame")
+        streamed.append(host.name)
+        await asyncio.sleep(0.01)
+
+    fleet._stream = stream
+
+    async def run_briefly():
+        try:
+            await asyncio.wait_for(fleet.run(), 0.2)
+        except asyncio.TimeoutError:
+            pass
+
+    asyncio.run(run_briefly())
+
+    bad, good = fleet.hosts
+    assert bad.state == "down"
+    assert bad.error == "corrupt frame"
+    # The good host kept reconnecting while the bad one failed
+    assert len(streamed) > 2
+
+
+@pytest.mark.parametrize(
+    "spec, expected",
+    [
+        ("db1", [("db1", DEFAULT_PORT)]),
+        ("db1:9000", [("db1", 9000)]),
+        ("db1:9000-9002", [("db1", 9000), ("db1", 9001), ("db1", 9002)]),
+        ("[::1]", [("::1", DEFAULT_PORT)]),
+        ("[::1]:9000", [("::1", 9000)]),
+        ("[fe80::1]:9000-9001", [("fe80::1", 9000), ("fe80::1", 9001)]),
+    ],
+)
+def test_parse_addresses(spec, expected):
+    assert parse_addresses([spec]) == expected
+
+
+@pytest.mark.parametrize(
+    "spec",
+    ["db1:abc", "db1:9000-x", "db1:", "db1:9002-9000", "db1:70000", ":9000",
+     "::1", "fe80::1:9000", "[::1", "[::1]9000", "[]:9000"],
+)
+def test_parse_addresses_rejects(spec):
+    with pytest.raises(ValueError, match="agent address"):
+        parse_addresses([spec])
+
+
+def test_cli_reports_bad_fleet_address(capsys):
+    with pytest.raises(SystemExit) as exit:
+        main(["fleet", "db1:abc"])
+    assert exit.value.code == 2
+    assert "bad port 'abc'" in capsys.readouterr().err
+
+
+def test_totals_follow_current_summaries_without_drift():
+    fleet = Fleet([("a", 1), ("b", 2)])
+    a, b = fleet.hosts
+    for step in range(1000):
+        for host in (a, b):
+            summary = HostSummary(
+                cpu=step * 0.1, load=0.0, mem_used=step, mem_total=1000,
+                disk_bps=step * 1e9 + 0.3, rx_bps=0.1 * step, tx_bps=0.7,
+            )
+            fleet._set(host, "up", summary)
+
+    with fleet.lock:
+        assert fleet.totals.hosts_up == 2
+        assert fleet.totals.cpu == pytest.approx(2 * 99.9)
+        assert fleet.totals.mem_used == 2 * 999
+
+    fleet._set(a, "down", None, "closed")
+    fleet._set(b, "down", None, "closed")
+    with fleet.lock:
+        totals = fleet.totals
+        assert (totals.hosts_up, totals.cpu, totals.disk_bps, totals.rx_bps) == (0, 0, 0, 0)
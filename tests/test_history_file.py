@@ -0,0 +1,63 @@
+import pytest
+
+from shm.metrics.history_file import MappedTimeSeriesStore, open_history
+from shm.metrics.timeseries import TimeSeriesStore
+
+TIERS = ((1.0, 10), (10.0, 6))
+
+
+def fill(store, name, start, count):
+    for second in range(start, start + count):
+        store.add(name, float(second), float(second))
+
+
+def test_history_survives_reopen(tmp_path):
+    path = str(tmp_path / "history.bin")
+    store = MappedTimeSeriesStore(path, slots=4, tiers=TIERS)
+    fill(store, "cpu", 100, 5)
+    before = store.window("cpu", 60)
+    store.close()
+
+    store = MappedTimeSeriesStore(path, slots=4, tiers=TIERS)
+    assert store.window("cpu", 60) == before
+    # The in-progress bucket was persisted too, so samples keep folding in
+    fill(store, "cpu", 105, 1)
+    assert store.series["cpu"].latest() == 105.0
+    store.close()
+
+
+def test_different_layout_reinitialises(tmp_path):
+    path = str(tmp_path / "history.bin")
+    store = MappedTimeSeriesStore(path, slots=4, tiers=TIERS)
+    fill(store, "cpu", 100, 5)
+    store.close()
+
+    store = MappedTimeSeriesStore(path, slots=4, tiers=((1.0, 20),))
+    assert store.series == {}
+    assert store.window("cpu", 60) == []
+    store.close()
+
+
+def test_full_file_and_long_names_fall_back_to_memory(tmp_path):
+    store = MappedTimeSeriesStore(str(tmp_path / "history.bin"), slots=2, tiers=TIERS)
+    for name in ("a", "b", "c", "x" * 64):
+        fill(store, name, 100, 3)
+
+    assert sorted(store._slot_of) == ["a", "b"]
+    # Memory-only series still work for this run
+    assert store.window("c", 5) == [100.0, 101.0, 102.0]
+    assert store.window("x" * 64, 5) == [100.0, 101.0, 102.0]
+    store.close()
+
+
+def test_second_writer_is_refused(tmp_path):
+    path = str(tmp_path / "history.bin")
+    first = MappedTimeSeriesStore(path, slots=2, tiers=TIERS)
+    try:
+        with pytest.raises(OSError):
+            MappedTimeSeriesStore(path, slots=2, tiers=TIERS)
+
+        fallback = open_history(path)
+        assert type(fallback) is TimeSeriesStore
+    finally:
+        first.close()
@@ -0,0 +1,60 @@
+import os
+
+from shm.core.mounts import MountTable
+
+
+def write(path, text):
+    path.write_text(text)
+
+
+def test_reparses_only_on_first_read(tmp_path):
+    path = tmp_path / "mounts"
+    write(path, "/dev/sda1 / ext4 rw 0 0\n")
+    table = MountTable(str(path))
+
+    assert table.entries() == [("/dev/sda1", "/")]
+    assert table.entries() == [("/dev/sda1", "/")]
+    assert table.generation == 1
+
+
+def test_failed_read_keeps_the_change_pending(tmp_path, monkeypatch):
+    path = tmp_path / "mounts"
+    write(path, "/dev/sda1 / ext4 rw 0 0\n")
+    table = MountTable(str(path))
+    table.entries()
+
+    # A change the poll reports once, then a read that fails
+    monkeypatch.setattr(table, "_changed", lambda: True)
+    monkeypatch.setattr(table._file, "read_text", _raise)
+    try:
+        table.entries()
+    except OSError:
+        pass
+    monkeypatch.undo()
+
+    write(path, "/dev/sda1 / ext4 rw 0 0\n/dev/sdb1 /data ext4 rw 0 0\n")
+    # Plain files never raise POLLPRI: only the pending state forces this
+    assert table.entries()[-1] == ("/dev/sdb1", "/data")
+    assert table.generation == 2
+
+
+def test_reregisters_when_the_file_is_reopened(tmp_path):
+    path = tmp_path / "mounts"
+    write(path, "/dev/sda1 / ext4 rw 0 0\n")
+    table = MountTable(str(path))
+    table.entries()
+    first_fd = table._polled_fd
+
+    # Take the freed fd number so the reopen gets a different one
+    table._file.close()
+    blocker = os.open(path, os.O_RDONLY)
+    try:
+        write(path, "/dev/sdb1 /data ext4 rw 0 0\n")
+        assert table.entries() == [("/dev/sdb1", "/data")]
+        assert table._polled_fd == table._file.fileno() != first_fd
+    finally:
+        os.close(blocker)
+
+
+def _raise():
+    raise OSError("read failed")
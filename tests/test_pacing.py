@@ -0,0 +1,64 @@
+import pytest
+
+from shm.pacing import RefreshPacer
+from shm.scheduler import Scheduler
+
+
+def make_pacer(**kwargs):
+    scheduler = Scheduler()
+    for name, interval in (
+        ("cpu", 0.25), ("memory", 1.0), ("processes", 2.0), ("partitions", 30.0)
+    ):
+        scheduler.add(name, lambda tick: None, interval)
+    return RefreshPacer(scheduler, **kwargs), scheduler
+
+
+def test_intervals_keep_their_ratio_to_the_refresh_interval():
+    pacer, _ = make_pacer()
+    assert pacer.intervals() == pytest.approx(
+        {"cpu": 0.25, "memory": 1.0, "processes": 2.0, "partitions": 30.0}
+    )
+
+    pacer.set_focused(False)
+    assert pacer.intervals()["cpu"] == pytest.approx(1.0)
+    assert pacer.intervals()["memory"] == pytest.approx(4.0)
+
+
+def test_fullscreen_panel_runs_fast_only_while_focused():
+    pacer, _ = make_pacer()
+    pacer.set_panel("memory")
+    assert pacer.intervals()["memory"] == pytest.approx(0.2)
+    pacer.set_focused(False)
+    assert pacer.intervals()["memory"] == pytest.approx(4.0)
+
+
+def test_final_interval_is_clamped_to_max_interval():
+    pacer, scheduler = make_pacer(max_interval=5.0)
+    pacer.set_focused(False)
+    # Idle: the refresh interval itself is already at max_interval
+    pacer.quiet = pacer.QUIET_TICKS + 1
+
+    # A scan taking 2 s would back off to 20 s on its budget alone
+    scheduler.tasks["processes"].duration = 2.0
+    intervals = pacer.intervals()
+
+    assert intervals["processes"] == 5.0
+    assert intervals["memory"] == 5.0
+    assert intervals["cpu"] == pytest.approx(1.25)
+    # Already slower than max_interval by design → not sped up
+    assert intervals["partitions"] == 30.0
+
+
+def test_budget_backoff_and_min_interval():
+    pacer, scheduler = make_pacer(min_interval=0.5)
+    assert pacer.intervals()["cpu"] == 0.5
+
+    scheduler.tasks["processes"].duration = 0.5
+    assert pacer.intervals()["processes"] == pytest.approx(5.0)
+
+
+def test_apply_moves_the_schedule():
+    pacer, scheduler = make_pacer()
+    pacer.set_focused(False)
+    pacer.apply()
+    assert scheduler.tasks["memory"].interval == pytest.approx(4.0)
@@ -0,0 +1,65 @@
+from shm.capture import ReplaySource
+from shm.core.snapshot import TickSnapshot
+from shm.metrics.proc_scan import ProcessScanner
+
+PASSWD = "root:x:0:0::/root:/bin/sh\nalice:x:1000:1000::/home/alice:/bin/sh\n"
+
+
+def stat_line(pid, name, utime, start):
+    # Fields 3..24 of /proc/[pid]/stat; utime 14, starttime 22, rss 24
+    fields = ["S", "1"] + ["0"] * 9 + [str(utime), "0"] + ["0"] * 4
+    fields += ["1", "0", str(start), "0", "10"]
+    return f"{pid} ({name}) " + " ".join(fields)
+
+
+def tick(t, processes):
+    """
+    processes: {pid: (name, utime, start, uid)}
+    """
+    transient = {"/etc/passwd": PASSWD}
+    for pid, (name, utime, start, uid) in processes.items():
+        transient[f"/proc/{pid}/stat"] = stat_line(pid, name, utime, start)
+        transient[f"/proc/{pid}/status"] = f"Name:\t{name}\nUid:\t{uid}\t{uid}\n"
+    frame = {
+        "t": t,
+        "files": {},
+        "transient": transient,
+        "dirs": {"/proc": [str(pid) for pid in processes] + ["self"]},
+    }
+    return TickSnapshot(ReplaySource(frame))
+
+
+def test_record_fields_and_cpu_percent():
+    scanner = ProcessScanner()
+    scanner.clk = 100
+
+    scanner.scan(tick(10.0, {7: ("my app)", 100, 500, 1000)}))
+    snapshot = scanner.scan(tick(12.0, {7: ("my app)", 200, 500, 1000)}))
+
+    process = snapshot.processes["7"]
+    assert process["name"] == "my app)"
+    assert process["start"] == 500
+    assert process["rss"] == 10 * scanner.page_size
+    # 100 ticks at 100/s over 2 s
+    assert process["cpu"] == 50.0
+    assert snapshot.user(process["uid"]) == "alice"
+
+
+def test_reused_pid_gets_its_own_uid_and_cpu_baseline():
+    scanner = ProcessScanner()
+    scanner.clk = 100
+
+    scanner.scan(tick(10.0, {7: ("sshd", 5000, 500, 0)}))
+    # PID 7 exited and was reused by a user process that started later
+    snapshot = scanner.scan(tick(11.0, {7: ("python", 40, 900, 1000)}))
+
+    process = snapshot.processes["7"]
+    assert process["uid"] == 1000
+    assert snapshot.user(process["uid"]) == "alice"
+    # No CPU % against the old process's ticks
+    assert process["cpu"] == 0.0
+
+    # Same process on the next scan: the cached uid is used, status is not reread
+    snapshot = scanner.scan(tick(12.0, {7: ("python", 90, 900, 0)}))
+    assert snapshot.processes["7"]["uid"] == 1000
+    assert snapshot.processes["7"]["cpu"] == 50.0
@@ -0,0 +1,64 @@
+from shm.collector import Sample
+from shm.export.prometheus import render_prometheus
+from shm.remote.fleet import HostSummary
+
+
+def make_sample() -> Sample:
+    return Sample(
+        seq=1,
+        timestamp=1000.0,
+        duration=0.001,
+        updated=frozenset(("disk", "partitions")),
+        uptime="1:00:00",
+        load={"1min": 0.5},
+        cpu={"total": 10.0},
+        top_cpu=[],
+        memory={"total": 1024, "used": 512},
+        top_memory=[],
+        disk={
+            "disks": {
+                "sda": {
+                    # Display values are rounded GiB(/s)
+                    "read_speed": 0.0, "write_speed": 0.0001,
+                    "iops": 3.0, "util_pct": 1.0,
+                    "read_bytes_per_sec": 4096.0,
+                    "write_bytes_per_sec": 123456.5,
+                    "read_bytes": 987654321,
+                    "write_bytes": 123456789012,
+                },
+            },
+            "partitions": {
+                "sda1": {
+                    "total": 1.0, "used": 0.0, "free": 1.0, "pct": 0.0,
+                    "mount": "/",
+                    "total_bytes": 1073741823,
+                    "used_bytes": 4096,
+                    "free_bytes": 1073737727,
+                    "stale": False,
+                },
+            },
+        },
+        network={},
+        processes=None,
+    )
+
+
+def metric(text: str, name: str) -> str:
+    return next(
+        line.split()[-1] for line in text.splitlines() if line.startswith(name + "{")
+    )
+
+
+def test_disk_and_partition_bytes_are_exported_exactly():
+    text = render_prometheus(make_sample()).decode()
+    assert metric(text, "mtop_disk_read_bytes_per_second") == "4096.0"
+    assert metric(text, "mtop_disk_write_bytes_per_second") == "123456.5"
+    assert metric(text, "mtop_disk_read_bytes_total") == "987654321"
+    assert metric(text, "mtop_disk_written_bytes_total") == "123456789012"
+    assert metric(text, "mtop_partition_size_bytes") == "1073741823"
+    assert metric(text, "mtop_partition_used_bytes") == "4096"
+    assert metric(text, "mtop_partition_free_bytes") == "1073737727"
+
+
+def test_fleet_summary_uses_exact_disk_rates():
+    assert HostSummary.from_sample(make_sample()).disk_bps == 4096.0 + 123456.5
@@ -0,0 +1,138 @@
+import asyncio
+import io
+
+import pytest
+
+from shm.remote.protocol import (
+    VERSION,
+    FrameDecoder,
+    FrameEncoder,
+    hello,
+    pack_message,
+    parse_hello,
+    read_message,
+    read_message_async,
+    read_varint,
+    unzigzag,
+    write_varint,
+    zigzag,
+)
+
+
+def make_frame(t, stat="cpu 100 0 50 1000", transient=None, partitions=None):
+    frame = {
+        "t": t,
+        "files": {
+            "/proc/stat": [t - 0.0005, stat],
+            "/proc/loadavg": [t - 0.0002, "0.50 0.40 0.30 1/123 4567"],
+        },
+        "transient": dict(transient or {}),
+        "dirs": {"/proc": ["1", "42", "self"]},
+    }
+    if partitions is not None:
+        frame["partitions"] = partitions
+    return frame
+
+
+def assert_same_frame(decoded, frame):
+    assert decoded["t"] == pytest.approx(frame["t"], abs=1e-6)
+    assert decoded["transient"] == frame["transient"]
+    assert decoded["dirs"] == frame["dirs"]
+    assert decoded.get("partitions") == frame.get("partitions")
+    assert decoded["files"].keys() == frame["files"].keys()
+    for path, (read_at, text) in frame["files"].items():
+        assert decoded["files"][path][0] == pytest.approx(read_at, abs=1e-6)
+        assert decoded["files"][path][1] == text
+
+
+@pytest.mark.parametrize(
+    "value", [0, 1, 127, 128, 300, 16383, 16384, 2 ** 35 + 7, 2 ** 70]
+)
+def test_varint_round_trip(value):
+    out = bytearray(b"x")
+    write_varint(out, value)
+    assert read_varint(bytes(out), 1) == (value, len(out))
+
+
+@pytest.mark.parametrize("value", [0, 1, -1, 2, -2, 63, -64, 2 ** 40, -(2 ** 40)])
+def test_zigzag_round_trip(value):
+    encoded = zigzag(value)
+    assert encoded >= 0
+    assert unzigzag(encoded) == value
+
+
+def test_zigzag_keeps_small_magnitudes_small():
+    assert [zigzag(v) for v in (0, -1, 1, -2, 2)] == [0, 1, 2, 3, 4]
+
+
+def test_frames_round_trip_through_full_delta_and_same():
+    encoder, decoder = FrameEncoder(), FrameDecoder()
+    frames = [
+        make_frame(1000.0, partitions={"sda1": {"pct": 50.0}}),
+        # Numbers moved → DELTA
+        make_frame(1001.0, stat="cpu 180 0 75 1990"),
+        # Nothing changed → SAME
+        make_frame(1002.0, stat="cpu 180 0 75 1990"),
+        # Template changed (an extra field) → FULL again
+        make_frame(1003.0, stat="cpu 190 0 80 2000 7"),
+        # Leading zeros and a counter going backwards still round-trip
+        make_frame(1004.0, stat="cpu 0190 0 79 00 7"),
+    ]
+    sizes = []
+    for frame in frames:
+        payload = encoder.encode(frame)
+        sizes.append(len(payload))
+        assert_same_frame(decoder.decode(payload), frame)
+
+    # DELTA and SAME frames are much smaller than the first one
+    assert sizes[1] < sizes[0] / 2
+    assert sizes[2] <= sizes[1]
+
+
+def test_transient_files_are_forgotten_and_resent_in_full():
+    encoder, decoder = FrameEncoder(), FrameDecoder()
+    pid1 = {"/proc/1/stat": "1 (init) S 0", "/proc/42/stat": "42 (sh) R 1"}
+    pid2 = {"/proc/1/stat": "1 (init) S 0"}
+
+    for t, transient in ((1.0, pid1), (2.0, pid2)):
+        frame = make_frame(t, transient=transient)
+        assert_same_frame(decoder.decode(encoder.encode(frame)), frame)
+
+    # /proc/42/stat left the encoder's and the decoder's state
+    assert all(path != "/proc/42/stat" for _, path in encoder._ids)
+    assert "/proc/42/stat" not in {path for _, path in decoder._entries.values()}
+    assert len(decoder._state) == len(encoder._sent)
+
+    # A frame without a process scan forgets nothing
+    frame = make_frame(3.0)
+    assert_same_frame(decoder.decode(encoder.encode(frame)), frame)
+    assert any(path == "/proc/1/stat" for _, path in encoder._ids)
+
+    # PID 42 comes back (reused) → named and sent in full again
+    frame = make_frame(4.0, transient={"/proc/42/stat": "42 (python) S 1"})
+    assert_same_frame(decoder.decode(encoder.encode(frame)), frame)
+
+
+def test_hello_and_message_framing():
+    payload = hello({"version": VERSION, "interval": 1.0})
+    stream = io.BytesIO(pack_message(payload) + pack_message(b"\x01" * 300))
+
+    assert parse_hello(read_message(stream))["interval"] == 1.0
+    assert read_message(stream) == b"\x01" * 300
+    with pytest.raises(ConnectionError):
+        read_message(stream)
+
+    with pytest.raises(ValueError):
+        parse_hello(hello({"version": VERSION + 1}))
+    with pytest.raises(ValueError):
+        FrameDecoder().decode(payload)
+
+
+def test_async_reader_matches_blocking_reader():
+    async def read_two():
+        reader = asyncio.StreamReader()
+        reader.feed_data(pack_message(b"abc") + pack_message(b"x" * 200))
+        reader.feed_eof()
+        return [await read_message_async(reader), await read_message_async(reader)]
+
+    assert asyncio.run(read_two()) == [b"abc", b"x" * 200]
@@ -0,0 +1,84 @@
+from shm.scheduler import COST_CHEAP, COST_EXPENSIVE, Scheduler
+
+
+def make_scheduler():
+    scheduler = Scheduler()
+    calls = []
+
+    def task(name):
+        return lambda tag: calls.append((name, tag)) or name[0]
+
+    scheduler.add("procs", task("procs"), 2.0, COST_EXPENSIVE)
+    scheduler.add("cpu", task("cpu"), 0.5)
+    scheduler.add("mem", task("mem"), 1.0, COST_CHEAP)
+    return scheduler, calls
+
+
+def test_first_tick_runs_everything_cheap_first():
+    scheduler, calls = make_scheduler()
+    assert scheduler.run_due(100.0, "t0") == ["cpu", "mem", "procs"]
+    assert calls == [("cpu", "t0"), ("mem", "t0"), ("procs", "t0")]
+    assert scheduler.value("procs") == "p"
+    assert scheduler.value("missing") is None
+
+
+def test_each_task_keeps_its_own_interval():
+    scheduler, _ = make_scheduler()
+    runs = {name: 0 for name in scheduler.tasks}
+    now = 100.0
+    while now < 104.0:
+        for name in scheduler.run_due(now, None):
+            runs[name] += 1
+        now = scheduler.next_deadline()
+
+    # 4 s: cpu every 0.5 s, mem every 1 s, procs every 2 s
+    assert runs == {"cpu": 8, "mem": 4, "procs": 2}
+
+
+def test_slack_merges_nearly_due_tasks():
+    scheduler, _ = make_scheduler()
+    scheduler.run_due(100.0, None)
+    assert scheduler.run_due(100.998, None) == ["cpu", "mem"]
+
+
+def test_overrun_skips_missed_slots():
+    scheduler, _ = make_scheduler()
+    scheduler.run_due(100.0, None)
+    # Stalled for 3 s: one run each, not a burst of catch-up runs
+    assert scheduler.run_due(103.2, None) == ["cpu", "mem", "procs"]
+    assert scheduler.run_due(103.2, None) == []
+    assert scheduler.tasks["cpu"].next_due == 103.7
+
+
+def test_cost_filter_and_ordering():
+    scheduler, _ = make_scheduler()
+    assert [t.name for t in scheduler.due(100.0, COST_EXPENSIVE)] == ["procs"]
+    assert scheduler.run_due(100.0, None, cost=COST_CHEAP) == ["cpu", "mem"]
+    # The expensive task is still due on the next tick
+    assert scheduler.run_due(100.1, None) == ["procs"]
+
+
+def test_set_interval_counts_from_the_last_run():
+    scheduler, _ = make_scheduler()
+    scheduler.run_due(100.0, None)
+    scheduler.set_interval("procs", 10.0)
+    assert scheduler.tasks["procs"].next_due == 110.0
+    scheduler.set_interval("procs", 0.25)
+    assert "procs" in scheduler.run_due(100.25, None)
+
+
+def test_duration_is_smoothed():
+    scheduler = Scheduler()
+    task = scheduler.add("slow", lambda: None, 1.0)
+    scheduler.run_due(0.0)
+    first = task.duration
+    assert first >= 0.0
+
+    task.duration = 1.0
+    scheduler.run_due(1.0)
+    # One fast run moves the average by SMOOTHING of the difference
+    assert 1.0 - Scheduler.SMOOTHING - 0.01 < task.duration < 1.0
+
+
+def test_next_deadline_of_empty_schedule():
+    assert Scheduler().next_deadline() == 0.0
@@ -0,0 +1,93 @@
+import random
+
+import pytest
+
+from shm.metrics.sketch import QuantileSketch, RollingQuantiles, SketchStore
+
+
+def exact(values, q):
+    ordered = sorted(values)
+    return ordered[int(q * (len(ordered) - 1))]
+
+
+def test_quantiles_within_relative_error():
+    rng = random.Random(1)
+    values = [rng.lognormvariate(3, 2) for _ in range(20000)]
+    sketch = QuantileSketch(alpha=0.01)
+    for value in values:
+        sketch.add(value)
+
+    for q, got in zip((0.5, 0.95, 0.99), sketch.quantiles((0.5, 0.95, 0.99))):
+        assert got == pytest.approx(exact(values, q), rel=0.011)
+    assert sketch.max == max(values)
+
+
+def test_zeros_and_empty():
+    sketch = QuantileSketch()
+    assert sketch.quantiles((0.5,)) == [0.0]
+    for value in [0.0] * 90 + [10.0] * 10:
+        sketch.add(value)
+    p50, p99 = sketch.quantiles((0.5, 0.99))
+    assert p50 == 0.0
+    assert p99 == pytest.approx(10.0, rel=0.01)
+
+
+def test_merge_equals_one_sketch():
+    rng = random.Random(2)
+    values = [rng.uniform(0, 100) for _ in range(5000)]
+    whole, left, right = QuantileSketch(), QuantileSketch(), QuantileSketch()
+    for i, value in enumerate(values):
+        whole.add(value)
+        (left if i % 2 else right).add(value)
+    left.merge(right)
+
+    assert left.buckets == whole.buckets
+    assert (left.count, left.zeros, left.max) == (whole.count, whole.zeros, whole.max)
+
+    with pytest.raises(ValueError):
+        left.merge(QuantileSketch(alpha=0.05))
+
+
+def test_bucket_count_is_bounded():
+    sketch = QuantileSketch(alpha=0.01)
+    sketch.MAX_BUCKETS = 64
+    for exponent in range(-100, 100):
+        sketch.add(10.0 ** (exponent / 10))
+    assert len(sketch.buckets) <= 64
+    assert sketch.quantiles((1.0,))[0] == pytest.approx(sketch.max, rel=0.011)
+
+
+def test_rolling_window_forgets_old_slices():
+    rolling = RollingQuantiles(windows=(60,), slices=12)
+    for ts in range(0, 60):
+        rolling.add(float(ts), 1000.0)
+    for ts in range(60, 130):
+        rolling.add(float(ts), 1.0)
+
+    merged = rolling.sketch(60)
+    assert merged.max == 1.0
+    assert merged.quantiles((0.99,))[0] == pytest.approx(1.0, rel=0.01)
+
+
+def test_store_summary_is_memoized_per_sample_second():
+    store = SketchStore(windows=(60,))
+    store.add("cpu.cpu0", 0.0, 10.0)
+    first = store.summary("cpu.cpu0", 60)
+    store.add("cpu.cpu0", 0.5, 90.0)
+    assert store.summary("cpu.cpu0", 60) is first
+    store.add("cpu.cpu0", 1.5, 90.0)
+    assert store.summary("cpu.cpu0", 60)[-1] == 90.0
+    assert store.summary("missing", 60) is None
+
+
+def test_discard_drops_metrics_and_summaries_by_prefix():
+    store = SketchStore(windows=(60,))
+    for name in ("net.eth1.rx", "net.eth1.tx", "net.eth10.rx", "disk.sda.read"):
+        store.add(name, 0.0, 5.0)
+        store.summary(name, 60)
+
+    store.discard("net.eth1.")
+
+    assert sorted(store.metrics) == ["disk.sda.read", "net.eth10.rx"]
+    assert {key[0] for key in store._summaries} == {"disk.sda.read", "net.eth10.rx"}
+    assert store.summary("net.eth1.rx", 60) is None
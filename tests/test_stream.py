@@ -0,0 +1,113 @@
+import csv
+import json
+
+from shm.collector import Sample
+from shm.export.stream import StreamExporter
+
+ALL_TASKS = frozenset(
+    ("uptime", "cpu", "memory", "disk", "partitions", "network", "processes")
+)
+
+
+def make_sample(seq: int, updated=frozenset(("cpu",))) -> Sample:
+    return Sample(
+        seq=seq,
+        timestamp=1000.0 + seq,
+        duration=0.001,
+        updated=updated,
+        uptime="1:00:00",
+        load={"1min": 0.5, "5min": 0.4, "15min": 0.3},
+        cpu={"total": float(seq % 100), "cores": {"cpu0": 1.0}, "model": "Test CPU"},
+        top_cpu=[],
+        memory={"total": 1024, "used": 512, "swap_total": 0},
+        top_memory=[],
+        disk={"sda": {"read_speed": 1.0}, "partitions": {"sda1": {"pct": 50.0}}},
+        network={"eth0": {"download_speed": 10.0, "upload_speed": 5.0}},
+        processes=None,
+    )
+
+
+def written_files(tmp_path, name):
+    return sorted(tmp_path.glob(f"{name}*"), key=lambda p: p.name, reverse=True)
+
+
+def test_csv_rotated_files_each_start_with_statics_and_header(tmp_path):
+    path = tmp_path / "out.csv"
+    exporter = StreamExporter(str(path), fmt="csv", batch=5, max_bytes=1500, backups=5)
+    for seq in range(1, 60):
+        exporter.update(make_sample(seq))
+    exporter.close()
+
+    files = written_files(tmp_path, "out.csv")
+    assert len(files) > 2
+
+    seqs = []
+    for file in files:
+        lines = file.read_text().splitlines()
+        assert lines[0].startswith("# cpu.model=Test CPU")
+
+        rows = list(csv.reader(line for line in lines if not line.startswith("#")))
+        header = rows[0]
+        assert header[0] == "seq"
+        for row in rows[1:]:
+            assert len(row) == len(header)
+            seqs.append(int(row[0]))
+
+    # Nothing lost or duplicated across rotations
+    assert seqs == list(range(1, 60))
+
+
+def test_jsonl_every_file_starts_with_static_and_a_full_record(tmp_path):
+    path = tmp_path / "out.jsonl"
+    exporter = StreamExporter(str(path), fmt="jsonl", batch=3, max_bytes=1000, backups=5)
+    exporter.update(make_sample(1, ALL_TASKS))
+    for seq in range(2, 40):
+        exporter.update(make_sample(seq))
+    exporter.close()
+
+    files = written_files(tmp_path, "out.jsonl")
+    assert len(files) > 2
+
+    for file in files:
+        records = [json.loads(line) for line in file.read_text().splitlines()]
+        assert records[0] == {
+            "static": {
+                "cpu.model": "Test CPU",
+                "cpu.sockets": None,
+                "memory.total": 1024,
+                "memory.swap_total": 0,
+            }
+        }
+        first = records[1]
+        assert {"partitions", "network", "load", "memory"} <= set(first)
+        assert "model" not in first["cpu"]
+        # Later records only carry what was refreshed
+        assert all(set(r) == {"seq", "timestamp", "duration", "cpu"} for r in records[2:])
+
+
+def test_static_change_is_written_once(tmp_path):
+    path = tmp_path / "out.jsonl"
+    exporter = StreamExporter(str(path), fmt="jsonl", batch=1)
+    exporter.update(make_sample(1))
+    exporter.update(make_sample(2))
+    changed = make_sample(3)
+    changed.memory["total"] = 2048
+    exporter.update(changed)
+    exporter.close()
+
+    lines = [json.loads(line) for line in path.read_text().splitlines()]
+    statics = [line["static"]["memory.total"] for line in lines if "static" in line]
+    assert statics == [1024, 2048]
+
+
+def test_batch_counts_records_not_header_and_static_lines(tmp_path):
+    path = tmp_path / "out.jsonl"
+    exporter = StreamExporter(str(path), fmt="jsonl", batch=3, flush_interval=3600)
+    exporter.update(make_sample(1))
+    exporter.update(make_sample(2))
+    assert path.read_text() == ""
+
+    exporter.update(make_sample(3))
+    lines = [json.loads(line) for line in path.read_text().splitlines()]
+    assert [line["seq"] for line in lines if "seq" in line] == [1, 2, 3]
+    exporter.close()
@@ -0,0 +1,76 @@
+import pytest
+
+from shm.metrics.timeseries import Series, Tier, TimeSeriesStore, format_span
+
+TIERS = ((1.0, 10), (10.0, 6))
+
+
+def test_buckets_hold_min_max_avg_per_step():
+    series = Series(TIERS)
+    for ts, value in ((100.0, 1.0), (100.4, 3.0), (100.9, 5.0), (101.2, 7.0)):
+        series.add(ts, value)
+
+    fine = series.tiers[0].buckets(0.0)
+    # Closed bucket plus the one still being filled
+    assert fine == [(100.0, 1.0, 5.0, 3.0), (101.0, 7.0, 7.0, 7.0)]
+    assert series.latest() == 101.0
+
+
+def test_every_sample_reaches_every_tier():
+    series = Series(TIERS)
+    for second in range(100, 125):
+        series.add(float(second), float(second))
+
+    coarse = series.tiers[1].buckets(0.0)
+    assert [b[0] for b in coarse] == [100.0, 110.0, 120.0]
+    assert coarse[0][1:] == (100.0, 109.0, 104.5)
+    assert coarse[-1][1:] == (120.0, 124.0, 122.0)
+
+
+def test_ring_keeps_only_capacity_buckets():
+    series = Series(TIERS)
+    for second in range(0, 30):
+        series.add(float(second), 1.0)
+
+    fine = series.tiers[0]
+    assert len(fine) == 10
+    # 10 closed buckets + the open one; oldest ones were overwritten
+    assert [b[0] for b in fine.buckets(0.0)] == [float(s) for s in range(19, 30)]
+
+
+def test_window_picks_the_finest_covering_tier_and_downsamples():
+    series = Series(TIERS)
+    for second in range(0, 60):
+        series.add(float(second), float(second % 10))
+
+    # 8 s fit in the 1 s tier
+    assert series.window(8, points=60) == [float(v % 10) for v in range(52, 60)]
+    # 60 s need the 10 s tier: buckets 10..50 s, each the average of 0..9
+    assert series.window(60, points=60) == [4.5] * 5
+    # Downsampled to 4 points by averaging neighbours
+    assert len(series.window(8, points=4)) == 4
+    assert series.window(8, points=60, field="max") == [
+        float(v % 10) for v in range(52, 60)
+    ]
+
+
+def test_store_creates_series_on_first_add():
+    store = TimeSeriesStore(TIERS)
+    assert store.window("cpu", 60) == []
+    store.add("cpu", 1.0, 50.0)
+    assert store.window("cpu", 60) == [50.0]
+    assert Series(TIERS).window(60) == []
+
+
+def test_tier_sizes_stay_aligned():
+    for capacity in (1, 3, 10, 2160):
+        assert Tier.nbytes(capacity) % 8 == 0
+    assert Series.nbytes(TIERS) == Tier.nbytes(10) + Tier.nbytes(6)
+
+
+@pytest.mark.parametrize(
+    "seconds, text",
+    [(30, "30s"), (60, "1m"), (600, "10m"), (3600, "1h"), (86400, "1d"), (7 * 86400, "7d")],
+)
+def test_format_span(seconds, text):
+    assert format_span(seconds) == text